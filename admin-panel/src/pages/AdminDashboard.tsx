@@ -55,6 +55,20 @@ export default function AdminDashboard() {
     }
   };
 
+  // Qualifications are served through the authenticated media endpoint,
+  // so fetch with the token and open the result as a blob.
+  const viewQualifications = async (profileId: number) => {
+    try {
+      const res = await api.get(`media/qualifications/${profileId}/`, {
+        headers: { Authorization: `Token ${token}` },
+        responseType: 'blob',
+      });
+      window.open(URL.createObjectURL(res.data), '_blank', 'noopener,noreferrer');
+    } catch (error) {
+      console.error('Failed to open qualifications:', error);
+    }
+  };
+
   const filteredAndSortedLawyers = [...lawyers]
     .filter((lawyer) =>
       lawyer.full_name.toLowerCase().includes(searchTerm.toLowerCase())
@@ -119,9 +133,11 @@ export default function AdminDashboard() {
               <div style={styles.metaRow}>
                 <strong>Qualification:</strong>{' '}
                 <a
-                  href={`http://127.0.0.1:8000/${lawyer.qualifications}`}
-                  target="_blank"
-                  rel="noopener noreferrer"
+                  href="#"
+                  onClick={(e) => {
+                    e.preventDefault();
+                    viewQualifications(lawyer.id);
+                  }}
                   style={styles.link}
                 >
                   View File
@@ -0,0 +1,29 @@
+"""
+Settings for running on SQLite without SQL Server: the project as
+configured in settings.py, on a local SQLite file behind the same
+connection pool. Used by the benchmark commands and the test suite.
+
+    python manage.py bench_api --settings=backend.bench_settings
+    python manage.py test --settings=backend.bench_settings
+
+'replica' is a second alias that mirrors default under the test runner,
+so replica routing is exercised without a real replica.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'bench.sqlite3',
+        'OPTIONS': {'timeout': 20},
+        'CONN_MAX_AGE': 0,
+        'POOL': {'MAX_SIZE': 32},
+        # bench_api always works on the test database; with the same file
+        # name it's created fresh for each run and removed afterwards.
+        'TEST': {'NAME': BASE_DIR / 'bench.sqlite3'},
+    },
+}
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = ['replica']
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,6 +32,7 @@ ALLOWED_HOSTS = ['192.168.1.3', '127.0.0.1', 'localhost', '10.16.128.236', '10.0
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -39,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
+    'channels',
     'users',
     'core',
     'corsheaders',
@@ -49,11 +52,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.display_names.DisplayNameMemoMiddleware',
+    'core.db.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -78,14 +84,29 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
+
+# Chat push channel. The in-memory layer only fans out within one process;
+# for multiple workers point this at a local broker, e.g.
+# {'BACKEND': 'channels_redis.core.RedisChannelLayer',
+#  'CONFIG': {'hosts': [('127.0.0.1', 6379)]}}
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
 
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# core.db.backends.mssql is the mssql engine with a connection pool in
+# front of it (core.db.pool). Django still "closes" the connection after
+# each request (CONN_MAX_AGE = 0); that hands it back to the pool instead
+# of tearing down the ODBC session.
 DATABASES = {
     'default': {
-        'ENGINE': 'mssql',
+        'ENGINE': 'core.db.backends.mssql',
         'NAME': 'LawyaDB',
         'USER': 'admin',
         'PASSWORD': 'admin',
@@ -94,9 +115,107 @@ DATABASES = {
         'OPTIONS': {
             'driver': 'ODBC Driver 17 for SQL Server',
         },
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MIN_SIZE': 2,
+            'MAX_SIZE': 20,
+            'MAX_LIFETIME': 1800,
+            'MAX_IDLE': 300,
+            'HEALTH_CHECK_INTERVAL': 30,
+            'TIMEOUT': 5,
+        },
     }
 }
 
+# Read replicas. Views marked with core.db.routers.read_replica (or
+# ReadReplicaMixin) send their GET queries to one of these aliases unless
+# the client wrote something in the last REPLICA_PIN_SECONDS (tracked in a
+# cookie, so it holds across workers). To enable, add
+# e.g. DATABASES['replica'] pointing at the replica and list it here. With
+# no replicas configured every query goes to default.
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 10
+
+# Per-route latency, query and size metrics (core.metrics), served in
+# Prometheus format at api/ops/metrics/. Requests slower than SLOW_REQUEST_MS
+# are logged with their most expensive queries.
+REQUEST_METRICS = {
+    'SLOW_REQUEST_MS': 500,
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.metrics': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
+# Caches
+# LocMemCache is per process; point this at a shared backend (Redis,
+# memcached) when running several workers so invalidations reach all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lawya',
+    }
+}
+
+LAWYER_DIRECTORY_CACHE_TIMEOUT = 300
+
+# Notification writes are handed to background workers (users.notifications).
+# With DURABLE on, status-change notifications are written to
+# NotificationOutbox inside the transaction that makes the change, so they
+# commit with it and survive a crash before any worker gets to them; the
+# workers move them into Notification in bulk. Tests switch to 'sync' with
+# override_settings.
+NOTIFICATION_PIPELINE = {
+    'MODE': 'async',
+    'DURABLE': True,
+    'WORKERS': 2,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'MAX_RETRIES': 3,
+}
+
+# Profile picture thumbnails are rendered by a small thread pool (users.images).
+IMAGE_VARIANTS = {
+    'MODE': 'async',
+    'WORKERS': 2,
+}
+
+# The first hasher is used for new passwords; existing hashes made with any
+# other listed hasher, or with different parameters, are upgraded on the
+# user's next login. Argon2 needs argon2-cffi installed.
+PASSWORD_HASHERS = [
+    'users.hashers.PBKDF2PasswordHasher',
+    'users.hashers.ScryptPasswordHasher',
+    'users.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+PASSWORD_HASHER_PARAMS = {
+    # 'pbkdf2': {'iterations': 720000},
+    # 'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},
+    # 'argon2': {'time_cost': 2, 'memory_cost': 102400, 'parallelism': 8},
+}
+
+# Login hashes passwords in a separate process pool (users.login), or inline
+# when WORKERS is 1 or less (the default on one- and two-core hosts).
+LOGIN_PIPELINE = {
+    'MODE': 'pool',
+    'MAX_PENDING': 64,
+    'RATE_LIMITS': {
+        'email': (10, 300),
+        'ip': (50, 300),
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -142,13 +261,28 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ]
 }
 
+# Token -> user lookups are kept in memory (users.authentication). A token
+# revoked on one worker stays usable on others for at most this long.
+TOKEN_AUTH_CACHE_TTL = 60
+TOKEN_AUTH_CACHE_SIZE = 4096
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resumable uploads (core.uploads): files are sent in CHUNK_SIZE pieces and
+# anything not finished within SESSION_TTL seconds is removed by purge_uploads.
+RESUMABLE_UPLOADS = {
+    'CHUNK_SIZE': 5 * 1024 * 1024,
+    'MAX_SIZE': 100 * 1024 * 1024,
+    'SESSION_TTL': 24 * 60 * 60,
+    'ANON_MAX_OPEN': 3,
+    'ANON_RATE': '20/hour',
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
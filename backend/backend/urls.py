@@ -8,6 +8,9 @@ urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/consultations/', include('consultations.urls')),
     path('api/chat/', include('chat.urls')),
+    path('api/', include('core.urls')),
 ]
+# Chat files and qualifications are only served through api/media/, which
+# checks access; profile pictures stay public.
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL + 'profile_pics/', document_root=settings.MEDIA_ROOT / 'profile_pics')
\ No newline at end of file
@@ -0,0 +1,56 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.db.models import Q
+from consultations.models import ConsultationRequest
+from .serializers import signed_chat_file_path
+
+
+def chat_group_name(consultation_id):
+    return f"chat_{consultation_id}"
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    # Push-only: clients keep sending through MessageSendView and receive new
+    # messages here instead of polling MessageListView.
+
+    async def connect(self):
+        self.consultation_id = self.scope['url_route']['kwargs']['consultation_id']
+        user = self.scope.get('user')
+
+        if user is None or not user.is_authenticated or not await self.is_participant(user):
+            await self.close(code=4403)
+            return
+
+        self.group_name = chat_group_name(self.consultation_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def chat_message(self, event):
+        message = event['message']
+        if message['file_url']:
+            # One broadcast goes to both participants, so each connection
+            # signs the file link for its own user.
+            message = {**message, 'file_url': self.file_url(message['id'])}
+        await self.send_json({'type': 'message', 'message': message})
+
+    def file_url(self, message_id):
+        path = signed_chat_file_path(message_id, self.scope['user'])
+        host = dict(self.scope.get('headers', [])).get(b'host')
+        if host is None:
+            return path
+        scheme = 'https' if self.scope.get('scheme') in ('wss', 'https') else 'http'
+        return f"{scheme}://{host.decode('latin1')}{path}"
+
+    @database_sync_to_async
+    def is_participant(self, user):
+        return ConsultationRequest.objects.filter(
+            Q(client=user) | Q(lawyer=user), id=self.consultation_id
+        ).exists()
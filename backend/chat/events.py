@@ -0,0 +1,34 @@
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from .consumers import chat_group_name
+from .serializers import MessageSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def broadcast_message(message):
+    """
+    Push a newly created Message to everyone connected to its chatroom once
+    the surrounding transaction commits. The payload is serialized without a
+    request, so file_url is the bare path; ChatConsumer signs it for each
+    recipient.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    data = MessageSerializer(message).data
+
+    def send():
+        try:
+            async_to_sync(channel_layer.group_send)(
+                chat_group_name(message.consultation_id),
+                {'type': 'chat.message', 'message': data},
+            )
+        except Exception:
+            # Delivery is best effort; clients fall back to polling the REST list.
+            logger.exception("Failed to push message %s", message.pk)
+
+    transaction.on_commit(send)
@@ -0,0 +1,21 @@
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from users.authentication import user_for_token
+
+
+@database_sync_to_async
+def get_token_user(key):
+    return user_for_token(key) or AnonymousUser()
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    # WebSocket clients can't set an Authorization header from React Native,
+    # so the DRF token is passed as ?token=<key> instead.
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        key = query.get('token', [None])[0]
+        scope['user'] = await get_token_user(key) if key else AnonymousUser()
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_meetingschedule_reminder_sent'),
+        ('consultations', '0004_delete_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['consultation', 'timestamp', 'id'], name='chat_msg_consult_ts_idx'),
+        ),
+    ]
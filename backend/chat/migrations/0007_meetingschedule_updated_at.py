@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_message_consultation_timestamp_index'),
+        ('consultations', '0005_pointtransaction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingschedule',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='meetingschedule',
+            index=models.Index(fields=['updated_at'], name='chat_meeting_updated_idx'),
+        ),
+    ]
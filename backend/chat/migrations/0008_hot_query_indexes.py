@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_meetingschedule_updated_at'),
+        ('consultations', '0006_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meetingschedule',
+            index=models.Index(fields=['scheduled_time', 'reminder_sent'], name='chat_meeting_due_idx'),
+        ),
+    ]
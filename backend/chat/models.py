@@ -10,6 +10,11 @@ class Message(models.Model):
     file = models.FileField(upload_to='chat_files/', blank=True, null=True)
     timestamp = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['consultation', 'timestamp', 'id'], name='chat_msg_consult_ts_idx'),
+        ]
+
     def __str__(self):
         return f"From {self.sender.email} at {self.timestamp}"
     
@@ -18,7 +23,15 @@ class MeetingSchedule(models.Model):
     scheduled_time = models.DateTimeField()
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scheduled_meetings')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     reminder_sent = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='chat_meeting_updated_idx'),
+            # Reminder scans: unsent meetings in a scheduled_time window.
+            models.Index(fields=['scheduled_time', 'reminder_sent'], name='chat_meeting_due_idx'),
+        ]
+
     def __str__(self):
         return f"Meeting for {self.consultation.id} at {self.scheduled_time}"
@@ -1,6 +1,35 @@
+from urllib.parse import urlencode
+from django.urls import reverse
 from rest_framework import serializers
+from core.media import sign_media
+from core.serialization import FastSerializer
 from .models import Message
 
+
+def signed_chat_file_path(message_id, user=None):
+    # Signed for one participant so the app can open the link directly;
+    # the media view re-checks consultation membership.
+    url = reverse('media-chat-file', args=[message_id])
+    if user is not None and user.is_authenticated:
+        url += '?' + urlencode({'sig': sign_media('chat', message_id, user.id)})
+    return url
+
+
+def chat_file_url(message, request):
+    if not message.file:
+        return None
+    url = signed_chat_file_path(message.id, request.user if request is not None else None)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def sender_name(sender):
+    if hasattr(sender, 'clientprofile'):
+        return sender.clientprofile.full_name
+    elif hasattr(sender, 'lawyerprofile'):
+        return sender.lawyerprofile.full_name
+    return sender.email
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender_email = serializers.SerializerMethodField()
     sender_name = serializers.SerializerMethodField()
@@ -14,15 +43,25 @@ class MessageSerializer(serializers.ModelSerializer):
         return obj.sender.email
 
     def get_sender_name(self, obj):
-        if hasattr(obj.sender, 'clientprofile'):
-            return obj.sender.clientprofile.full_name
-        elif hasattr(obj.sender, 'lawyerprofile'):
-            return obj.sender.lawyerprofile.full_name
-        return obj.sender.email
+        return sender_name(obj.sender)
 
     def get_file_url(self, obj):
-        request = self.context.get('request')
-        return request.build_absolute_uri(obj.file.url) if obj.file else None
+        return chat_file_url(obj, self.context.get('request'))
+
+
+class MessageFastSerializer(FastSerializer):
+    # MessageSerializer's output for list endpoints.
+
+    def to_representation(self, obj):
+        sender = obj.sender
+        return {
+            'id': obj.id,
+            'sender_email': sender.email,
+            'sender_name': sender_name(sender),
+            'content': obj.content,
+            'file_url': chat_file_url(obj, self.request),
+            'timestamp': self.datetime(obj.timestamp),
+        }
 
 from .models import MeetingSchedule
 
@@ -1,3 +1,226 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core.media import unsign_media
+from users.models import User, ClientProfile, LawyerProfile
+from consultations.models import ConsultationRequest
+from .middleware import TokenAuthMiddleware
+from .models import Message
+from .routing import websocket_urlpatterns
 
-# Create your tests here.
+
+@override_settings(DATABASE_REPLICAS=[])
+class MessageListQueryTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('client@example.com', 'pw', role='client')
+        ClientProfile.objects.create(user=self.client_user, full_name='Client', phone_number='1', nic_number='1')
+        self.lawyer_user = User.objects.create_user('lawyer@example.com', 'pw', role='lawyer')
+        LawyerProfile.objects.create(
+            user=self.lawyer_user, full_name='Lawyer', phone_number='1', nic_number='1',
+            expertise='civil', location='Colombo',
+        )
+        self.consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case',
+            case_type='civil', requested_time=timezone.now(),
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+        self.url = f'/api/chat/messages/{self.consultation.id}/'
+
+    def add_messages(self, count):
+        senders = [self.client_user, self.lawyer_user]
+        Message.objects.bulk_create([
+            Message(consultation=self.consultation, sender=senders[i % 2], content=f'msg {i}')
+            for i in range(count)
+        ])
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.api.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_query_count_is_constant_in_message_count(self):
+        self.add_messages(2)
+        small, _ = self.count_list_queries()
+
+        self.add_messages(48)
+        large, data = self.count_list_queries()
+
+        self.assertEqual(len(data), 50)
+        self.assertEqual(small, large)
+        self.assertEqual(large, 1)
+
+    def test_sender_names_resolved_from_profiles(self):
+        self.add_messages(2)
+        _, data = self.count_list_queries()
+        self.assertEqual([m['sender_name'] for m in data], ['Client', 'Lawyer'])
+
+    def test_sender_without_profile_falls_back_to_email(self):
+        admin = User.objects.create_user('admin@example.com', 'pw', role='admin')
+        Message.objects.create(consultation=self.consultation, sender=admin, content='hi')
+        _, data = self.count_list_queries()
+        self.assertEqual(data[0]['sender_name'], 'admin@example.com')
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class MessageCursorTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('client@example.com', 'pw', role='client')
+        self.lawyer_user = User.objects.create_user('lawyer@example.com', 'pw', role='lawyer')
+        self.consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case',
+            case_type='civil', requested_time=timezone.now(),
+        )
+        start = timezone.now() - timedelta(hours=1)
+        self.messages = Message.objects.bulk_create([
+            Message(consultation=self.consultation, sender=self.client_user, content=f'msg {i}',
+                    timestamp=start + timedelta(minutes=i))
+            for i in range(10)
+        ])
+        self.ids = list(Message.objects.order_by('timestamp', 'id').values_list('id', flat=True))
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+        self.url = f'/api/chat/messages/{self.consultation.id}/'
+
+    def ids_for(self, **params):
+        response = self.api.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [m['id'] for m in response.json()]
+
+    def test_after_id_returns_only_newer_messages(self):
+        self.assertEqual(self.ids_for(after_id=self.ids[6]), self.ids[7:])
+        self.assertEqual(self.ids_for(after_id=self.ids[-1]), [])
+
+    def test_after_id_pages_forward_with_limit(self):
+        self.assertEqual(self.ids_for(after_id=self.ids[1], limit=3), self.ids[2:5])
+        self.assertEqual(self.ids_for(after_id=self.ids[4], limit=3), self.ids[5:8])
+
+    def test_after_timestamp(self):
+        cursor = Message.objects.get(id=self.ids[7]).timestamp.isoformat()
+        self.assertEqual(self.ids_for(after_timestamp=cursor), self.ids[8:])
+
+    def test_before_id_pages_backward_in_chronological_order(self):
+        self.assertEqual(self.ids_for(before_id=self.ids[9], limit=4), self.ids[5:9])
+        self.assertEqual(self.ids_for(before_id=self.ids[5], limit=4), self.ids[1:5])
+        self.assertEqual(self.ids_for(before_id=self.ids[1], limit=4), self.ids[:1])
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(self.ids_for(limit=0), self.ids[:1])
+        self.assertEqual(self.ids_for(limit=-5), self.ids[:1])
+        Message.objects.bulk_create([
+            Message(consultation=self.consultation, sender=self.client_user, content='more')
+            for _ in range(250)
+        ])
+        self.assertEqual(len(self.ids_for(limit=1000)), 200)
+
+    def test_non_integer_cursor_is_rejected(self):
+        for params in ({'after_id': 'abc'}, {'before_id': '1.5'}, {'limit': 'ten'}):
+            response = self.api.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+        response = self.api.get(self.url, {'after_timestamp': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_from_another_consultation_is_rejected(self):
+        other = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Other',
+            case_type='civil', requested_time=timezone.now(),
+        )
+        foreign = Message.objects.create(consultation=other, sender=self.client_user, content='elsewhere')
+        for params in ({'after_id': foreign.id}, {'before_id': foreign.id}):
+            response = self.api.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('cursor', response.json())
+
+
+class ChatSocketTests(TransactionTestCase):
+    # Consumers close their DB connection after each call, which would end
+    # a TestCase's wrapping transaction on any database but in-memory SQLite.
+
+    def setUp(self):
+        self.client_user = User.objects.create_user('client@example.com', 'pw', role='client')
+        self.lawyer_user = User.objects.create_user('lawyer@example.com', 'pw', role='lawyer')
+        self.outsider = User.objects.create_user('outsider@example.com', 'pw', role='client')
+        self.consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case',
+            case_type='civil', requested_time=timezone.now(), status='accepted',
+        )
+        self.tokens = {user.email: Token.objects.create(user=user).key
+                       for user in (self.client_user, self.lawyer_user, self.outsider)}
+        self.application = TokenAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    def communicator(self, token=None):
+        path = f'/ws/chat/{self.consultation.id}/'
+        if token is not None:
+            path += f'?token={token}'
+        return WebsocketCommunicator(self.application, path, headers=[(b'host', b'testserver')])
+
+    async def assert_refused(self, communicator):
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4403)
+
+    async def test_missing_token_is_refused(self):
+        await self.assert_refused(self.communicator())
+
+    async def test_bad_token_is_refused(self):
+        await self.assert_refused(self.communicator('not-a-token'))
+
+    async def test_non_participant_is_refused(self):
+        await self.assert_refused(self.communicator(self.tokens['outsider@example.com']))
+
+    async def test_ping(self):
+        communicator = self.communicator(self.tokens['client@example.com'])
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.send_json_to({'type': 'ping'})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'pong'})
+        await communicator.disconnect()
+
+    def send(self, sender, **data):
+        # Called through sync_to_async: the broadcast uses async_to_sync,
+        # which can't run on the event loop's thread.
+        api = APIClient()
+        api.force_authenticate(sender)
+        response = api.post(f'/api/chat/messages/{self.consultation.id}/send/', data)
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    async def test_sent_message_reaches_the_other_participant(self):
+        lawyer = self.communicator(self.tokens['lawyer@example.com'])
+        connected, _ = await lawyer.connect()
+        self.assertTrue(connected)
+
+        sent = await sync_to_async(self.send)(self.client_user, content='Hello')
+        event = await lawyer.receive_json_from()
+        self.assertEqual(event['type'], 'message')
+        self.assertEqual(event['message']['id'], sent['id'])
+        self.assertEqual(event['message']['content'], 'Hello')
+        self.assertEqual(event['message']['sender_email'], 'client@example.com')
+        self.assertIsNone(event['message']['file_url'])
+        await lawyer.disconnect()
+
+    async def test_file_links_are_signed_for_each_recipient(self):
+        lawyer = self.communicator(self.tokens['lawyer@example.com'])
+        await lawyer.connect()
+        with self.settings(MEDIA_ROOT=tempfile.mkdtemp()):
+            upload = SimpleUploadedFile('brief.txt', b'contents', content_type='text/plain')
+            sent = await sync_to_async(self.send)(self.client_user, file=upload)
+            event = await lawyer.receive_json_from()
+        await lawyer.disconnect()
+
+        url = event['message']['file_url']
+        self.assertTrue(url.startswith(f'http://testserver/api/media/chat/{sent["id"]}/?sig='))
+        sig = parse_qs(urlparse(url).query)['sig'][0]
+        self.assertEqual(unsign_media(sig, 'chat', sent['id']), self.lawyer_user.id)
+        self.assertNotEqual(url, sent['file_url'])
@@ -1,9 +1,15 @@
-from rest_framework import generics, permissions, status
+from rest_framework import generics, permissions, status, serializers
+from django.db.models import Q
 from users.models import User
+from users.display_names import display_name
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import Message
-from .serializers import MessageSerializer
+from .serializers import MessageSerializer, MessageFastSerializer
+from .events import broadcast_message
+from core import uploads
+from core.db.routers import ReadReplicaMixin
+from core.serialization import FastListMixin
 from consultations.models import ConsultationRequest
 from rest_framework.permissions import IsAuthenticated
 from .models import MeetingSchedule
@@ -12,13 +18,73 @@ from django.utils.dateparse import parse_datetime
 from django.utils.timezone import localtime
 from rest_framework.decorators import api_view, permission_classes
 
-class MessageListView(generics.ListAPIView):
+class MessageListView(FastListMixin, ReadReplicaMixin, generics.ListAPIView):
+    # No params returns the full history. Pollers pass after_id/after_timestamp
+    # to get only newer rows; before_id + limit pages back through older ones.
     serializer_class = MessageSerializer
+    fast_serializer_class = MessageFastSerializer
     permission_classes = [permissions.IsAuthenticated]
+    default_page_size = 50
+    max_page_size = 200
 
     def get_queryset(self):
         consultation_id = self.kwargs['consultation_id']
-        return Message.objects.filter(consultation_id=consultation_id).order_by('timestamp')
+        # Pull each sender and whichever profile they have in the same query so
+        # MessageSerializer doesn't go back to the DB for every row.
+        queryset = Message.objects.filter(consultation_id=consultation_id).select_related(
+            'sender', 'sender__clientprofile', 'sender__lawyerprofile'
+        )
+        params = self.request.query_params
+
+        after_id = self._int_param('after_id')
+        before_id = self._int_param('before_id')
+        after_timestamp = params.get('after_timestamp')
+
+        if after_id is not None:
+            queryset = queryset.filter(self._keyset_filter(consultation_id, after_id, 'gt'))
+        elif after_timestamp:
+            parsed = parse_datetime(after_timestamp)
+            if parsed is None:
+                raise serializers.ValidationError({'after_timestamp': 'Invalid datetime.'})
+            queryset = queryset.filter(timestamp__gt=parsed)
+
+        if before_id is not None:
+            # Walk the index backwards from the cursor, then flip the page so
+            # the response stays in chronological order.
+            queryset = queryset.filter(self._keyset_filter(consultation_id, before_id, 'lt'))
+            page = list(queryset.order_by('-timestamp', '-id')[:self._limit(self.default_page_size)])
+            page.reverse()
+            return page
+
+        queryset = queryset.order_by('timestamp', 'id')
+        limit = self._limit(None)
+        return queryset[:limit] if limit else queryset
+
+    def _int_param(self, name):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise serializers.ValidationError({name: 'Must be an integer.'})
+
+    def _limit(self, default):
+        limit = self._int_param('limit')
+        if limit is None:
+            return default
+        return max(1, min(limit, self.max_page_size))
+
+    def _keyset_filter(self, consultation_id, message_id, direction):
+        cursor = Message.objects.filter(
+            consultation_id=consultation_id, id=message_id
+        ).values_list('timestamp', flat=True).first()
+        if cursor is None:
+            raise serializers.ValidationError({'cursor': 'Unknown message id.'})
+        return (
+            Q(**{f'timestamp__{direction}': cursor}) |
+            Q(timestamp=cursor, **{f'id__{direction}': message_id})
+        )
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -31,8 +97,9 @@ class MessageSendView(APIView):
     def post(self, request, consultation_id):
         content = request.data.get('content', '').strip()
         file = request.FILES.get('file')
+        upload_id = request.data.get('upload_id')
 
-        if not content and not file:
+        if not content and not file and not upload_id:
             return Response({'error': 'Message must contain text or a file.'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -40,12 +107,18 @@ class MessageSendView(APIView):
         except ConsultationRequest.DoesNotExist:
             return Response({'error': 'Consultation not found'}, status=status.HTTP_404_NOT_FOUND)
 
+        if upload_id and not file:
+            # Large files come in through the resumable upload API and are
+            # attached here by id once finalized.
+            file = uploads.claim(upload_id, request.user, 'chat', consultation)
+
         message = Message.objects.create(
             consultation=consultation,
             sender=request.user,
             content=content,
             file=file
         )
+        broadcast_message(message)
 
         serializer = MessageSerializer(message, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -59,14 +132,12 @@ class ChatPartnerNameView(APIView):
             user = request.user
             if user == consultation.client:
                 other = consultation.lawyer
-                name = other.lawyerprofile.full_name if hasattr(other, 'lawyerprofile') else other.email
             elif user == consultation.lawyer:
                 other = consultation.client
-                name = other.clientprofile.full_name if hasattr(other, 'clientprofile') else other.email
             else:
                 return Response({'error': 'Not authorized for this consultation'}, status=status.HTTP_403_FORBIDDEN)
 
-            return Response({'name': name})
+            return Response({'name': display_name(other) or other.email})
 
         except ConsultationRequest.DoesNotExist:
             return Response({'error': 'Consultation not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -81,15 +152,9 @@ def get_chat_partner(request, consultation_id):
 
     user = request.user
     if user == consultation.client:
-        try:
-            return Response({"name": consultation.lawyer.lawyerprofile.full_name})
-        except:
-            return Response({"name": consultation.lawyer.email})
+        return Response({"name": display_name(consultation.lawyer) or consultation.lawyer.email})
     elif user == consultation.lawyer:
-        try:
-            return Response({"name": consultation.client.clientprofile.full_name})
-        except:
-            return Response({"name": consultation.client.email})
+        return Response({"name": display_name(consultation.client) or consultation.client.email})
     else:
         return Response({"error": "You are not part of this consultation"}, status=403)
     
@@ -110,7 +175,8 @@ class ScheduleMeetingView(APIView):
                 consultation=consultation,
                 defaults={
                     'scheduled_time': datetime_str,
-                    'created_by': request.user
+                    'created_by': request.user,
+                    'reminder_sent': False,
                 }
             )
 
@@ -118,11 +184,12 @@ class ScheduleMeetingView(APIView):
             local_scheduled = localtime(scheduled_for)
             formatted_time = local_scheduled.strftime('%A, %B %d at %I:%M %p')
 
-            Message.objects.create(
+            message = Message.objects.create(
                 consultation=consultation,
                 sender=request.user,
                 content=f"📅 Meeting scheduled for {formatted_time}"
             )
+            broadcast_message(message)
 
             return Response({'message': 'Meeting time scheduled'}, status=200)
 
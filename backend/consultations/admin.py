@@ -1,5 +1,34 @@
 from django.contrib import admin
-from .models import ConsultationRequest, ConsultationPoint
+from .models import ConsultationRequest, ConsultationPoint, PointTransaction
 
 admin.site.register(ConsultationRequest)
-admin.site.register(ConsultationPoint)
\ No newline at end of file
+
+
+@admin.register(ConsultationPoint)
+class ConsultationPointAdmin(admin.ModelAdmin):
+    # The balance has to stay equal to the sum of the user's PointTransaction
+    # rows, so it only moves through consultations.ledger.
+    list_display = ('user', 'balance')
+    search_fields = ('user__email',)
+    readonly_fields = ('balance',)
+
+
+@admin.register(PointTransaction)
+class PointTransactionAdmin(admin.ModelAdmin):
+    # The ledger is append-only and written by consultations.ledger together
+    # with the balance, so the admin can only look.
+    list_display = ('user', 'amount', 'reason', 'consultation', 'created_at')
+    list_filter = ('reason',)
+    search_fields = ('user__email',)
+
+    def get_readonly_fields(self, request, obj=None):
+        return [field.name for field in self.model._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,43 @@
+from django.db import transaction
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+from .models import ConsultationPoint, PointTransaction
+
+
+class InsufficientPoints(ValidationError):
+    default_detail = {"cp": "Not enough Consultation Points to book"}
+
+
+def _apply(user, amount, condition=None):
+    # A single conditional UPDATE: the row lock is held only for this
+    # statement's transaction, and concurrent writers can't lose updates.
+    rows = ConsultationPoint.objects.filter(user=user)
+    if condition:
+        rows = rows.filter(**condition)
+    return rows.update(balance=F('balance') + amount)
+
+
+def credit(user, amount, reason, consultation=None):
+    with transaction.atomic():
+        if not _apply(user, amount):
+            ConsultationPoint.objects.get_or_create(user=user)
+            _apply(user, amount)
+        return PointTransaction.objects.create(
+            user=user, amount=amount, reason=reason, consultation=consultation
+        )
+
+
+def debit(user, amount, reason, consultation=None):
+    """Take ``amount`` CP from ``user`` or raise InsufficientPoints without touching the balance."""
+    with transaction.atomic():
+        if not _apply(user, -amount, condition={'balance__gte': amount}):
+            ConsultationPoint.objects.get_or_create(user=user)
+            raise InsufficientPoints()
+        return PointTransaction.objects.create(
+            user=user, amount=-amount, reason=reason, consultation=consultation
+        )
+
+
+def balance(user):
+    cp, _ = ConsultationPoint.objects.get_or_create(user=user)
+    return cp.balance
@@ -0,0 +1,25 @@
+import signal
+from django.core.management.base import BaseCommand
+from consultations import reminders
+
+class Command(BaseCommand):
+    help = 'Run the in-process meeting reminder scheduler (replaces cron-driven send_reminders)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Seconds between checks for new or moved meetings (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        scheduler = reminders.ReminderScheduler(poll_interval=options['poll_interval'])
+
+        def shutdown(signum, frame):
+            scheduler.stop()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write("⏰ Reminder scheduler running. Press Ctrl+C to stop.")
+        scheduler.run_forever()
+        self.stdout.write(self.style.SUCCESS(f"✅ Scheduler stopped after sending {scheduler.sent} reminder(s)"))
@@ -1,14 +1,22 @@
+import time
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 from django.utils.timezone import now, localtime
 from datetime import timedelta
-from consultations.models import ConsultationRequest
 from chat.models import MeetingSchedule
-from users.models import Notification
+from consultations.reminders import PARTICIPANTS, send_reminders
 
 class Command(BaseCommand):
     help = 'Send 30-minute meeting reminders to clients and lawyers'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Meetings handled per query/transaction (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
         current_time = localtime(now())
         window_start = current_time + timedelta(minutes=10)
         window_end = current_time + timedelta(minutes=50)
@@ -16,35 +24,37 @@ class Command(BaseCommand):
         self.stdout.write(f"🔍 Now: {current_time}")
         self.stdout.write(f"🕓 Checking for meetings between {window_start} and {window_end}")
 
-        upcoming = MeetingSchedule.objects.select_related('consultation').filter(
+        upcoming = MeetingSchedule.objects.select_related(*PARTICIPANTS).filter(
             scheduled_time__gte=window_start,
             scheduled_time__lt=window_end,
             consultation__status='accepted',
             reminder_sent=False
+        ).order_by('scheduled_time', 'id')
+
+        started = time.perf_counter()
+        meetings_sent = batches = 0
+        cursor = None
+
+        while True:
+            # Keyset on (scheduled_time, id) so each batch is a seek on
+            # chat_meeting_due_idx.
+            page = upcoming
+            if cursor:
+                page = page.filter(
+                    Q(scheduled_time__gt=cursor[0]) | Q(scheduled_time=cursor[0], id__gt=cursor[1])
+                )
+            batch = list(page[:batch_size])
+            if not batch:
+                break
+            cursor = (batch[-1].scheduled_time, batch[-1].id)
+            send_reminders(batch)
+            meetings_sent += len(batch)
+            batches += 1
+
+        elapsed = time.perf_counter() - started
+        rate = meetings_sent / elapsed if elapsed else 0
+        self.stdout.write(
+            f"📅 {meetings_sent} meeting(s), {meetings_sent * 2} notification(s) in {batches} batch(es) "
+            f"— {elapsed:.2f}s ({rate:.0f} meetings/s)"
         )
-
-        self.stdout.write(f"📅 Found {upcoming.count()} upcoming meeting(s)")
-
-        for meeting in upcoming:
-            consultation = meeting.consultation
-            scheduled = localtime(meeting.scheduled_time)
-            formatted = scheduled.strftime('%I:%M %p')
-
-            self.stdout.write(f"🔔 Sending reminders for meeting at {formatted}")
-
-            Notification.objects.create(
-                user=consultation.client,
-                message=f"Reminder: Your consultation with {consultation.lawyer.lawyerprofile.full_name} is at {formatted}.",
-                status='info'
-            )
-
-            Notification.objects.create(
-                user=consultation.lawyer,
-                message=f"Reminder: You have a consultation with {consultation.client.clientprofile.full_name} at {formatted}.",
-                status='info'
-            )
-
-            meeting.reminder_sent = True
-            meeting.save()
-
-        self.stdout.write(self.style.SUCCESS('✅ Meeting reminders sent'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('✅ Meeting reminders sent'))
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    ConsultationPoint = apps.get_model('consultations', 'ConsultationPoint')
+    PointTransaction = apps.get_model('consultations', 'PointTransaction')
+    PointTransaction.objects.bulk_create([
+        PointTransaction(user_id=cp.user_id, amount=cp.balance, reason='opening')
+        for cp in ConsultationPoint.objects.exclude(balance=0)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0004_delete_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(choices=[('opening', 'Opening balance'), ('purchase', 'Purchase'), ('booking', 'Booking'), ('refund', 'Refund')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('consultation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='point_transactions', to='consultations.consultationrequest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='consult_pointtx_user_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
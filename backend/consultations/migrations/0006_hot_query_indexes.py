@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0005_pointtransaction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['lawyer', 'created_at', 'id'], name='consult_req_lawyer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['client', 'created_at', 'id'], name='consult_req_client_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from users.models import User
+from .transitions import record_transition
 
 class ConsultationRequest(models.Model):
     STATUS_CHOICES = [
@@ -19,12 +20,76 @@ class ConsultationRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Dashboards list one side's consultations newest first.
+        indexes = [
+            models.Index(fields=['lawyer', 'created_at', 'id'], name='consult_req_lawyer_idx'),
+            models.Index(fields=['client', 'created_at', 'id'], name='consult_req_client_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.status})"
 
+    # The status as last read from or written to the DB, so a save can tell
+    # whether it's a real transition without re-fetching the row. DEFERRED
+    # when the instance was loaded without it.
+    _loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status', models.DEFERRED)
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_status = self.__dict__.get('status', models.DEFERRED)
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        previous_status = self._loaded_status
+        if previous_status is models.DEFERRED and 'status' in self.__dict__:
+            # Loaded without status and assigned since: compare with the row.
+            previous_status = (
+                type(self)._base_manager.using(self._state.db)
+                .filter(pk=self.pk).values_list('status', flat=True).first()
+            )
+        super().save(*args, **kwargs)
+        if 'status' not in self.__dict__:
+            # Still deferred, so this save didn't write it.
+            return
+        self._loaded_status = self.status
+        record_transition(self, previous_status, created)
+
 class ConsultationPoint(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='consultation_points')
     balance = models.IntegerField(default=0)
 
     def __str__(self):
-        return f"{self.user.email} - {self.balance} CP"
\ No newline at end of file
+        return f"{self.user.email} - {self.balance} CP"
+
+class PointTransaction(models.Model):
+    # Append-only ledger behind ConsultationPoint.balance. Rows are only ever
+    # written by consultations.ledger alongside the matching balance update.
+    REASON_CHOICES = [
+        ('opening', 'Opening balance'),
+        ('purchase', 'Purchase'),
+        ('booking', 'Booking'),
+        ('refund', 'Refund'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='point_transactions')
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    consultation = models.ForeignKey(
+        ConsultationRequest, on_delete=models.SET_NULL, null=True, blank=True, related_name='point_transactions'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='consult_pointtx_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} {self.amount:+d} CP ({self.reason})"
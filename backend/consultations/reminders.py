@@ -0,0 +1,187 @@
+import heapq
+import logging
+import threading
+from datetime import timedelta
+from django.db import close_old_connections, transaction
+from django.utils.timezone import now, localtime
+from chat.models import MeetingSchedule
+from users.models import Notification
+from users.display_names import display_name
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LEAD = timedelta(minutes=30)
+POLL_LAG = timedelta(minutes=2)
+RECHECK_INTERVAL = timedelta(minutes=1)
+
+PARTICIPANTS = (
+    'consultation__client__clientprofile',
+    'consultation__client__lawyerprofile',
+    'consultation__lawyer__lawyerprofile',
+    'consultation__lawyer__clientprofile',
+)
+
+
+def build_reminders(meeting):
+    consultation = meeting.consultation
+    formatted = localtime(meeting.scheduled_time).strftime('%I:%M %p')
+    lawyer_name = display_name(consultation.lawyer) or consultation.lawyer.email
+    client_name = display_name(consultation.client) or consultation.client.email
+
+    return [
+        Notification(
+            user=consultation.client,
+            message=f"Reminder: Your consultation with {lawyer_name} is at {formatted}.",
+            status='info'
+        ),
+        Notification(
+            user=consultation.lawyer,
+            message=f"Reminder: You have a consultation with {client_name} at {formatted}.",
+            status='info'
+        ),
+    ]
+
+
+def send_reminders(meetings):
+    # Notifications and the reminder_sent flag land together, so a crash
+    # mid-batch neither loses nor duplicates reminders.
+    notifications = [n for meeting in meetings for n in build_reminders(meeting)]
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications)
+        MeetingSchedule.objects.filter(id__in=[m.id for m in meetings]).update(reminder_sent=True)
+    return len(notifications)
+
+
+class ReminderScheduler:
+    """
+    Fires each meeting's reminder at scheduled_time - 30 minutes.
+
+    Pending meetings are loaded once, then kept in a min-heap keyed on fire
+    time. New or moved meetings arrive from a cheap ``updated_at`` poll, so
+    each tick only reads recently changed rows. The poll re-reads a
+    ``poll_lag`` window behind its watermark: a transaction that commits
+    late can carry an updated_at older than rows already seen.
+
+    Meetings whose consultation isn't accepted when their reminder is due
+    are checked again every ``recheck_interval`` until they start, since a
+    status change doesn't touch the meeting row.
+    """
+
+    def __init__(self, poll_interval=5.0, lead=REMINDER_LEAD, poll_lag=POLL_LAG, recheck_interval=RECHECK_INTERVAL):
+        self.poll_interval = poll_interval
+        self.lead = lead
+        self.poll_lag = poll_lag
+        self.recheck_interval = recheck_interval
+        self._heap = []
+        self._pending = {}  # meeting id -> scheduled_time currently queued
+        self._watermark = None
+        self._wake = threading.Condition()
+        self._stopped = False
+        self.sent = 0
+
+    # -- queue maintenance -------------------------------------------------
+
+    def schedule(self, meeting_id, scheduled_time):
+        with self._wake:
+            if self._pending.get(meeting_id) == scheduled_time:
+                return
+            self._pending[meeting_id] = scheduled_time
+            heapq.heappush(self._heap, (scheduled_time - self.lead, meeting_id, scheduled_time))
+            self._wake.notify()
+
+    def load(self):
+        self._watermark = now()
+        pending = MeetingSchedule.objects.filter(
+            reminder_sent=False, scheduled_time__gt=self._watermark,
+        ).values_list('id', 'scheduled_time')
+        for meeting_id, scheduled_time in pending:
+            self.schedule(meeting_id, scheduled_time)
+
+    def poll_changes(self):
+        # Rows already queued come back while they're inside the lag window;
+        # schedule() ignores them unless their time changed.
+        changed = MeetingSchedule.objects.filter(
+            updated_at__gte=self._watermark - self.poll_lag, reminder_sent=False, scheduled_time__gt=now(),
+        ).values_list('id', 'scheduled_time', 'updated_at')
+        for meeting_id, scheduled_time, updated_at in changed:
+            self._watermark = max(self._watermark, updated_at)
+            self.schedule(meeting_id, scheduled_time)
+
+    def _recheck(self, meeting_id, scheduled_time):
+        retry_at = now() + self.recheck_interval
+        if retry_at >= scheduled_time:
+            return
+        with self._wake:
+            if meeting_id not in self._pending:
+                self._pending[meeting_id] = scheduled_time
+                heapq.heappush(self._heap, (retry_at, meeting_id, scheduled_time))
+
+    def _pop_due(self, current):
+        due = []
+        with self._wake:
+            while self._heap and self._heap[0][0] <= current:
+                _, meeting_id, scheduled_time = heapq.heappop(self._heap)
+                # Moved meetings leave their old entry behind; skip it.
+                if self._pending.get(meeting_id) == scheduled_time:
+                    del self._pending[meeting_id]
+                    due.append((meeting_id, scheduled_time))
+        return due
+
+    # -- delivery ------------------------------------------------------------
+
+    def fire(self, due):
+        for meeting_id, scheduled_time in due:
+            meeting = MeetingSchedule.objects.select_related(*PARTICIPANTS).filter(
+                id=meeting_id, scheduled_time=scheduled_time, reminder_sent=False,
+            ).first()
+            if meeting is None:
+                continue
+            if meeting.consultation.status != 'accepted':
+                self._recheck(meeting_id, scheduled_time)
+                continue
+            # reminder_sent is the idempotency key: another runner (or the
+            # send_reminders command) may already have delivered this one.
+            if self._claim(meeting):
+                self.sent += 1
+
+    def _claim(self, meeting):
+        with transaction.atomic():
+            claimed = MeetingSchedule.objects.filter(
+                id=meeting.id, reminder_sent=False, scheduled_time=meeting.scheduled_time,
+            ).update(reminder_sent=True)
+            if claimed:
+                Notification.objects.bulk_create(build_reminders(meeting))
+        return bool(claimed)
+
+    # -- main loop -------------------------------------------------------------
+
+    def tick(self):
+        self.poll_changes()
+        due = self._pop_due(now())
+        if due:
+            self.fire(due)
+
+    def seconds_until_next(self):
+        with self._wake:
+            if not self._heap:
+                return self.poll_interval
+            wait = (self._heap[0][0] - now()).total_seconds()
+        return max(0.0, min(wait, self.poll_interval))
+
+    def run_forever(self):
+        self.load()
+        while not self._stopped:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Reminder scheduler tick failed")
+            finally:
+                close_old_connections()
+            with self._wake:
+                if not self._stopped:
+                    self._wake.wait(self.seconds_until_next())
+
+    def stop(self):
+        with self._wake:
+            self._stopped = True
+            self._wake.notify()
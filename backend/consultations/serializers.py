@@ -2,6 +2,8 @@ from rest_framework import serializers
 from .models import ConsultationRequest, ConsultationPoint
 from users.models import ClientProfile
 from users.models import Notification
+from users.display_names import display_name
+from core.serialization import FastSerializer
 
 class ConsultationRequestSerializer(serializers.ModelSerializer):
     client_name = serializers.SerializerMethodField()
@@ -13,17 +15,30 @@ class ConsultationRequestSerializer(serializers.ModelSerializer):
         exclude = ['client', 'accepted_time', 'created_at', 'updated_at']
 
     def get_client_name(self, obj):
-       if hasattr(obj.client, 'clientprofile'):
-        return obj.client.clientprofile.full_name
-        return ''
+        return display_name(obj.client) or ''
 
     def get_client_email(self, obj):
         return obj.client.email
     
     def get_lawyer_name(self, obj):
-        if hasattr(obj.lawyer, 'lawyerprofile'):
-            return obj.lawyer.lawyerprofile.full_name
-        return obj.lawyer.email
+        return display_name(obj.lawyer) or obj.lawyer.email
+
+class ConsultationRequestFastSerializer(FastSerializer):
+    # ConsultationRequestSerializer's output for list endpoints.
+
+    def to_representation(self, obj):
+        client, lawyer = obj.client, obj.lawyer
+        return {
+            'id': obj.id,
+            'client_name': display_name(client) or '',
+            'client_email': client.email,
+            'lawyer_name': display_name(lawyer) or lawyer.email,
+            'title': obj.title,
+            'case_type': obj.case_type,
+            'status': obj.status,
+            'requested_time': self.datetime(obj.requested_time),
+            'lawyer': obj.lawyer_id,
+        }
 
 class ConsultationPointSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
@@ -36,3 +51,16 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
+
+class NotificationFastSerializer(FastSerializer):
+    # NotificationSerializer's output for list endpoints.
+
+    def to_representation(self, obj):
+        return {
+            'id': obj.id,
+            'message': obj.message,
+            'status': obj.status,
+            'timestamp': self.datetime(obj.timestamp),
+            'read': obj.read,
+            'user': obj.user_id,
+        }
@@ -1,3 +1,612 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection, close_old_connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.models import User, ClientProfile, LawyerProfile, Notification, NotificationOutbox
+from users.notifications import NotificationDispatcher
+from chat.models import MeetingSchedule
+from .models import ConsultationRequest, ConsultationPoint, PointTransaction
+from . import ledger
+from .reminders import ReminderScheduler
 
-# Create your tests here.
+
+def make_participants(prefix=''):
+    client = User.objects.create_user(f'{prefix}client@example.com', 'pw', role='client')
+    ClientProfile.objects.create(user=client, full_name='Client', phone_number='1', nic_number='1')
+    lawyer = User.objects.create_user(f'{prefix}lawyer@example.com', 'pw', role='lawyer')
+    profile = LawyerProfile.objects.create(
+        user=lawyer, full_name='Lawyer', phone_number='1', nic_number='1',
+        expertise='civil', location='Colombo', approved=True,
+    )
+    return client, lawyer, profile
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.client_user, self.lawyer_user, self.lawyer_profile = make_participants()
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def book(self):
+        return self.api.post('/api/consultations/create/', {
+            'lawyer': self.lawyer_profile.id, 'title': 'Case', 'case_type': 'civil',
+            'requested_time': timezone.now().isoformat(),
+        })
+
+    def test_booking_debits_and_records_transaction(self):
+        ledger.credit(self.client_user, 2, 'purchase')
+        response = self.book()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ledger.balance(self.client_user), 1)
+        tx = PointTransaction.objects.get(reason='booking')
+        self.assertEqual(tx.amount, -1)
+        self.assertEqual(tx.consultation_id, response.json()['id'])
+
+    def test_booking_without_points_leaves_nothing_behind(self):
+        response = self.book()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cp', response.json())
+        self.assertFalse(ConsultationRequest.objects.exists())
+        self.assertEqual(ledger.balance(self.client_user), 0)
+
+    def test_rejection_refunds_once(self):
+        ledger.credit(self.client_user, 1, 'purchase')
+        consultation_id = self.book().json()['id']
+
+        lawyer_api = APIClient()
+        lawyer_api.force_authenticate(self.lawyer_user)
+        url = f'/api/consultations/update/{consultation_id}/'
+        lawyer_api.patch(url, {'status': 'rejected'})
+        lawyer_api.patch(url, {'status': 'rejected'})
+
+        self.assertEqual(ledger.balance(self.client_user), 1)
+        self.assertEqual(PointTransaction.objects.filter(reason='refund').count(), 1)
+
+    def test_purchase_endpoint_credits_ten(self):
+        response = self.api.post('/api/consultations/points/')
+        self.assertEqual(response.json()['balance'], 10)
+
+    def test_admin_cannot_edit_the_ledger(self):
+        tx = ledger.credit(self.client_user, 1, 'purchase')
+        admin_user = User.objects.create_superuser('admin@example.com', 'pw', role='admin')
+        self.client.force_login(admin_user)
+
+        self.assertEqual(self.client.get(f'/admin/consultations/pointtransaction/{tx.id}/change/').status_code, 200)
+        self.assertEqual(self.client.get('/admin/consultations/pointtransaction/add/').status_code, 403)
+        self.client.post(f'/admin/consultations/pointtransaction/{tx.id}/change/', {'amount': 100})
+        self.client.post(f'/admin/consultations/pointtransaction/{tx.id}/delete/', {'post': 'yes'})
+        tx.refresh_from_db()
+        self.assertEqual(tx.amount, 1)
+
+        point = ConsultationPoint.objects.get(user=self.client_user)
+        self.client.post(f'/admin/consultations/consultationpoint/{point.id}/change/',
+                         {'user': self.client_user.id, 'balance': 100})
+        self.assertEqual(ledger.balance(self.client_user), 1)
+
+
+@override_settings(NOTIFICATION_PIPELINE={'MODE': 'sync'})
+class LedgerConcurrencyTests(TransactionTestCase):
+    workers = 16
+    attempts_per_worker = 25
+    # Bookings per second the endpoint must sustain under contention. Set
+    # well below the ~55/s SQLite manages here so only a real serialization
+    # regression (e.g. a table lock around each booking) trips it.
+    min_booking_throughput = 10
+    # The create endpoint validates `lawyer` as a user id before looking it
+    # up as a profile id, so the bookings need ids that start from 1 as
+    # they do in LedgerTests.
+    reset_sequences = True
+
+    def test_parallel_debits_never_overdraw(self):
+        client_user, _, _ = make_participants('stress-')
+        starting_balance = 150
+        ledger.credit(client_user, starting_balance, 'purchase')
+
+        successes = []
+        refusals = []
+        barrier = threading.Barrier(self.workers)
+
+        def worker():
+            barrier.wait()
+            won = refused = 0
+            try:
+                for _ in range(self.attempts_per_worker):
+                    try:
+                        ledger.debit(client_user, 1, 'booking')
+                        won += 1
+                    except ledger.InsufficientPoints:
+                        refused += 1
+            finally:
+                successes.append(won)
+                refusals.append(refused)
+                close_old_connections()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Every attempt either debited or was refused; none errored out.
+        attempts = self.workers * self.attempts_per_worker
+        self.assertEqual(len(successes), self.workers)
+        self.assertEqual(sum(refusals), attempts - starting_balance)
+        self.assertEqual(sum(successes), starting_balance)
+        self.assertEqual(ConsultationPoint.objects.get(user=client_user).balance, 0)
+        self.assertEqual(
+            PointTransaction.objects.filter(user=client_user, reason='booking').count(), starting_balance
+        )
+
+    def test_parallel_bookings_through_the_endpoint(self):
+        client_user, _, profile = make_participants('booking-')
+        starting_balance = 60
+        ledger.credit(client_user, starting_balance, 'purchase')
+        workers, attempts_per_worker = 8, 10
+        statuses = []
+        barrier = threading.Barrier(workers)
+
+        def worker():
+            api = APIClient()
+            api.force_authenticate(client_user)
+            barrier.wait()
+            seen = []
+            try:
+                for i in range(attempts_per_worker):
+                    seen.append(api.post('/api/consultations/create/', {
+                        'lawyer': profile.id, 'title': f'Case {i}', 'case_type': 'civil',
+                        'requested_time': timezone.now().isoformat(),
+                    }).status_code)
+            finally:
+                statuses.extend(seen)
+                close_old_connections()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        # Exactly the balance's worth of bookings went through; the rest were
+        # refused for lack of points and rolled back with their debit.
+        attempts = workers * attempts_per_worker
+        self.assertEqual(sorted(set(statuses)), [201, 400])
+        self.assertEqual(statuses.count(201), starting_balance)
+        self.assertEqual(statuses.count(400), attempts - starting_balance)
+        self.assertEqual(ConsultationPoint.objects.get(user=client_user).balance, 0)
+        self.assertEqual(ConsultationRequest.objects.filter(client=client_user).count(), starting_balance)
+        self.assertEqual(
+            PointTransaction.objects.filter(user=client_user, reason='booking').count(), starting_balance
+        )
+        self.assertGreater(attempts / elapsed, self.min_booking_throughput)
+
+
+class SendRemindersTests(TestCase):
+    def setUp(self):
+        self.client_user, self.lawyer_user, _ = make_participants()
+
+    def add_meetings(self, count, minutes=30):
+        for _ in range(count):
+            consultation = ConsultationRequest.objects.create(
+                client=self.client_user, lawyer=self.lawyer_user, title='Case',
+                case_type='civil', requested_time=timezone.now(), status='accepted',
+            )
+            MeetingSchedule.objects.create(
+                consultation=consultation, created_by=self.lawyer_user,
+                scheduled_time=timezone.now() + timedelta(minutes=minutes),
+            )
+
+    def run_command(self, batch_size):
+        Notification.objects.all().delete()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('send_reminders', batch_size=batch_size, stdout=StringIO())
+        return len(ctx.captured_queries)
+
+    def test_sends_two_notifications_per_meeting_once(self):
+        self.add_meetings(3)
+        self.add_meetings(1, minutes=120)
+        self.run_command(batch_size=500)
+
+        self.assertEqual(Notification.objects.count(), 6)
+        self.assertEqual(MeetingSchedule.objects.filter(reminder_sent=True).count(), 3)
+
+        self.run_command(batch_size=500)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    def test_query_count_depends_on_batches_not_meetings(self):
+        self.add_meetings(2)
+        small = self.run_command(batch_size=500)
+
+        MeetingSchedule.objects.update(reminder_sent=False)
+        self.add_meetings(20)
+        large = self.run_command(batch_size=500)
+
+        self.assertEqual(small, large)
+
+
+class ReminderSchedulerTests(TestCase):
+    def setUp(self):
+        self.client_user, self.lawyer_user, _ = make_participants()
+        self.scheduler = ReminderScheduler()
+
+    def add_meeting(self, minutes):
+        consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case',
+            case_type='civil', requested_time=timezone.now(), status='accepted',
+        )
+        return MeetingSchedule.objects.create(
+            consultation=consultation, created_by=self.lawyer_user,
+            scheduled_time=timezone.now() + timedelta(minutes=minutes),
+        )
+
+    def reminders(self):
+        return Notification.objects.filter(message__startswith='Reminder').count()
+
+    def test_fires_due_meetings_once(self):
+        self.add_meeting(20)
+        self.add_meeting(120)
+        self.scheduler.load()
+
+        self.scheduler.tick()
+        self.scheduler.tick()
+
+        self.assertEqual(self.reminders(), 2)
+        self.assertEqual(self.scheduler.sent, 1)
+        self.assertEqual(len(self.scheduler._heap), 1)
+
+    def test_moved_meeting_is_picked_up_by_poll(self):
+        meeting = self.add_meeting(120)
+        self.scheduler.load()
+        self.scheduler.tick()
+        self.assertEqual(self.reminders(), 0)
+
+        meeting.scheduled_time = timezone.now() + timedelta(minutes=15)
+        meeting.save()
+        self.scheduler.tick()
+
+        self.assertEqual(self.reminders(), 2)
+        meeting.refresh_from_db()
+        self.assertTrue(meeting.reminder_sent)
+
+    def test_idle_tick_is_a_single_query(self):
+        self.add_meeting(120)
+        self.scheduler.load()
+        with self.assertNumQueries(1):
+            self.scheduler.tick()
+
+    def test_already_delivered_meeting_is_skipped(self):
+        meeting = self.add_meeting(20)
+        self.scheduler.load()
+        MeetingSchedule.objects.filter(pk=meeting.pk).update(reminder_sent=True)
+
+        self.scheduler.tick()
+        self.assertEqual(self.reminders(), 0)
+
+    def test_late_commit_behind_the_watermark_is_picked_up(self):
+        self.scheduler.load()
+        self.add_meeting(120)
+        self.scheduler.tick()
+        # Committed after that poll, but stamped before the newest row it saw.
+        late = self.add_meeting(15)
+        MeetingSchedule.objects.filter(pk=late.pk).update(
+            updated_at=self.scheduler._watermark - timedelta(seconds=30),
+        )
+
+        self.scheduler.tick()
+        self.assertEqual(self.reminders(), 2)
+        late.refresh_from_db()
+        self.assertTrue(late.reminder_sent)
+
+    def test_lag_window_does_not_requeue(self):
+        self.add_meeting(120)
+        self.scheduler.load()
+        self.scheduler.tick()
+        self.scheduler.tick()
+        self.assertEqual(len(self.scheduler._heap), 1)
+
+    def test_meeting_accepted_after_its_reminder_time_is_rechecked(self):
+        meeting = self.add_meeting(20)
+        ConsultationRequest.objects.filter(pk=meeting.consultation_id).update(status='pending')
+        self.scheduler.load()
+
+        self.scheduler.tick()
+        self.assertEqual(self.reminders(), 0)
+        self.assertIn(meeting.id, self.scheduler._pending)
+
+        ConsultationRequest.objects.filter(pk=meeting.consultation_id).update(status='accepted')
+        with mock.patch('consultations.reminders.now', return_value=timezone.now() + timedelta(minutes=2)):
+            self.scheduler.tick()
+        self.assertEqual(self.reminders(), 2)
+        self.assertEqual(self.scheduler.sent, 1)
+
+    def test_recheck_stops_once_the_meeting_starts(self):
+        meeting = self.add_meeting(20)
+        ConsultationRequest.objects.filter(pk=meeting.consultation_id).update(status='pending')
+        self.scheduler.load()
+        self.scheduler.tick()
+
+        with mock.patch('consultations.reminders.now', return_value=timezone.now() + timedelta(minutes=25)):
+            self.scheduler.tick()
+        self.assertNotIn(meeting.id, self.scheduler._pending)
+        self.assertEqual(self.reminders(), 0)
+
+
+@override_settings(NOTIFICATION_PIPELINE={'MODE': 'sync'})
+class StatusTransitionTests(TestCase):
+    def setUp(self):
+        self.client_user, self.lawyer_user, _ = make_participants()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.consultation = ConsultationRequest.objects.create(
+                client=self.client_user, lawyer=self.lawyer_user, title='Case',
+                case_type='civil', requested_time=timezone.now(),
+            )
+
+    def test_create_notifies_lawyer(self):
+        notification = Notification.objects.get(user=self.lawyer_user)
+        self.assertEqual(notification.message, 'New consultation request from Client.')
+
+    def test_save_without_status_change_is_a_single_write(self):
+        consultation = ConsultationRequest.objects.get(pk=self.consultation.pk)
+        consultation.title = 'Renamed'
+        with self.assertNumQueries(1):
+            consultation.save()
+
+    def test_real_transition_notifies_client(self):
+        consultation = ConsultationRequest.objects.select_related('client', 'lawyer').get(pk=self.consultation.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            consultation.status = 'accepted'
+            consultation.save()
+            consultation.save()
+
+        messages = list(Notification.objects.filter(user=self.client_user).values_list('message', flat=True))
+        self.assertEqual(messages, ['Your consultation with Lawyer was accepted.'])
+
+    def test_notifications_in_one_transaction_go_out_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            created = [
+                ConsultationRequest.objects.create(
+                    client=self.client_user, lawyer=self.lawyer_user, title='Case',
+                    case_type='civil', requested_time=timezone.now(),
+                )
+                for _ in range(3)
+            ]
+        others = list(ConsultationRequest.objects.filter(pk__in=[c.pk for c in created]))
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for consultation in others:
+                    consultation.status = 'rejected'
+                    consultation.save()
+        self.assertFalse(Notification.objects.filter(status='danger').exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(Notification.objects.filter(status='danger').count(), 3)
+
+    def test_rolled_back_transition_sends_nothing(self):
+        Notification.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.consultation.status = 'accepted'
+                    self.consultation.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(Notification.objects.exists())
+
+    def test_save_with_status_deferred_is_not_a_transition(self):
+        Notification.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            consultation = ConsultationRequest.objects.only('id', 'title').get(pk=self.consultation.pk)
+            consultation.title = 'Renamed'
+            consultation.save()
+            consultation = ConsultationRequest.objects.defer('status').get(pk=self.consultation.pk)
+            consultation.save()
+        self.assertFalse(Notification.objects.exists())
+
+    def test_deferred_status_is_compared_with_the_row(self):
+        ConsultationRequest.objects.filter(pk=self.consultation.pk).update(status='accepted')
+        Notification.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            consultation = ConsultationRequest.objects.defer('status').get(pk=self.consultation.pk)
+            consultation.status = 'accepted'
+            consultation.save()
+        self.assertFalse(Notification.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            consultation = ConsultationRequest.objects.defer('status').get(pk=self.consultation.pk)
+            consultation.status = 'rejected'
+            consultation.save()
+        messages = list(Notification.objects.values_list('message', flat=True))
+        self.assertEqual(messages, ['Your consultation with Lawyer was rejected.'])
+
+    @override_settings(NOTIFICATION_PIPELINE={'MODE': 'async', 'DURABLE': True})
+    def test_durable_notification_survives_a_crash_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                self.consultation.status = 'accepted'
+                self.consultation.save()
+        # The outbox row committed with the status change. The request dies
+        # before its on_commit wake-up runs, so no callbacks are executed.
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+        # A worker in the next process replays it.
+        self.assertEqual(NotificationDispatcher(workers=0).drain_outbox(), 1)
+        messages = list(Notification.objects.filter(user=self.client_user).values_list('message', flat=True))
+        self.assertEqual(messages, ['Your consultation with Lawyer was accepted.'])
+
+    @override_settings(NOTIFICATION_PIPELINE={'MODE': 'async', 'DURABLE': True})
+    def test_durable_outbox_rows_roll_back_with_the_transition(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    self.consultation.status = 'accepted'
+                    self.consultation.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_rolled_back_savepoint_drops_only_its_transitions(self):
+        Notification.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            other = ConsultationRequest.objects.create(
+                client=self.client_user, lawyer=self.lawyer_user, title='Other',
+                case_type='civil', requested_time=timezone.now(),
+            )
+        Notification.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.consultation.status = 'accepted'
+                self.consultation.save()
+                try:
+                    with transaction.atomic():
+                        other.status = 'rejected'
+                        other.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+
+        self.assertEqual(
+            list(Notification.objects.values_list('message', flat=True)),
+            ['Your consultation with Lawyer was accepted.'],
+        )
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ConsultationListTests(TestCase):
+    def setUp(self):
+        self.client_user, self.lawyer_user, _ = make_participants()
+        self.api = APIClient()
+        self.api.force_authenticate(self.lawyer_user)
+
+    def add_consultations(self, count, status='pending', prefix='c'):
+        for i in range(count):
+            client = User.objects.create_user(f'{prefix}{i}@example.com', 'pw', role='client')
+            ClientProfile.objects.create(user=client, full_name=f'Client {i}', phone_number='1', nic_number='1')
+            ConsultationRequest.objects.create(
+                client=client, lawyer=self.lawyer_user, title='Case', case_type='civil',
+                requested_time=timezone.now(), status=status,
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_consultations(2, prefix='a')
+        few = self.count_queries('/api/consultations/lawyer/')
+        self.add_consultations(10, prefix='b')
+        self.assertEqual(self.count_queries('/api/consultations/lawyer/'), few)
+
+    def test_pages_follow_the_cursor(self):
+        self.add_consultations(5)
+        first = self.api.get('/api/consultations/lawyer/?limit=3').json()
+        self.assertEqual(len(first['results']), 3)
+        second = self.api.get(first['next']).json()
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['next'])
+        ids = [c['id'] for c in first['results'] + second['results']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_filters_by_status_and_creation_time(self):
+        self.add_consultations(2, status='pending', prefix='p')
+        self.add_consultations(1, status='rejected', prefix='r')
+        response = self.api.get('/api/consultations/lawyer/?status=pending,accepted')
+        self.assertEqual({c['status'] for c in response.json()['results']}, {'pending'})
+        self.assertEqual(len(response.json()['results']), 2)
+
+        cutoff = (timezone.now() + timedelta(minutes=1)).isoformat()
+        response = self.api.get('/api/consultations/lawyer/', {'created_after': cutoff})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_rejects_unknown_status(self):
+        response = self.api.get('/api/consultations/lawyer/?status=archived')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.json())
+
+    def test_client_sees_only_their_own(self):
+        self.add_consultations(2)
+        self.api.force_authenticate(self.client_user)
+        self.assertEqual(self.api.get('/api/consultations/client/').json()['results'], [])
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class NotificationFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('client@example.com', 'pw', role='client')
+        self.other = User.objects.create_user('other@example.com', 'pw', role='client')
+        self.start = timezone.now() - timedelta(hours=1)
+        # Oldest first; the even ones are already read.
+        self.notifications = [self.add(self.user, i, read=i % 2 == 0) for i in range(6)]
+        self.add(self.other, 0)
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def add(self, user, minute, read=False):
+        notification = Notification.objects.create(user=user, message=f'n{minute}', status='info', read=read)
+        Notification.objects.filter(id=notification.id).update(timestamp=self.start + timedelta(minutes=minute))
+        notification.refresh_from_db()
+        return notification
+
+    def ids(self, params=None):
+        response = self.api.get('/api/consultations/notifications/', params or {})
+        self.assertEqual(response.status_code, 200)
+        return [n['id'] for n in response.json()['results']]
+
+    def unread_count(self):
+        response = self.api.get('/api/consultations/notifications/unread-count/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['unread']
+
+    def test_feed_is_newest_first_and_own_only(self):
+        self.assertEqual(self.ids(), [n.id for n in reversed(self.notifications)])
+
+    def test_since_returns_only_newer(self):
+        since = self.notifications[3].timestamp.isoformat()
+        self.assertEqual(self.ids({'since': since}), [self.notifications[5].id, self.notifications[4].id])
+
+    def test_since_must_be_a_datetime(self):
+        response = self.api.get('/api/consultations/notifications/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unread_filter(self):
+        unread = [n.id for n in reversed(self.notifications) if not n.read]
+        self.assertEqual(self.ids({'unread': '1'}), unread)
+        self.assertEqual(self.ids({'unread': 'true'}), unread)
+
+    def test_unread_count(self):
+        self.assertEqual(self.unread_count(), 3)
+
+    def test_mark_read_up_to(self):
+        response = self.api.post('/api/consultations/notifications/mark-read/',
+                                 {'up_to': self.notifications[3].id}, format='json')
+        self.assertEqual(response.json(), {'updated': 2})
+        self.assertEqual(self.unread_count(), 1)
+        self.assertFalse(Notification.objects.get(id=self.notifications[5].id).read)
+
+    def test_mark_read_everything(self):
+        response = self.api.post('/api/consultations/notifications/mark-read/', {}, format='json')
+        self.assertEqual(response.json(), {'updated': 3})
+        self.assertEqual(self.unread_count(), 0)
+        self.assertFalse(Notification.objects.get(user=self.other).read)
+
+    def test_mark_read_rejects_another_users_notification(self):
+        foreign = Notification.objects.get(user=self.other)
+        response = self.api.post('/api/consultations/notifications/mark-read/', {'up_to': foreign.id}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.unread_count(), 3)
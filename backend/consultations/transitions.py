@@ -0,0 +1,50 @@
+from users.models import Notification
+from users.display_names import display_name
+from users.notifications import dispatch_on_commit
+
+# (recipient field, message template, notification status) per new status.
+# Templates get the *other* participant's display name as {name}.
+TRANSITIONS = {
+    None: ('lawyer', "New consultation request from {name}.", 'info'),
+    'accepted': ('client', "Your consultation with {name} was accepted.", 'success'),
+    'rejected': ('client', "Your consultation with {name} was rejected.", 'danger'),
+}
+
+
+def _participant_name(consultation, field):
+    user = getattr(consultation, field)
+    return display_name(user) or user.email
+
+
+def notifications_for(consultation, previous_status, created):
+    """Notifications owed for a consultation moving from previous_status to its current status."""
+    if created:
+        key = None
+    elif previous_status != consultation.status:
+        key = consultation.status
+    else:
+        return []
+
+    if key not in TRANSITIONS:
+        return []
+    recipient, template, level = TRANSITIONS[key]
+    other = 'client' if recipient == 'lawyer' else 'lawyer'
+    return [Notification(
+        user_id=getattr(consultation, f'{recipient}_id'),
+        message=template.format(name=_participant_name(consultation, other)),
+        status=level,
+    )]
+
+
+def record_transition(consultation, previous_status, created):
+    enqueue(notifications_for(consultation, previous_status, created))
+
+
+def enqueue(notifications):
+    """
+    Hand notifications to the dispatch pipeline as part of the surrounding
+    transaction, so those raised inside a savepoint that rolls back are
+    dropped with it. The pipeline's workers coalesce what they're handed
+    into bulk_create batches.
+    """
+    dispatch_on_commit(notifications)
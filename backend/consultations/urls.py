@@ -7,6 +7,8 @@ from .views import (
     ConsultationUpdateView,
     ConsultationDetailView,
     NotificationListView,
+    NotificationUnreadCountView,
+    NotificationMarkReadView,
 )
 
 urlpatterns = [
@@ -17,4 +19,6 @@ urlpatterns = [
     path('update/<int:pk>/', ConsultationUpdateView.as_view(), name='update-consultation'),
     path('details/<int:pk>/', ConsultationDetailView.as_view(), name='consultation-detail'),
     path('notifications/', NotificationListView.as_view()),
+    path('notifications/unread-count/', NotificationUnreadCountView.as_view(), name='notification-unread-count'),
+    path('notifications/mark-read/', NotificationMarkReadView.as_view(), name='notification-mark-read'),
 ]
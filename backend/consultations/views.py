@@ -4,13 +4,20 @@ from rest_framework.views import APIView
 from rest_framework.generics import UpdateAPIView, RetrieveAPIView
 from rest_framework.exceptions import ValidationError
 from users.models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationSerializer, NotificationFastSerializer
 from rest_framework.generics import ListAPIView
+from rest_framework.pagination import CursorPagination
 from .models import ConsultationRequest, ConsultationPoint
-from .serializers import ConsultationRequestSerializer, ConsultationPointSerializer
+from .serializers import ConsultationRequestSerializer, ConsultationRequestFastSerializer, ConsultationPointSerializer
+from . import ledger
+from core.db.routers import ReadReplicaMixin
+from core.serialization import FastListMixin
 from users.models import LawyerProfile
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 User = get_user_model()
 
@@ -28,28 +35,57 @@ class ConsultationRequestCreateView(generics.CreateAPIView):
         except LawyerProfile.DoesNotExist:
             raise serializers.ValidationError({"lawyer": "Invalid lawyer ID"})
 
-        cp, _ = ConsultationPoint.objects.get_or_create(user=client_user)
-        if cp.balance < 1:
-            raise ValidationError({"cp": "Not enough Consultation Points to book"})
-        
-        cp.balance -= 1
-        cp.save()
+        # The booking and its debit commit or roll back together.
+        with transaction.atomic():
+            consultation = serializer.save(client=client_user, lawyer=lawyer_user)
+            ledger.debit(client_user, 1, 'booking', consultation=consultation)
 
-        serializer.save(client=client_user, lawyer=lawyer_user)
+class ConsultationCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
 
-class LawyerConsultationListView(generics.ListAPIView):
+class ConsultationListView(FastListMixin, ReadReplicaMixin, generics.ListAPIView):
+    # Newest first, a page at a time, walking consult_req_<side>_idx.
+    # Filters: status=pending,accepted and created_after/created_before.
     serializer_class = ConsultationRequestSerializer
+    fast_serializer_class = ConsultationRequestFastSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ConsultationCursorPagination
+    side = None
 
     def get_queryset(self):
-        return ConsultationRequest.objects.filter(lawyer=self.request.user).select_related('client')
-
-class ClientConsultationListView(generics.ListAPIView):
-    serializer_class = ConsultationRequestSerializer
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get_queryset(self):
-        return ConsultationRequest.objects.filter(client=self.request.user)
+        # Both participants and their profiles come back in the one query,
+        # which is everything ConsultationRequestSerializer reads.
+        queryset = ConsultationRequest.objects.filter(**{self.side: self.request.user}).select_related(
+            'client', 'lawyer', 'client__clientprofile', 'lawyer__lawyerprofile'
+        )
+        params = self.request.query_params
+
+        status_param = params.get('status')
+        if status_param:
+            statuses = [s for s in status_param.split(',') if s]
+            valid = dict(ConsultationRequest.STATUS_CHOICES)
+            if any(s not in valid for s in statuses):
+                raise ValidationError({'status': f"Must be one of: {', '.join(valid)}."})
+            queryset = queryset.filter(status__in=statuses)
+
+        for param, lookup in (('created_after', 'created_at__gt'), ('created_before', 'created_at__lt')):
+            value = params.get(param)
+            if value:
+                parsed = parse_datetime(value)
+                if parsed is None:
+                    raise ValidationError({param: 'Invalid datetime.'})
+                queryset = queryset.filter(**{lookup: parsed})
+
+        return queryset
+
+class LawyerConsultationListView(ConsultationListView):
+    side = 'lawyer'
+
+class ClientConsultationListView(ConsultationListView):
+    side = 'client'
 
 class ConsultationPointView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -60,13 +96,11 @@ class ConsultationPointView(APIView):
         return Response(serializer.data)
 
     def post(self, request):
-        cp, _ = ConsultationPoint.objects.get_or_create(user=request.user)
-        cp.balance += 10
-        cp.save()
-        return Response({'message': 'CP added', 'balance': cp.balance})
+        ledger.credit(request.user, 10, 'purchase')
+        return Response({'message': 'CP added', 'balance': ledger.balance(request.user)})
 
 class ConsultationUpdateView(UpdateAPIView):
-    queryset = ConsultationRequest.objects.all()
+    queryset = ConsultationRequest.objects.select_related('client', 'lawyer')
     serializer_class = ConsultationRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -74,30 +108,75 @@ class ConsultationUpdateView(UpdateAPIView):
         instance = self.get_object()
         new_status = request.data.get('status')
 
-        if new_status == 'rejected' and instance.status != 'rejected':
-            # Refund CP to the client
-            cp, _ = ConsultationPoint.objects.get_or_create(user=instance.client)
-            cp.balance += 1
-            cp.save()
+        if new_status != 'rejected' or instance.status == 'rejected':
+            return super().patch(request, *args, **kwargs)
 
-        return super().patch(request, *args, **kwargs)
+        with transaction.atomic():
+            # Lock just this consultation so two concurrent rejections can't
+            # both refund.
+            locked = ConsultationRequest.objects.select_for_update().get(pk=instance.pk)
+            if locked.status != 'rejected':
+                ledger.credit(locked.client, 1, 'refund', consultation=locked)
+            return super().patch(request, *args, **kwargs)
 
 class ConsultationDetailView(RetrieveAPIView):
     queryset = ConsultationRequest.objects.all()
     serializer_class = ConsultationRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-# class NotificationListView(ListAPIView):
-#     serializer_class = NotificationSerializer
-#     permission_classes = [permissions.IsAuthenticated]
+class NotificationCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('-timestamp', '-id')
+
+class NotificationListView(FastListMixin, ReadReplicaMixin, ListAPIView):
+    # Newest first, one page at a time. `since` only returns notifications
+    # newer than the given timestamp; `unread=true` hides the read ones.
+    serializer_class = NotificationSerializer
+    fast_serializer_class = NotificationFastSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
-#     def get_queryset(self):
-#         return Notification.objects.filter(user=self.request.user).order_by('-created_at')
-    
-class NotificationListView(APIView):
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user)
+
+        since = self.request.query_params.get('since')
+        if since:
+            parsed = parse_datetime(since)
+            if parsed is None:
+                raise ValidationError({'since': 'Invalid datetime.'})
+            queryset = queryset.filter(timestamp__gt=parsed)
+
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(read=False)
+
+        return queryset
+
+class NotificationUnreadCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        notifications = Notification.objects.filter(user=request.user).order_by('-timestamp')
-        serializer = NotificationSerializer(notifications, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        unread = Notification.objects.filter(user=request.user, read=False).count()
+        return Response({'unread': unread})
+
+class NotificationMarkReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # Marks everything up to and including `up_to` (a notification id) as
+        # read, or all of the user's notifications if it's omitted.
+        queryset = Notification.objects.filter(user=request.user, read=False)
+        up_to = request.data.get('up_to')
+
+        if up_to is not None:
+            try:
+                cursor = Notification.objects.get(id=up_to, user=request.user)
+            except (Notification.DoesNotExist, ValueError, TypeError):
+                return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
+            queryset = queryset.filter(
+                Q(timestamp__lt=cursor.timestamp) | Q(timestamp=cursor.timestamp, id__lte=cursor.id)
+            )
+
+        updated = queryset.update(read=True)
+        return Response({'updated': updated})
@@ -0,0 +1,233 @@
+import json
+import math
+import platform
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+import django
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from consultations.models import ConsultationRequest
+from users.models import EXPERTISE_CHOICES, LawyerProfile, User
+from .seeding import PASSWORD, Seeder
+
+
+class Dataset:
+    """Ids and credentials of the seeded rows the scenarios pick from."""
+
+    def __init__(self, clients, lawyers, consultations):
+        self.clients = clients              # [(user_id, email, token)]
+        self.lawyers = lawyers              # [(user_id, profile_id)]
+        self.consultations = consultations  # [(consultation_id, client_token)]
+
+
+def seed(clients=200, lawyers=50, consultations_per_client=3, messages_per_consultation=50,
+         notifications_per_client=30, random_seed=1):
+    """
+    Write a reproducible dataset through core.seeding: every consultation
+    accepted and every lawyer approved, so all scenarios have something to
+    hit, and enough points that consultations/create/ never runs out.
+    """
+    Seeder(prefix='bench', random_seed=random_seed, days=30).seed(
+        clients=clients, lawyers=lawyers,
+        consultations=consultations_per_client, consultation_distribution='fixed',
+        messages=messages_per_consultation, message_distribution='fixed',
+        notifications=notifications_per_client, notification_distribution='fixed',
+        meeting_ratio=0, approved_ratio=1, status_weights={'accepted': 1}, points=(10 ** 6, 10 ** 6),
+    )
+    users = User.objects.filter(email__startswith='bench-').order_by('id')
+    tokens = dict(Token.objects.filter(user__in=users).values_list('user_id', 'key'))
+    clients = users.filter(role='client').values_list('id', 'email')
+    profiles = LawyerProfile.objects.filter(user__in=users).order_by('id').values_list('user_id', 'id')
+    consultations = ConsultationRequest.objects.filter(client__in=users).order_by('id').values_list('id', 'client_id')
+    return Dataset(
+        clients=[(pk, email, tokens[pk]) for pk, email in clients],
+        lawyers=list(profiles),
+        consultations=[(pk, tokens[client_id]) for pk, client_id in consultations],
+    )
+
+
+# Each scenario turns (dataset, rng, request number) into
+# (method, path, data, token, extra request headers).
+
+def _login(dataset, rng, i):
+    _, email, _ = rng.choice(dataset.clients)
+    # A different address per request, like real traffic, so the per-IP
+    # login limit doesn't turn the run into a stream of 429s.
+    remote = f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}'
+    return 'post', '/api/users/login/', {'email': email, 'password': PASSWORD}, None, {'REMOTE_ADDR': remote}
+
+
+def _lawyers(dataset, rng, i):
+    _, _, token = rng.choice(dataset.clients)
+    expertise = rng.choice([None] + [key for key, _ in EXPERTISE_CHOICES])
+    path = '/api/users/lawyers/' + (f'?expertise={expertise}' if expertise else '')
+    return 'get', path, None, token, {}
+
+
+def _messages(dataset, rng, i):
+    consultation_id, token = rng.choice(dataset.consultations)
+    return 'get', f'/api/chat/messages/{consultation_id}/', None, token, {}
+
+
+def _send(dataset, rng, i):
+    consultation_id, token = rng.choice(dataset.consultations)
+    return 'post', f'/api/chat/messages/{consultation_id}/send/', {'content': f'Benchmark {i}'}, token, {}
+
+
+def _create(dataset, rng, i):
+    _, _, token = rng.choice(dataset.clients)
+    _, profile_id = rng.choice(dataset.lawyers)
+    data = {
+        'lawyer': profile_id, 'title': f'Benchmark {i}', 'case_type': 'civil',
+        'requested_time': timezone.now().isoformat(),
+    }
+    return 'post', '/api/consultations/create/', data, token, {}
+
+
+def _notifications(dataset, rng, i):
+    _, _, token = rng.choice(dataset.clients)
+    return 'get', '/api/consultations/notifications/', None, token, {}
+
+
+SCENARIOS = {
+    'login': _login,
+    'lawyers': _lawyers,
+    'messages': _messages,
+    'send': _send,
+    'create': _create,
+    'notifications': _notifications,
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def run_scenario(name, dataset, requests, concurrency, warmup=0, random_seed=1):
+    """
+    Send ``requests`` requests for one scenario from ``concurrency`` threads,
+    each with its own client and DB connection, and summarise them.
+    """
+    scenario = SCENARIOS[name]
+    counter = iter(range(-warmup, requests))
+    counter_lock = threading.Lock()
+    samples = []
+    samples_lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = random.Random(f'{random_seed}-{name}-{worker_id}')
+        client = APIClient()
+        local = []
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(count))
+                while True:
+                    with counter_lock:
+                        i = next(counter, None)
+                    if i is None:
+                        break
+                    method, path, data, token, extra = scenario(dataset, rng, i)
+                    headers = {'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}
+                    queries[0] = 0
+                    started = time.perf_counter()
+                    response = getattr(client, method)(path, data, format='json', **headers, **extra)
+                    elapsed = time.perf_counter() - started
+                    if i >= 0:
+                        local.append((elapsed, queries[0], response.status_code))
+        finally:
+            connections.close_all()
+        with samples_lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(s[0] for s in samples)
+    queries = [s[1] for s in samples]
+    statuses = Counter(str(s[2]) for s in samples)
+    errors = sum(count for status, count in statuses.items() if not status.startswith('2'))
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'statuses': dict(sorted(statuses.items())),
+        'throughput': len(samples) / wall if wall else 0.0,
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'max': latencies[-1] * 1000 if latencies else 0.0,
+        },
+        'queries_per_request': {
+            'mean': sum(queries) / len(queries) if queries else 0.0,
+            'max': max(queries, default=0),
+        },
+    }
+
+
+def environment():
+    database = settings.DATABASES['default']
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'database': database['ENGINE'],
+    }
+
+
+# Relative change, past which compare() calls a metric a regression.
+# Throughput regresses by dropping, the others by rising.
+COMPARED = (
+    ('throughput', lambda r: r['throughput'], -1),
+    ('p50', lambda r: r['latency_ms']['p50'], 1),
+    ('p95', lambda r: r['latency_ms']['p95'], 1),
+    ('p99', lambda r: r['latency_ms']['p99'], 1),
+    ('queries', lambda r: r['queries_per_request']['mean'], 1),
+)
+
+
+def compare(baseline, current, threshold):
+    """
+    Yield (scenario, metric, before, after, change, regressed) for every
+    scenario present in both runs. ``threshold`` is a fraction, e.g. 0.1.
+    """
+    for name, result in current['results'].items():
+        before_result = baseline.get('results', {}).get(name)
+        if before_result is None:
+            continue
+        for metric, read, direction in COMPARED:
+            before, after = read(before_result), read(result)
+            change = (after - before) / before if before else 0.0
+            yield name, metric, before, after, change, change * direction > threshold
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(path, report):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
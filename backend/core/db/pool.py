@@ -0,0 +1,247 @@
+import logging
+import threading
+import time
+from collections import deque
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MIN_SIZE': 1,                   # idle connections kept open regardless of MAX_IDLE
+    'MAX_SIZE': 10,
+    'MAX_LIFETIME': 1800,            # seconds before a connection is retired
+    'MAX_IDLE': 300,                 # idle seconds before closing, above MIN_SIZE
+    'HEALTH_CHECK_INTERVAL': 30,     # ping connections idle longer than this on checkout
+    'TIMEOUT': 5,                    # seconds to wait for a free connection
+}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class _Entry:
+    __slots__ = ('connection', 'created', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of raw DB-API connections for one database alias.
+
+    Idle connections are handed out most-recently-used first, so under
+    light load the same few stay warm and the rest age out through
+    MAX_IDLE. Connections that have been idle longer than
+    HEALTH_CHECK_INTERVAL are pinged before reuse.
+    """
+
+    def __init__(self, min_size=1, max_size=10, max_lifetime=1800, max_idle=300,
+                 health_check_interval=30, timeout=5):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._idle = deque()
+        self._in_use = {}
+        self._cond = threading.Condition()
+        self._stats = {
+            'created': 0, 'closed': 0, 'acquired': 0, 'waits': 0, 'timeouts': 0,
+            'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0, 'health_check_failures': 0,
+        }
+
+    @classmethod
+    def from_settings(cls, options):
+        config = {**DEFAULTS, **(options or {})}
+        return cls(
+            min_size=config['MIN_SIZE'],
+            max_size=config['MAX_SIZE'],
+            max_lifetime=config['MAX_LIFETIME'],
+            max_idle=config['MAX_IDLE'],
+            health_check_interval=config['HEALTH_CHECK_INTERVAL'],
+            timeout=config['TIMEOUT'],
+        )
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use)
+
+    def acquire(self, factory):
+        """Return a raw connection, opening one with ``factory()`` if needed."""
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                self._prune()
+                entry = self._idle.pop() if self._idle else None
+                if entry is not None or self.size < self.max_size:
+                    break
+                waited = True
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._record_wait(True, time.monotonic() - started)
+                    raise PoolTimeout(f'No database connection free after {self.timeout}s')
+                self._cond.wait(remaining)
+            if entry is None:
+                # Reserve the slot before connecting outside the lock.
+                placeholder = object()
+                self._in_use[id(placeholder)] = placeholder
+            self._record_wait(waited, time.monotonic() - started)
+
+        if entry is not None and not self._healthy(entry):
+            entry = None
+            with self._cond:
+                placeholder = object()
+                self._in_use[id(placeholder)] = placeholder
+
+        if entry is None:
+            try:
+                entry = _Entry(factory())
+            except Exception:
+                with self._cond:
+                    del self._in_use[id(placeholder)]
+                    self._cond.notify()
+                raise
+            with self._cond:
+                del self._in_use[id(placeholder)]
+                self._stats['created'] += 1
+
+        with self._cond:
+            self._in_use[id(entry.connection)] = entry
+            self._stats['acquired'] += 1
+        return entry.connection
+
+    def release(self, connection, discard=False):
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+            self._cond.notify()
+        if entry is None:
+            self._close(connection)
+            return
+        if not discard:
+            try:
+                # Never hand the next user someone else's open transaction.
+                connection.rollback()
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        if discard or now - entry.created >= self.max_lifetime:
+            self._close(connection)
+            return
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _healthy(self, entry):
+        if time.monotonic() - entry.last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = entry.connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            logger.warning("Dropping a pooled connection that failed its health check")
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            self._close(entry.connection)
+            return False
+
+    def _prune(self):
+        # Called with the lock held. Oldest idle entries sit at the left.
+        now = time.monotonic()
+        keep = deque()
+        while self._idle:
+            entry = self._idle.popleft()
+            expired = now - entry.created >= self.max_lifetime
+            stale = now - entry.last_used >= self.max_idle and self.size + len(keep) >= self.min_size
+            if expired or stale:
+                self._close(entry.connection)
+            else:
+                keep.append(entry)
+        self._idle = keep
+
+    def _close(self, connection):
+        with self._cond:
+            self._stats['closed'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _record_wait(self, waited, seconds):
+        if waited:
+            self._stats['waits'] += 1
+            self._stats['wait_seconds_total'] += seconds
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], seconds)
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._stats,
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'max_size': self.max_size,
+            }
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, deque()
+        for entry in idle:
+            self._close(entry.connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    # Keyed on NAME too, so the test runner's renamed database gets its own pool.
+    key = (alias, settings_dict['NAME'])
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool.from_settings(settings_dict.get('POOL'))
+        return pool
+
+
+def pool_stats():
+    """Per-alias stats for every pool opened in this process."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for (alias, _name), pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mix into a backend's DatabaseWrapper so that opening a connection takes
+    one from the pool and closing it gives it back. Because Django closes
+    connections at the end of every request (CONN_MAX_AGE = 0) or consumer
+    call, this works the same under WSGI, ASGI and Channels. Configure with
+    a ``POOL`` dict in the database's settings.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        parent = super()
+        return self.pool.acquire(lambda: parent.get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            # A connection still inside an atomic block stays referenced by
+            # this wrapper, and one that errored may be broken: neither can
+            # be shared.
+            discard = self.in_atomic_block or self.errors_occurred
+            with self.wrap_database_errors:
+                self.pool.release(self.connection, discard=discard)
@@ -0,0 +1,111 @@
+import math
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+
+# Per-request routing state, installed by ReplicaRoutingMiddleware. None
+# outside a request, which keeps commands, workers and consumers on the
+# primary.
+_state = ContextVar('replica_routing', default=None)
+
+
+class _RoutingState:
+    __slots__ = ('read_intent', 'wrote')
+
+    def __init__(self):
+        self.read_intent = False
+        self.wrote = False
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+PIN_COOKIE = 'replica_pin'
+
+
+def pin_to_primary(request, response):
+    # The pin travels with the client rather than living in a per-process
+    # cache, so whichever worker serves the next read sees it. The value is
+    # the expiry time; max_age only tells the browser when to drop it.
+    seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+    response.set_cookie(
+        PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=math.ceil(seconds),
+        httponly=True, samesite='Lax', secure=request.is_secure(),
+    )
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES[PIN_COOKIE]) > time.time()
+    except (KeyError, ValueError):
+        return False
+
+
+def _allow_replica(request):
+    state = _state.get()
+    if state is not None and request.method in ('GET', 'HEAD') and not is_pinned(request):
+        state.read_intent = True
+
+
+def read_replica(view_func):
+    """
+    Mark a DRF function view as safe to serve from a replica. Goes under
+    @api_view so request.user is already authenticated.
+    """
+    @wraps(view_func)
+    def wrapped(request, *args, **kwargs):
+        _allow_replica(request)
+        return view_func(request, *args, **kwargs)
+    return wrapped
+
+
+class ReadReplicaMixin:
+    """Class-based equivalent of @read_replica."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        _allow_replica(request)
+
+
+class ReplicaRouter:
+    """
+    Reads go to a replica only when the view asked for it and nothing has
+    been written in this request or recently by this client; everything
+    else, and every write, goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.read_intent or state.wrote:
+            return None
+        choices = replicas()
+        return random.choice(choices) if choices else None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            pin_to_primary(request, response)
+        return response
@@ -0,0 +1,112 @@
+import logging
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from core import benchmark
+from users.notifications import shutdown_dispatcher
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the hot API endpoints against a throwaway test database. '
+        'Use --settings=backend.bench_settings to run on SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', choices=list(benchmark.SCENARIOS),
+                            default=list(benchmark.SCENARIOS), help='Endpoints to drive (default: all)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario (default: 200)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (default: 8)')
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per scenario (default: 20)')
+        parser.add_argument('--clients', type=int, default=200)
+        parser.add_argument('--lawyers', type=int, default=50)
+        parser.add_argument('--consultations-per-client', type=int, default=3)
+        parser.add_argument('--messages-per-consultation', type=int, default=50)
+        parser.add_argument('--notifications-per-client', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for data and request mix (default: 1)')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--compare', help='Baseline JSON from an earlier run to compare against')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Percent change counted as a regression in --compare (default: 10)')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the test database from an earlier run')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--requests and --concurrency must be at least 1')
+        baseline = benchmark.load(options['compare']) if options['compare'] else None
+
+        # The benchmark always runs on the test database, never on real data.
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        # Every login is "slow"; the table below is the report.
+        metrics_logger = logging.getLogger('core.metrics')
+        level = metrics_logger.level
+        metrics_logger.setLevel(logging.ERROR)
+        try:
+            report = self.run(options)
+        finally:
+            metrics_logger.setLevel(level)
+            # Notification workers must finish before their database goes away.
+            shutdown_dispatcher()
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['output']:
+            benchmark.save(options['output'], report)
+            self.stdout.write(f"💾 Results written to {options['output']}")
+        if baseline is not None:
+            self.compare(baseline, report, options['threshold'] / 100)
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark done'))
+
+    def run(self, options):
+        started = time.perf_counter()
+        dataset = benchmark.seed(
+            clients=options['clients'],
+            lawyers=options['lawyers'],
+            consultations_per_client=options['consultations_per_client'],
+            messages_per_consultation=options['messages_per_consultation'],
+            notifications_per_client=options['notifications_per_client'],
+            random_seed=options['seed'],
+        )
+        self.stdout.write(f"🌱 Seeded in {time.perf_counter() - started:.1f}s")
+
+        results = {}
+        self.stdout.write(
+            f"{'scenario':<14}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}"
+        )
+        for name in options['scenarios']:
+            result = benchmark.run_scenario(
+                name, dataset, options['requests'], options['concurrency'],
+                warmup=options['warmup'], random_seed=options['seed'],
+            )
+            results[name] = result
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<14}{result['throughput']:>9.1f}{latency['p50']:>9.1f}{latency['p95']:>9.1f}"
+                f"{latency['p99']:>9.1f}{result['queries_per_request']['mean']:>9.1f}{result['errors']:>8}"
+            )
+            if result['errors']:
+                self.stdout.write(self.style.WARNING(f"⚠️ {name}: status codes {result['statuses']}"))
+
+        return {
+            'environment': benchmark.environment(),
+            'options': {
+                key: options[key] for key in (
+                    'requests', 'concurrency', 'warmup', 'clients', 'lawyers', 'consultations_per_client',
+                    'messages_per_consultation', 'notifications_per_client', 'seed',
+                )
+            },
+            'results': results,
+        }
+
+    def compare(self, baseline, report, threshold):
+        regressions = []
+        for name, metric, before, after, change, regressed in benchmark.compare(baseline, report, threshold):
+            line = f"{name:<14}{metric:<12}{before:>10.1f} → {after:<10.1f}{change:>+8.1%}"
+            if regressed:
+                regressions.append(line)
+                self.stdout.write(self.style.ERROR(f"{line}  ❌"))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'{len(regressions)} metric(s) regressed by more than {threshold:.0%}')
@@ -0,0 +1,92 @@
+import time
+from unittest import mock
+from django.core import signing
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from chat.models import Message
+from chat.serializers import MessageFastSerializer, MessageSerializer
+from consultations.models import ConsultationRequest
+from consultations.serializers import (
+    ConsultationRequestFastSerializer,
+    ConsultationRequestSerializer,
+    NotificationFastSerializer,
+    NotificationSerializer,
+)
+from core.seeding import Seeder
+from users.models import LawyerProfile, Notification, User
+from users.serializers import LawyerProfileFastSerializer, LawyerProfileSerializer
+
+# (name, ModelSerializer, fast serializer, rows as the list view loads them)
+CASES = [
+    ('messages', MessageSerializer, MessageFastSerializer,
+     lambda: Message.objects.select_related('sender', 'sender__clientprofile', 'sender__lawyerprofile')),
+    ('consultations', ConsultationRequestSerializer, ConsultationRequestFastSerializer,
+     lambda: ConsultationRequest.objects.select_related(
+         'client', 'lawyer', 'client__clientprofile', 'lawyer__lawyerprofile')),
+    ('lawyers', LawyerProfileSerializer, LawyerProfileFastSerializer,
+     lambda: LawyerProfile.objects.select_related('user')),
+    ('notifications', NotificationSerializer, NotificationFastSerializer,
+     lambda: Notification.objects.all()),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows/sec of the list-endpoint ModelSerializers and their fast-path equivalents '
+        'on a throwaway test database. Use --settings=backend.bench_settings to run on SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows per serializer (default: 2000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs; the best is reported (default: 5)')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], max(options['repeat'], 1)
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.run(rows, repeat)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, rows, repeat):
+        Seeder(prefix='bench', days=30).seed(
+            clients=rows, lawyers=rows, consultations=1, consultation_distribution='fixed',
+            messages=1, message_distribution='fixed', notifications=1, notification_distribution='fixed',
+            meeting_ratio=0, status_weights={'accepted': 1},
+        )
+        request = Request(APIRequestFactory().get('/'))
+        request.user = User.objects.filter(role='client').first()
+        context = {'request': request}
+
+        self.stdout.write(f"{'serializer':<16}{'rows':>7}{'DRF rows/s':>14}{'fast rows/s':>14}{'speedup':>10}")
+        for name, slow, fast, queryset in CASES:
+            # Loaded once up front so only serialization is timed.
+            objects = list(queryset()[:rows])
+            # Signed file links embed the signing time, which mustn't tick
+            # over between the two.
+            frozen = signing.TimestampSigner().timestamp()
+            with mock.patch.object(signing.TimestampSigner, 'timestamp', return_value=frozen):
+                slow_data = slow(objects, many=True, context=context).data
+                fast_data = fast(objects, many=True, context=context).data
+            if JSONRenderer().render(slow_data) != JSONRenderer().render(fast_data):
+                raise CommandError(f'{fast.__name__} output differs from {slow.__name__}')
+
+            slow_rate = len(objects) / self.best(lambda: slow(objects, many=True, context=context).data, repeat)
+            fast_rate = len(objects) / self.best(lambda: fast(objects, many=True, context=context).data, repeat)
+            self.stdout.write(
+                f"{name:<16}{len(objects):>7}{slow_rate:>14,.0f}{fast_rate:>14,.0f}{fast_rate / slow_rate:>9.1f}x"
+            )
+        self.stdout.write(self.style.SUCCESS('✅ Output identical; serializer benchmark done'))
+
+    def best(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from core.uploads import purge_stale
+
+class Command(BaseCommand):
+    help = 'Delete resumable uploads that were never finished or never attached'
+
+    def handle(self, *args, **options):
+        removed = purge_stale()
+        self.stdout.write(self.style.SUCCESS(f"🧹 Removed {removed} stale upload(s)"))
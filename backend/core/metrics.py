@@ -0,0 +1,309 @@
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 500,      # requests slower than this are logged with their queries
+    'SLOW_LOG_QUERIES': 5,       # query fingerprints listed per slow request
+    'TOKEN': None,               # bearer token a scraper can use instead of an admin login
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_METRICS', {})}
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label tuple."""
+
+    def __init__(self, name, help_text, buckets, labels=('route', 'method')):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total, count) in sorted(self.snapshot().items()):
+            pairs = list(zip(self.labels, label_values))
+            labels = _format_labels(pairs)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_format_labels(pairs, le=bound)} {cumulative}')
+            lines.append(f'{self.name}_bucket{_format_labels(pairs, le="+Inf")} {count}')
+            lines.append(f'{self.name}_sum{labels} {total:.6f}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=('route', 'method', 'status')):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self.snapshot().items()):
+            lines.append(f'{self.name}{_format_labels(zip(self.labels, label_values))} {value}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs, le=None):
+    pairs = list(pairs)
+    if le is not None:
+        pairs.append(('le', le))
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+# Everything below is per process: with several workers each one serves its
+# own numbers, so scrape them individually or add them up downstream.
+requests_total = Counter('http_requests_total', 'Requests handled.')
+request_seconds = Histogram('http_request_duration_seconds', 'Time spent handling a request.', LATENCY_BUCKETS)
+db_queries = Histogram('http_request_db_queries', 'Database queries per request.', QUERY_BUCKETS)
+db_seconds = Histogram('http_request_db_duration_seconds', 'Time spent in SQL per request.', LATENCY_BUCKETS)
+serializer_seconds = Histogram('http_request_serializer_duration_seconds',
+                               'Time spent building serializer output per request.', LATENCY_BUCKETS)
+response_bytes = Histogram('http_response_size_bytes', 'Response body size.', SIZE_BUCKETS)
+
+REGISTRY = [requests_total, request_seconds, db_queries, db_seconds, serializer_seconds, response_bytes]
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.clear()
+
+
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Collapse a statement to its shape so repeats of the same query group together."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERALS.sub('?', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class RequestStats:
+    __slots__ = ('queries', 'sql_seconds', 'serializer_seconds', 'serializer_depth', 'fingerprints')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        self.fingerprints = defaultdict(lambda: [0, 0.0])
+
+    def record_query(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        entry = self.fingerprints[fingerprint(sql)]
+        entry[0] += 1
+        entry[1] += seconds
+
+
+_stats = ContextVar('request_stats', default=None)
+
+
+def current_stats():
+    return _stats.get()
+
+
+def _query_timer(execute, sql, params, many, context):
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record_query(sql, time.perf_counter() - started)
+
+
+def timed_serializer_data(prop):
+    """
+    Wrap BaseSerializer.data so the time taken to build a response's
+    serializer output (including the queries it triggers) is recorded.
+    Nested .data calls are counted once, at the outermost serializer.
+    """
+    getter = prop.fget
+
+    @wraps(getter)
+    def data(serializer):
+        stats = _stats.get()
+        if stats is None:
+            return getter(serializer)
+        stats.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return getter(serializer)
+        finally:
+            stats.serializer_depth -= 1
+            if not stats.serializer_depth:
+                stats.serializer_seconds += time.perf_counter() - started
+
+    data.timed = True
+    return property(data)
+
+
+def install_serializer_timing():
+    from rest_framework.serializers import BaseSerializer
+    if not getattr(BaseSerializer.data.fget, 'timed', False):
+        BaseSerializer.data = timed_serializer_data(BaseSerializer.data)
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>', None
+    return '/' + match.route.lstrip('^'), match._func_path
+
+
+def _response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, query count, SQL time, serializer time and response
+    size per route, served by MetricsView. Requests slower than
+    SLOW_REQUEST_MS are logged with their most expensive query shapes.
+    Goes first in MIDDLEWARE so the timings cover the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = metrics_settings()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = _stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(_query_timer))
+                response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+        elapsed = time.perf_counter() - started
+
+        route, view = _route(request)
+        labels = (route, request.method)
+        requests_total.inc((route, request.method, str(response.status_code)))
+        request_seconds.observe(labels, elapsed)
+        db_queries.observe(labels, stats.queries)
+        db_seconds.observe(labels, stats.sql_seconds)
+        serializer_seconds.observe(labels, stats.serializer_seconds)
+        size = _response_size(response)
+        if size is not None:
+            response_bytes.observe(labels, size)
+
+        if elapsed * 1000 >= config['SLOW_REQUEST_MS']:
+            self.log_slow(request, view or route, elapsed, stats, size, config['SLOW_LOG_QUERIES'])
+        return response
+
+    def log_slow(self, request, view, elapsed, stats, size, limit):
+        top = sorted(stats.fingerprints.items(), key=lambda item: item[1][1], reverse=True)
+        lines = [
+            f'Slow request {request.method} {request.path} ({view}) {elapsed * 1000:.0f}ms: '
+            f'{stats.queries} queries in {stats.sql_seconds * 1000:.0f}ms '
+            f'({stats.sql_seconds / elapsed:.0%}), serializer {stats.serializer_seconds * 1000:.0f}ms, '
+            f'{size if size is not None else "?"} bytes'
+        ]
+        for sql, (count, seconds) in top[:limit]:
+            lines.append(f'  {count}x {seconds * 1000:.1f}ms ({seconds / elapsed:.0%}) {sql}')
+        logger.warning('\n'.join(lines))
+
+
+def render(extra=()):
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return '\n'.join(lines) + '\n'
+
+
+def pool_lines(stats):
+    """Prometheus lines for core.db.pool.pool_stats()."""
+    series = (
+        ('db_pool_connections_idle', 'gauge', 'idle'),
+        ('db_pool_connections_in_use', 'gauge', 'in_use'),
+        ('db_pool_max_size', 'gauge', 'max_size'),
+        ('db_pool_acquired_total', 'counter', 'acquired'),
+        ('db_pool_created_total', 'counter', 'created'),
+        ('db_pool_waits_total', 'counter', 'waits'),
+        ('db_pool_wait_seconds_total', 'counter', 'wait_seconds_total'),
+        ('db_pool_timeouts_total', 'counter', 'timeouts'),
+    )
+    lines = []
+    for name, kind, key in series:
+        lines.append(f'# TYPE {name} {kind}')
+        for alias, values in sorted(stats.items()):
+            lines.append(f'{name}{_format_labels([("alias", alias)])} {values[key]}')
+    return lines
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0006_hot_query_indexes'),
+        ('core', '0001_uploadsession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='client_ip',
+            field=models.GenericIPAddressField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='uploadsession',
+            index=models.Index(fields=['client_ip', 'status'], name='core_upload_ip_idx'),
+        ),
+    ]
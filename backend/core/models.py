@@ -1,3 +1,41 @@
+import uuid
 from django.db import models
+from users.models import User
+from consultations.models import ConsultationRequest
 
-# Create your models here.
+
+class UploadSession(models.Model):
+    PURPOSE_CHOICES = [
+        ('chat', 'Chat file'),
+        ('qualifications', 'Qualifications'),
+    ]
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('complete', 'Complete'),
+        ('attached', 'Attached'),
+    ]
+
+    # The id doubles as the upload's capability, so it must not be guessable.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions')
+    # Only kept for anonymous uploads, to cap how many one address holds open.
+    client_ip = models.GenericIPAddressField(null=True, blank=True)
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    consultation = models.ForeignKey(ConsultationRequest, on_delete=models.CASCADE, null=True, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    stored_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='core_upload_status_idx'),
+            models.Index(fields=['client_ip', 'status'], name='core_upload_ip_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.purpose} upload {self.id} ({self.received}/{self.size})"
@@ -0,0 +1,280 @@
+import math
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+from django.contrib.auth.hashers import make_password
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from chat.models import MeetingSchedule, Message
+from consultations.models import ConsultationPoint, ConsultationRequest, PointTransaction
+from users.models import ClientProfile, EXPERTISE_CHOICES, LawyerProfile, Notification, User
+
+PASSWORD = 'seed-password'
+DISTRIBUTIONS = ('fixed', 'uniform', 'pareto')
+
+FIRST_NAMES = ['Amal', 'Nimal', 'Kasun', 'Dilini', 'Sachini', 'Tharindu', 'Ishara', 'Ruwan', 'Chamari',
+               'Nuwan', 'Harsha', 'Madhavi', 'Pradeep', 'Anusha', 'Shehan', 'Kavindi']
+LAST_NAMES = ['Perera', 'Fernando', 'Silva', 'Jayasinghe', 'Bandara', 'Wickramasinghe', 'Gunawardena',
+              'Rajapaksa', 'Dissanayake', 'Herath', 'Karunaratne', 'Senanayake']
+LOCATIONS = ['Colombo', 'Kandy', 'Galle', 'Jaffna', 'Kurunegala', 'Negombo', 'Matara', 'Anuradhapura']
+STATUS_WEIGHTS = {'pending': 15, 'accepted': 45, 'rejected': 10, 'completed': 30}
+
+
+def draw(rng, distribution, mean, cap=None):
+    """
+    A non-negative count with the given mean. 'pareto' is heavy-tailed:
+    most draws are small and a few are very large, like real chat threads.
+    """
+    if mean <= 0:
+        return 0
+    if distribution == 'fixed':
+        value = mean
+    elif distribution == 'uniform':
+        value = rng.randint(0, 2 * mean)
+    elif distribution == 'pareto':
+        alpha = 1.5
+        value = int(mean * (alpha - 1) / alpha * rng.paretovariate(alpha))
+    else:
+        raise ValueError(f'Unknown distribution {distribution!r}')
+    return min(value, cap) if cap is not None else value
+
+
+@contextmanager
+def backdating(*models):
+    """
+    Let bulk_create keep the timestamps it's given instead of overwriting
+    auto_now/auto_now_add fields with the current time.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Seeder:
+    """
+    Generates a synthetic dataset with chunked bulk_create. Every row
+    derives from ``random_seed``, so the same options give the same data;
+    only the absolute timestamps move with the clock. Users all share one
+    password hash (PASSWORD) rather than paying for the hasher per row.
+    """
+
+    def __init__(self, prefix='seed', random_seed=1, chunk_size=5000, days=365, log=None):
+        self.prefix = prefix
+        self.rng = random.Random(random_seed)
+        self.chunk_size = chunk_size
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=days)
+        self.log = log or (lambda message: None)
+        self.counts = {}
+
+    def timestamp(self, after=None):
+        after = after or self.start
+        span = (self.now - after).total_seconds()
+        return after + timedelta(seconds=self.rng.random() * span)
+
+    def name(self):
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+
+    def insert(self, model, rows):
+        """bulk_create ``rows`` (any iterable) a chunk at a time, each in its own transaction."""
+        chunk = []
+        total = 0
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                total += self._flush(model, chunk)
+                chunk = []
+        if chunk:
+            total += self._flush(model, chunk)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + total
+        return total
+
+    def _flush(self, model, chunk):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk, batch_size=min(self.chunk_size, 1000))
+        return len(chunk)
+
+    def insert_values(self, model, field_names, rows):
+        """
+        Like insert(), for plain tuples in ``field_names`` order. Skips model
+        instances and the ORM's insert compiler, which is most of the cost on
+        tables with millions of rows. Only datetimes need adapting here.
+        """
+        fields = [model._meta.get_field(name) for name in field_names]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        adapt = connection.ops.adapt_datetimefield_value
+        datetimes = [i for i, field in enumerate(fields) if isinstance(field, models.DateTimeField)]
+
+        def flush(chunk):
+            for i in datetimes:
+                for row in chunk:
+                    row[i] = adapt(row[i])
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, chunk)
+            return len(chunk)
+
+        chunk = []
+        total = 0
+        for row in rows:
+            chunk.append(list(row))
+            if len(chunk) >= self.chunk_size:
+                total += flush(chunk)
+                chunk = []
+        if chunk:
+            total += flush(chunk)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + total
+        return total
+
+    def create_users(self, role, count, tokens):
+        password = make_password(PASSWORD)
+        emails = [f'{self.prefix}-{role}-{i}@example.com' for i in range(count)]
+        self.insert(User, (User(email=email, username=email, role=role, password=password) for email in emails))
+        # Looked up again rather than read off bulk_create, which doesn't
+        # return primary keys on every backend.
+        ids = []
+        for start in range(0, count, self.chunk_size):
+            batch = emails[start:start + self.chunk_size]
+            by_email = dict(User.objects.filter(email__in=batch).values_list('email', 'id'))
+            ids.extend(by_email[email] for email in batch)
+        if tokens:
+            self.insert(Token, (Token(key=Token.generate_key(), user_id=user_id) for user_id in ids))
+        return ids
+
+    def seed(self, clients, lawyers, consultations=3, consultation_distribution='uniform',
+             messages=20, message_distribution='pareto', notifications=10, notification_distribution='uniform',
+             meeting_ratio=0.3, approved_ratio=0.9, status_weights=None, points=(0, 20), tokens=True):
+        lawyer_ids = self.create_users('lawyer', lawyers, tokens)
+        self.insert(LawyerProfile, (
+            LawyerProfile(
+                user_id=user_id, full_name=self.name(), phone_number=f'07{i:08d}'[-10:], nic_number=f'L{i}',
+                expertise=EXPERTISE_CHOICES[i % len(EXPERTISE_CHOICES)][0],
+                location=self.rng.choice(LOCATIONS), approved=self.rng.random() < approved_ratio,
+            )
+            for i, user_id in enumerate(lawyer_ids)
+        ))
+        self.log(f"👩‍⚖️ {lawyers} lawyers")
+
+        client_ids = self.create_users('client', clients, tokens)
+        self.insert(ClientProfile, (
+            ClientProfile(user_id=user_id, full_name=self.name(), phone_number=f'07{i:08d}'[-10:], nic_number=f'C{i}')
+            for i, user_id in enumerate(client_ids)
+        ))
+        balances = [self.rng.randint(*points) for _ in client_ids]
+        self.insert(ConsultationPoint, (
+            ConsultationPoint(user_id=user_id, balance=balance) for user_id, balance in zip(client_ids, balances)
+        ))
+        # The ledger's sum has to match the balance.
+        self.insert(PointTransaction, (
+            PointTransaction(user_id=user_id, amount=balance, reason='opening')
+            for user_id, balance in zip(client_ids, balances) if balance
+        ))
+        self.log(f"🙋 {clients} clients")
+
+        self.seed_consultations(
+            client_ids, lawyer_ids, consultations, consultation_distribution, messages, message_distribution,
+            meeting_ratio, status_weights or STATUS_WEIGHTS,
+        )
+        self.seed_notifications(client_ids + lawyer_ids, notifications, notification_distribution)
+        return self.counts
+
+    def seed_consultations(self, client_ids, lawyer_ids, mean, distribution, messages, message_distribution,
+                           meeting_ratio, status_weights):
+        # A few popular lawyers get most of the requests, as they would.
+        lawyer_weights = list(accumulate(1 / math.sqrt(rank + 1) for rank in range(len(lawyer_ids))))
+        statuses, weights = zip(*status_weights.items())
+        cum_weights = list(accumulate(weights))
+        case_types = [label for _, label in EXPERTISE_CHOICES]
+
+        # Consultations are written in chunks; each chunk's messages and
+        # meetings follow it once its ids are known.
+        pending = []
+        for client_id in client_ids:
+            for _ in range(draw(self.rng, distribution, mean)):
+                created = self.timestamp()
+                pending.append(ConsultationRequest(
+                    client_id=client_id,
+                    lawyer_id=self.rng.choices(lawyer_ids, cum_weights=lawyer_weights)[0],
+                    title=f'{self.rng.choice(case_types)} matter',
+                    case_type=self.rng.choice(case_types),
+                    status=self.rng.choices(statuses, cum_weights=cum_weights)[0],
+                    requested_time=self.timestamp(created),
+                    created_at=created,
+                    updated_at=created,
+                ))
+                if len(pending) >= self.chunk_size:
+                    self._write_consultations(pending, messages, message_distribution, meeting_ratio)
+                    pending = []
+        if pending:
+            self._write_consultations(pending, messages, message_distribution, meeting_ratio)
+        self.log(f"📁 {self.counts.get('consultations.ConsultationRequest', 0)} consultations, "
+                 f"{self.counts.get('chat.Message', 0)} messages")
+
+    def _write_consultations(self, consultations, messages, message_distribution, meeting_ratio):
+        last_id = ConsultationRequest.objects.aggregate(last=Max('id'))['last'] or 0
+        with backdating(ConsultationRequest):
+            self.insert(ConsultationRequest, consultations)
+        if consultations[0].pk is None:
+            # No RETURNING on this backend: identity values follow insert
+            # order, and nothing else writes while seeding.
+            new_ids = ConsultationRequest.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)
+            for consultation, pk in zip(consultations, new_ids):
+                consultation.pk = pk
+
+        active = [c for c in consultations if c.status in ('accepted', 'completed')]
+        self.insert_values(
+            Message, ('consultation', 'sender', 'content', 'file', 'timestamp'),
+            self._messages(active, messages, message_distribution),
+        )
+        with backdating(MeetingSchedule):
+            self.insert(MeetingSchedule, self._meetings(active, meeting_ratio))
+
+    def _meetings(self, consultations, ratio):
+        for c in consultations:
+            if self.rng.random() >= ratio:
+                continue
+            # Some time after the request, up to a month out, so recent
+            # consultations have meetings still to come.
+            scheduled = self.timestamp(c.created_at) + timedelta(hours=self.rng.randint(1, 24 * 30))
+            yield MeetingSchedule(
+                consultation_id=c.id, scheduled_time=scheduled, created_by_id=c.lawyer_id,
+                created_at=c.created_at, updated_at=c.created_at, reminder_sent=scheduled < self.now,
+            )
+
+    def _messages(self, consultations, mean, distribution):
+        cap = max(mean * 100, 1)
+        for c in consultations:
+            count = draw(self.rng, distribution, mean, cap)
+            if not count:
+                continue
+            step = (self.now - c.created_at) / (count + 1)
+            for n in range(count):
+                yield (c.id, self.rng.choice((c.client_id, c.lawyer_id)), f'Message {n + 1} on this case.',
+                       '', c.created_at + step * (n + 1))
+
+    def seed_notifications(self, user_ids, mean, distribution):
+        def rows():
+            for user_id in user_ids:
+                for n in range(draw(self.rng, distribution, mean)):
+                    yield (user_id, f'Update {n + 1} on your consultation.',
+                           self.rng.choice(('info', 'success', 'danger')), self.timestamp(), self.rng.random() < 0.7)
+
+        self.insert_values(Notification, ('user', 'message', 'status', 'timestamp', 'read'), rows())
+        self.log(f"🔔 {self.counts.get('users.Notification', 0)} notifications")
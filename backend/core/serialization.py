@@ -0,0 +1,79 @@
+from datetime import timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .metrics import timed_serializer_data
+
+
+class FastSerializer:
+    """
+    Read-only stand-in for a ModelSerializer on hot list endpoints.
+
+    Subclasses write ``to_representation`` as a plain dict literal, in the
+    same key order as the serializer they shadow, using the helpers below
+    for values DRF would format. Everything request-dependent (time zone,
+    formats) is resolved once per serializer rather than once per field
+    per row, and there is no field machinery in between. Output must stay
+    byte-for-byte what the ModelSerializer renders; each one is tested
+    against its counterpart.
+
+    Takes the same (instance, many=, context=) arguments so a view can use
+    it through get_serializer; FastListMixin does that for GET requests.
+    """
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.request = self.context.get('request')
+        self._timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+        if api_settings.DATETIME_FORMAT != ISO_8601:
+            self.datetime = serializers.DateTimeField().to_representation
+
+    def to_representation(self, obj):
+        raise NotImplementedError
+
+    def _data(self):
+        if self.many:
+            to_representation = self.to_representation
+            return [to_representation(obj) for obj in self.instance]
+        return self.to_representation(self.instance)
+
+    data = timed_serializer_data(property(_data))
+
+    def datetime(self, value):
+        # serializers.DateTimeField with the default ISO 8601 format.
+        if not value:
+            return None
+        if self._timezone is not None:
+            if timezone.is_aware(value):
+                value = value.astimezone(self._timezone)
+            else:
+                value = timezone.make_aware(value, self._timezone)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, dt_timezone.utc)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    def absolute_url(self, url):
+        return self.request.build_absolute_uri(url) if self.request is not None else url
+
+    def file(self, fieldfile):
+        # serializers.FileField / ImageField with UPLOADED_FILES_USE_URL.
+        if not fieldfile:
+            return None
+        return self.absolute_url(fieldfile.url)
+
+
+class FastListMixin:
+    """
+    Serve GET requests on a generic view with ``fast_serializer_class``;
+    writes and everything else keep using serializer_class.
+    """
+    fast_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.fast_serializer_class is not None and self.request.method in ('GET', 'HEAD'):
+            return self.fast_serializer_class
+        return super().get_serializer_class()
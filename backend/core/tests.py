@@ -1,3 +1,684 @@
-from django.test import TestCase
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import ExitStack
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.core import signing
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from chat.models import Message, MeetingSchedule
+from consultations.models import ConsultationRequest
+from consultations.tests import make_participants
+from users.models import User, LawyerProfile, Notification
+from .media import sign_media
+from .db.pool import ConnectionPool, PoolTimeout
+from .db.routers import ReplicaRouter, _RoutingState, _state
+from .models import UploadSession
+from .uploads import part_path, purge_stale
+from chat.serializers import MessageFastSerializer, MessageSerializer
+from consultations.serializers import (
+    ConsultationRequestFastSerializer,
+    ConsultationRequestSerializer,
+    NotificationFastSerializer,
+    NotificationSerializer,
+)
+from users.serializers import LawyerProfileFastSerializer, LawyerProfileSerializer
+from . import benchmark, metrics, seeding
 
-# Create your tests here.
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProtectedMediaTests(TestCase):
+    def setUp(self):
+        self.client_user, self.lawyer_user, self.profile = make_participants()
+        consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case', case_type='civil',
+            requested_time='2030-01-01T10:00:00Z',
+        )
+        self.message = Message(consultation=consultation, sender=self.client_user)
+        self.message.file.save('notes.txt', ContentFile(b'0123456789' * 10))
+        self.url = f'/api/media/chat/{self.message.id}/'
+        self.api = APIClient()
+
+    def test_participant_gets_whole_file(self):
+        self.api.force_authenticate(self.lawyer_user)
+        response = self.api.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789' * 10)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range_and_conditional_requests(self):
+        self.api.force_authenticate(self.client_user)
+        partial = self.api.get(self.url, HTTP_RANGE='bytes=10-14')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], 'bytes 10-14/100')
+        self.assertEqual(b''.join(partial.streaming_content), b'01234')
+
+        self.assertEqual(self.api.get(self.url, HTTP_RANGE='bytes=500-').status_code, 416)
+        self.assertEqual(self.api.get(self.url, HTTP_IF_NONE_MATCH=partial['ETag']).status_code, 304)
+
+    def test_outsiders_are_refused(self):
+        self.assertEqual(self.api.get(self.url).status_code, 401)
+        outsider = User.objects.create_user('outsider@example.com', 'pw', role='client')
+        self.api.force_authenticate(outsider)
+        self.assertEqual(self.api.get(self.url).status_code, 403)
+
+    def test_signed_link(self):
+        sig = sign_media('chat', self.message.id, self.client_user.id)
+        self.assertEqual(self.api.get(self.url, {'sig': sig}).status_code, 200)
+        other = f'/api/media/chat/{self.message.id + 1}/'
+        self.assertEqual(self.api.get(other, {'sig': sig}).status_code, 401)
+
+    def test_profile_links_to_protected_qualifications(self):
+        self.profile.qualifications.save('degree.pdf', ContentFile(b'pdf'))
+        self.api.force_authenticate(self.lawyer_user)
+        url = self.api.get('/api/users/lawyer-profile/').json()['qualifications']
+        self.assertTrue(url.startswith(f'http://testserver/api/media/qualifications/{self.profile.id}/?sig='))
+
+        # The signed link works on its own, the way the app opens it.
+        response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'pdf')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RESUMABLE_UPLOADS={'CHUNK_SIZE': 4})
+class ResumableUploadTests(TestCase):
+    data = b'0123456789'
+
+    def setUp(self):
+        self.client_user, self.lawyer_user, _ = make_participants()
+        self.consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case', case_type='civil',
+            requested_time='2030-01-01T10:00:00Z',
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+        cache.clear()
+
+    def start(self, purpose='chat'):
+        response = self.api.post('/api/uploads/', {
+            'purpose': purpose, 'filename': 'brief.pdf', 'size': len(self.data),
+            'consultation': self.consultation.id,
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def put(self, upload_id, offset, body, **headers):
+        return self.api.put(
+            f'/api/uploads/{upload_id}/', body, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset), **headers,
+        )
+
+    def upload(self, purpose='chat'):
+        upload_id = self.start(purpose)
+        for offset in range(0, len(self.data), 4):
+            self.assertEqual(self.put(upload_id, offset, self.data[offset:offset + 4]).status_code, 200)
+        response = self.api.post(f'/api/uploads/{upload_id}/complete/', {
+            'sha256': hashlib.sha256(self.data).hexdigest(),
+        })
+        self.assertEqual(response.status_code, 200)
+        return upload_id
+
+    def test_chunks_finalize_and_attach_to_message(self):
+        upload_id = self.upload()
+        response = self.api.post(f'/api/chat/messages/{self.consultation.id}/send/', {'upload_id': upload_id})
+
+        self.assertEqual(response.status_code, 201)
+        message = Message.objects.get()
+        self.assertTrue(message.file.name.startswith('chat_files/brief'))
+        self.assertEqual(message.file.read(), self.data)
+        # An upload can only be attached once.
+        again = self.api.post(f'/api/chat/messages/{self.consultation.id}/send/', {'upload_id': upload_id})
+        self.assertEqual(again.status_code, 400)
+
+    def test_resume_after_dropped_chunk(self):
+        upload_id = self.start()
+        self.put(upload_id, 0, self.data[:4])
+        self.assertEqual(self.put(upload_id, 8, self.data[8:]).status_code, 409)
+        self.assertEqual(self.api.get(f'/api/uploads/{upload_id}/').json()['offset'], 4)
+        self.assertEqual(self.put(upload_id, 4, self.data[4:8]).status_code, 200)
+
+    def test_checksums_are_verified(self):
+        upload_id = self.start()
+        bad = self.put(upload_id, 0, self.data[:4], HTTP_UPLOAD_CHECKSUM='0' * 64)
+        self.assertEqual(bad.status_code, 400)
+        for offset in range(0, len(self.data), 4):
+            self.put(upload_id, offset, self.data[offset:offset + 4])
+        response = self.api.post(f'/api/uploads/{upload_id}/complete/', {'sha256': '0' * 64})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get().status, 'open')
+
+    def test_other_users_cannot_touch_an_upload(self):
+        upload_id = self.start()
+        self.api.force_authenticate(self.lawyer_user)
+        self.assertEqual(self.put(upload_id, 0, self.data[:4]).status_code, 404)
+
+    def test_purge_drops_stale_sessions_but_keeps_attached_files(self):
+        open_id = self.start()
+        complete_id = self.upload()
+        attached_id = self.upload()
+        self.api.post(f'/api/chat/messages/{self.consultation.id}/send/', {'upload_id': attached_id})
+        open_path = part_path(UploadSession.objects.get(id=open_id))
+        complete_name = UploadSession.objects.get(id=complete_id).stored_name
+        storage = Message._meta.get_field('file').storage
+
+        self.assertEqual(purge_stale(), 0)
+        self.assertEqual(purge_stale(now=timezone.now() + timedelta(days=2)), 3)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.path.exists(open_path))
+        self.assertFalse(storage.exists(complete_name))
+        self.assertEqual(Message.objects.get().file.read(), self.data)
+
+    def start_anonymous(self):
+        return self.api.post('/api/uploads/', {'purpose': 'qualifications', 'filename': 'degree.pdf', 'size': 10})
+
+    def test_anonymous_open_uploads_are_capped_per_address(self):
+        self.api.force_authenticate(None)
+        for _ in range(3):
+            self.assertEqual(self.start_anonymous().status_code, 201)
+        self.assertEqual(self.start_anonymous().status_code, 429)
+
+        # Another address has its own allowance, and finishing one frees a slot.
+        other = self.api.post('/api/uploads/', {'purpose': 'qualifications', 'filename': 'a.pdf', 'size': 10},
+                              REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other.status_code, 201)
+        UploadSession.objects.filter(client_ip='127.0.0.1').first().delete()
+        self.assertEqual(self.start_anonymous().status_code, 201)
+
+    def test_anonymous_upload_starts_are_throttled(self):
+        self.api.force_authenticate(None)
+        with self.settings(RESUMABLE_UPLOADS={'CHUNK_SIZE': 4, 'ANON_RATE': '2/hour', 'ANON_MAX_OPEN': 10}):
+            self.assertEqual(self.start_anonymous().status_code, 201)
+            self.assertEqual(self.start_anonymous().status_code, 201)
+            self.assertEqual(self.start_anonymous().status_code, 429)
+            # Logged-in users aren't affected.
+            self.api.force_authenticate(self.client_user)
+            self.assertEqual(self.start_anonymous().status_code, 201)
+
+    def test_anonymous_qualifications_upload_on_registration(self):
+        self.api.force_authenticate(None)
+        upload_id = self.upload('qualifications')
+        response = self.api.post('/api/users/register/', {
+            'email': 'new@example.com', 'password': 'pw', 'role': 'lawyer',
+            'full_name': 'New', 'phone_number': '1', 'nic_number': '1',
+            'expertise': 'civil', 'location': 'Colombo', 'qualifications_upload': upload_id,
+        })
+
+        self.assertEqual(response.status_code, 201)
+        profile = LawyerProfile.objects.get(user__email='new@example.com')
+        self.assertEqual(profile.qualifications.read(), self.data)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+    def factory(self):
+        connection = sqlite3.connect(':memory:', check_same_thread=False)
+        self.opened.append(connection)
+        return connection
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(max_size=2)
+        first = pool.acquire(self.factory)
+        pool.release(first)
+        self.assertIs(pool.acquire(self.factory), first)
+        self.assertEqual(pool.stats()['created'], 1)
+
+    def test_waits_then_times_out_when_exhausted(self):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        held = pool.acquire(self.factory)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(self.factory)
+
+        threading.Timer(0.02, pool.release, args=[held]).start()
+        pool.timeout = 2
+        self.assertIs(pool.acquire(self.factory), held)
+        stats = pool.stats()
+        self.assertEqual((stats['waits'], stats['timeouts']), (2, 1))
+
+    def test_expired_and_broken_connections_are_replaced(self):
+        pool = ConnectionPool(max_lifetime=0)
+        first = pool.acquire(self.factory)
+        pool.release(first)
+        self.assertIsNot(pool.acquire(self.factory), first)
+
+        pool = ConnectionPool(health_check_interval=0)
+        first = pool.acquire(self.factory)
+        pool.release(first)
+        first.close()
+        self.assertIsNot(pool.acquire(self.factory), first)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+    def test_uncommitted_work_is_rolled_back_on_release(self):
+        pool = ConnectionPool()
+        connection = pool.acquire(self.factory)
+        connection.execute('CREATE TABLE t (x INTEGER)')
+        connection.commit()
+        connection.execute('INSERT INTO t VALUES (1)')
+        pool.release(connection)
+        self.assertEqual(connection.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+
+
+class PooledBackendTests(SimpleTestCase):
+    def test_django_close_returns_connection_to_pool(self):
+        path = os.path.join(tempfile.mkdtemp(), 'pool.sqlite3')
+        connections = ConnectionHandler({'default': {
+            'ENGINE': 'core.db.backends.sqlite3', 'NAME': path, 'POOL': {'MAX_SIZE': 2},
+        }})
+        connection = connections['default']
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            raw = connection.connection
+            connection.close()
+            connection.ensure_connection()
+            self.assertIs(connection.connection, raw)
+            self.assertEqual(connection.pool.stats()['created'], 1)
+        finally:
+            connection.close()
+            connection.pool.close_all()
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.state = _RoutingState()
+        self.token = _state.set(self.state)
+
+    def tearDown(self):
+        _state.reset(self.token)
+
+    def test_reads_need_intent(self):
+        self.assertIsNone(self.router.db_for_read(Message))
+        self.state.read_intent = True
+        self.assertEqual(self.router.db_for_read(Message), 'replica')
+
+    def test_write_keeps_rest_of_request_on_primary(self):
+        self.state.read_intent = True
+        self.assertEqual(self.router.db_for_write(Message), 'default')
+        self.assertIsNone(self.router.db_for_read(Message))
+
+    def test_no_request_means_primary(self):
+        _state.set(None)
+        self.assertIsNone(self.router.db_for_read(Message))
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'no DATABASE_REPLICAS configured')
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.client_user, self.lawyer_user, _ = make_participants()
+        self.consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case', case_type='civil',
+            requested_time='2030-01-01T10:00:00Z',
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+        self.url = f'/api/chat/messages/{self.consultation.id}/'
+
+    def replica_queries(self, method, *args, **kwargs):
+        captures = [CaptureQueriesContext(connections[alias]) for alias in settings.DATABASE_REPLICAS]
+        for capture in captures:
+            capture.__enter__()
+        try:
+            getattr(self.api, method)(*args, **kwargs)
+        finally:
+            for capture in captures:
+                capture.__exit__(None, None, None)
+        return sum(len(capture) for capture in captures)
+
+    def test_list_reads_from_replica(self):
+        self.assertGreater(self.replica_queries('get', self.url), 0)
+
+    def test_user_reads_own_writes_after_posting(self):
+        self.api.post(f'/api/chat/messages/{self.consultation.id}/send/', {'content': 'hi'})
+        self.assertEqual(self.replica_queries('get', self.url), 0)
+
+        # Other clients aren't pinned by someone else's write.
+        self.api = APIClient()
+        self.api.force_authenticate(self.lawyer_user)
+        self.assertGreater(self.replica_queries('get', self.url), 0)
+
+    def test_pin_is_not_held_in_the_local_cache(self):
+        self.api.post(f'/api/chat/messages/{self.consultation.id}/send/', {'content': 'hi'})
+        cache.clear()
+        self.assertEqual(self.replica_queries('get', self.url), 0)
+
+    def test_pin_expires(self):
+        with self.settings(REPLICA_PIN_SECONDS=0.01):
+            self.api.post(f'/api/chat/messages/{self.consultation.id}/send/', {'content': 'hi'})
+        self.assertIn('replica_pin', self.api.cookies)
+        threading.Event().wait(0.05)
+        self.assertGreater(self.replica_queries('get', self.url), 0)
+
+
+class RequestMetricsTests(TestCase):
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        metrics.reset()
+        self.client_user, self.lawyer_user, _ = make_participants()
+        self.consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case', case_type='civil',
+            requested_time=timezone.now(), status='accepted',
+        )
+        Message.objects.bulk_create([
+            Message(consultation=self.consultation, sender=self.client_user, content=f'm{i}') for i in range(3)
+        ])
+        self.admin = User.objects.create_user('admin@example.com', 'pw', role='admin')
+        self.api = APIClient()
+
+    def scrape(self):
+        self.api.force_authenticate(self.admin)
+        response = self.api.get('/api/ops/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode()
+
+    def test_records_per_route_series(self):
+        self.api.force_authenticate(self.client_user)
+        self.api.get(f'/api/chat/messages/{self.consultation.id}/')
+
+        body = self.scrape()
+        route = 'route="/api/chat/messages/<int:consultation_id>/",method="GET"'
+        self.assertIn(f'http_requests_total{{{route},status="200"}} 1', body)
+        self.assertIn(f'http_request_duration_seconds_count{{{route}}} 1', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{route},le="+Inf"}} 1', body)
+        queries = metrics.db_queries.snapshot()[('/api/chat/messages/<int:consultation_id>/', 'GET')]
+        self.assertGreater(queries[1], 0)
+        serializer = metrics.serializer_seconds.snapshot()[('/api/chat/messages/<int:consultation_id>/', 'GET')]
+        self.assertGreater(serializer[1], 0)
+        self.assertIn('http_response_size_bytes_count', body)
+
+    def test_slow_requests_are_logged_with_query_shapes(self):
+        self.api.force_authenticate(self.client_user)
+        with self.settings(REQUEST_METRICS={'SLOW_REQUEST_MS': 0}):
+            with self.assertLogs('core.metrics', 'WARNING') as logs:
+                self.api.get(f'/api/chat/messages/{self.consultation.id}/')
+        output = '\n'.join(logs.output)
+        self.assertIn('chat.views.MessageListView', output)
+        self.assertIn('FROM "chat_message"', output)
+
+    def test_requires_admin_or_scrape_token(self):
+        self.api.force_authenticate(self.client_user)
+        self.assertEqual(self.api.get('/api/ops/metrics/').status_code, 403)
+
+        anonymous = APIClient()
+        with self.settings(REQUEST_METRICS={'TOKEN': 'scrape-secret'}):
+            self.assertEqual(anonymous.get('/api/ops/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            response = anonymous.get('/api/ops/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_fingerprint_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            metrics.fingerprint('SELECT * FROM "t" WHERE "a" = 5 AND "b" IN (%s, %s, %s)\n  AND "c" = \'x\''),
+            'SELECT * FROM "t" WHERE "a" = ? AND "b" IN (...) AND "c" = ?',
+        )
+
+
+class BenchmarkTests(TestCase):
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def test_seed_builds_a_usable_dataset(self):
+        dataset = benchmark.seed(clients=4, lawyers=2, consultations_per_client=2,
+                                 messages_per_consultation=3, notifications_per_client=2)
+
+        self.assertEqual(len(dataset.clients), 4)
+        self.assertEqual(len(dataset.consultations), 8)
+        self.assertEqual(Message.objects.count(), 24)
+        self.assertEqual(Notification.objects.count(), 12)
+        _, email, token = dataset.clients[0]
+        self.assertTrue(User.objects.get(email=email).check_password(benchmark.PASSWORD))
+        consultation_id, token = dataset.consultations[0]
+        response = APIClient().get(f'/api/chat/messages/{consultation_id}/', HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([], 95), 0.0)
+
+    def test_compare_flags_slower_runs(self):
+        def run(throughput, p95):
+            latency = {'p50': 10.0, 'p95': p95, 'p99': 30.0}
+            return {'results': {'messages': {
+                'throughput': throughput, 'latency_ms': latency, 'queries_per_request': {'mean': 2.0},
+            }}}
+
+        rows = list(benchmark.compare(run(100.0, 20.0), run(80.0, 21.0), threshold=0.1))
+        regressed = {metric for _, metric, _, _, _, flagged in rows if flagged}
+        self.assertEqual(regressed, {'throughput'})
+
+
+class SeedScaleTests(TestCase):
+    def seed(self, prefix, random_seed=1):
+        out = StringIO()
+        call_command('seed_scale', clients=30, lawyers=5, messages=4, notifications=3, prefix=prefix,
+                     seed=random_seed, chunk_size=7, stdout=out)
+        return out.getvalue()
+
+    def shape(self, prefix):
+        consultations = ConsultationRequest.objects.filter(client__email__startswith=f'{prefix}-')
+        return (
+            sorted(consultations.values_list('status', flat=True)),
+            Message.objects.filter(consultation__in=consultations).count(),
+            sorted(LawyerProfile.objects.filter(user__email__startswith=f'{prefix}-').values_list('full_name', flat=True)),
+            Notification.objects.filter(user__email__startswith=f'{prefix}-').count(),
+        )
+
+    def test_same_seed_gives_the_same_data(self):
+        self.assertIn('✅ Seeded', self.seed('a'))
+        self.seed('b')
+        self.assertEqual(self.shape('a'), self.shape('b'))
+        self.seed('c', random_seed=2)
+        self.assertNotEqual(self.shape('a'), self.shape('c'))
+
+    def test_rows_are_consistent_and_backdated(self):
+        self.seed('s')
+        client = User.objects.filter(email__startswith='s-client-').first()
+        self.assertTrue(client.check_password(seeding.PASSWORD))
+        balance = client.consultation_points.balance
+        self.assertEqual(sum(client.point_transactions.values_list('amount', flat=True)), balance)
+        self.assertLess(ConsultationRequest.objects.earliest('created_at').created_at,
+                        timezone.now() - timedelta(days=1))
+        for message in Message.objects.select_related('consultation')[:50]:
+            self.assertIn(message.sender_id, (message.consultation.client_id, message.consultation.lawyer_id))
+        self.assertTrue(ConsultationRequest._meta.get_field('created_at').auto_now_add)
+
+    def test_refuses_a_prefix_that_exists(self):
+        self.seed('dup')
+        with self.assertRaises(CommandError):
+            self.seed('dup')
+
+    def test_draw_means(self):
+        rng = random.Random(1)
+        for distribution in seeding.DISTRIBUTIONS:
+            values = [seeding.draw(rng, distribution, 20) for _ in range(20000)]
+            self.assertAlmostEqual(sum(values) / len(values), 20, delta=3, msg=distribution)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class FastSerializerTests(TestCase):
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        self.client_user, self.lawyer_user, self.profile = make_participants()
+        self.consultation = ConsultationRequest.objects.create(
+            client=self.client_user, lawyer=self.lawyer_user, title='Case', case_type='civil',
+            requested_time=timezone.now().replace(microsecond=0),
+        )
+        stranger = User.objects.create_user('noprofile@example.com', 'pw', role='client')
+        ConsultationRequest.objects.create(
+            client=stranger, lawyer=self.lawyer_user, title='Other', case_type='family',
+            requested_time=timezone.now(), status='accepted',
+        )
+        Message.objects.create(consultation=self.consultation, sender=self.client_user, content='Hello')
+        Message.objects.create(consultation=self.consultation, sender=self.lawyer_user, content='Hi')
+        Message.objects.create(consultation=self.consultation, sender=stranger, content='')
+        with_file = Message(consultation=self.consultation, sender=self.client_user, content='See attached')
+        with_file.file.save('brief.txt', ContentFile(b'brief'))
+
+        self.profile.qualifications.save('degree.pdf', ContentFile(b'pdf'), save=False)
+        self.profile.profile_picture.save('me.jpg', ContentFile(b'jpg'), save=False)
+        self.profile.profile_picture_variants = {
+            'source': self.profile.profile_picture.name,
+            'thumb': {'webp': 'profile_pics/1/variants/a-thumb.webp', 'jpeg': 'profile_pics/1/variants/a-thumb.jpg'},
+        }
+        self.profile.save()
+        other = User.objects.create_user('other-lawyer@example.com', 'pw', role='lawyer')
+        LawyerProfile.objects.create(user=other, full_name='Other', phone_number='2', nic_number='2',
+                                     expertise='family', location='Kandy')
+
+        request = Request(APIRequestFactory().get('/'))
+        request.user = self.client_user
+        self.contexts = [{}, {'request': request}]
+
+    def assertSameOutput(self, slow, fast, objects):
+        # Signed file links embed the signing time; hold it still so both
+        # serializers sign within the same second.
+        frozen = signing.TimestampSigner().timestamp()
+        with mock.patch.object(signing.TimestampSigner, 'timestamp', return_value=frozen):
+            self._assertSameOutput(slow, fast, objects)
+
+    def _assertSameOutput(self, slow, fast, objects):
+        for context in self.contexts:
+            expected = JSONRenderer().render(slow(objects, many=True, context=context).data)
+            self.assertEqual(JSONRenderer().render(fast(objects, many=True, context=context).data), expected)
+            with timezone.override('UTC'):
+                expected = JSONRenderer().render(slow(objects[0], context=context).data)
+                self.assertEqual(JSONRenderer().render(fast(objects[0], context=context).data), expected)
+
+    def test_messages(self):
+        messages = list(Message.objects.select_related('sender', 'sender__clientprofile', 'sender__lawyerprofile'))
+        self.assertSameOutput(MessageSerializer, MessageFastSerializer, messages)
+
+    def test_consultations(self):
+        consultations = list(ConsultationRequest.objects.select_related(
+            'client', 'lawyer', 'client__clientprofile', 'lawyer__lawyerprofile'))
+        self.assertSameOutput(ConsultationRequestSerializer, ConsultationRequestFastSerializer, consultations)
+
+    def test_lawyers(self):
+        lawyers = list(LawyerProfile.objects.select_related('user').order_by('id'))
+        self.assertSameOutput(LawyerProfileSerializer, LawyerProfileFastSerializer, lawyers)
+
+    def test_notifications(self):
+        Notification.objects.create(user=self.client_user, message='Accepted', status='success')
+        Notification.objects.create(user=self.client_user, message='Read', status='info', read=True)
+        notifications = list(Notification.objects.all())
+        self.assertSameOutput(NotificationSerializer, NotificationFastSerializer, notifications)
+
+    def test_list_views_serve_the_fast_path(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        response = api.get(f'/api/chat/messages/{self.consultation.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.renderer_context['view'].get_serializer(), MessageFastSerializer)
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    Query count and index usage for the hottest endpoints. Plans are only
+    checked on SQLite, whose EXPLAIN QUERY PLAN output is stable enough to
+    assert on; counts are checked everywhere.
+    """
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.client_user, self.lawyer_user, self.profile = make_participants()
+        now = timezone.now()
+        self.consultations = ConsultationRequest.objects.bulk_create([
+            ConsultationRequest(
+                client=self.client_user, lawyer=self.lawyer_user, title=f'Case {i}', case_type='civil',
+                requested_time=now, status='accepted',
+            )
+            for i in range(5)
+        ])
+        consultation = self.consultations[0]
+        Message.objects.bulk_create([
+            Message(consultation=consultation, sender=self.client_user, content=f'm{i}') for i in range(20)
+        ])
+        Notification.objects.bulk_create([
+            Notification(user=self.client_user, message=f'n{i}', status='info') for i in range(20)
+        ])
+        MeetingSchedule.objects.create(
+            consultation=consultation, scheduled_time=now + timedelta(minutes=30), created_by=self.lawyer_user,
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def capture(self, fn):
+        # List endpoints may be routed to a replica, so watch every alias.
+        with ExitStack() as stack:
+            captures = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in self.databases]
+            fn()
+        return [q['sql'] for capture in captures for q in capture.captured_queries]
+
+    def get(self, url):
+        return self.capture(lambda: self.assertEqual(self.api.get(url).status_code, 200))
+
+    def assertUsesIndex(self, queries, table, index):
+        if connection.vendor != 'sqlite':
+            return
+        sql = next(q for q in queries if f'FROM "{table}"' in q)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' | '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn(f'SEARCH {table} USING', plan)
+        self.assertIn(index, plan)
+
+    def test_message_history(self):
+        queries = self.get(f'/api/chat/messages/{self.consultations[0].id}/')
+        self.assertEqual(len(queries), 1)
+        self.assertUsesIndex(queries, 'chat_message', 'chat_msg_consult_ts_idx')
+
+    def test_notification_feed(self):
+        queries = self.get('/api/consultations/notifications/')
+        self.assertEqual(len(queries), 1)
+        self.assertUsesIndex(queries, 'users_notification', 'users_notif_user_ts_idx')
+
+    def test_lawyer_directory_by_expertise(self):
+        queries = self.get('/api/users/lawyers/?expertise=Civil')
+        self.assertEqual(len(queries), 1)
+        self.assertUsesIndex(queries, 'users_lawyerprofile', 'users_lawyer_exp_appr_idx')
+
+    def test_consultation_lists(self):
+        queries = self.get('/api/consultations/client/')
+        self.assertEqual(len(queries), 1)
+        self.assertUsesIndex(queries, 'consultations_consultationrequest', 'consult_req_client_idx')
+        self.api.force_authenticate(self.lawyer_user)
+        queries = self.get('/api/consultations/lawyer/')
+        self.assertEqual(len(queries), 1)
+        self.assertUsesIndex(queries, 'consultations_consultationrequest', 'consult_req_lawyer_idx')
+
+    def test_reminder_scan(self):
+        queries = self.capture(lambda: call_command('send_reminders', stdout=StringIO()))
+        self.assertUsesIndex(queries, 'chat_meetingschedule', 'chat_meeting_due_idx')
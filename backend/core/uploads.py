@@ -0,0 +1,197 @@
+import hashlib
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions, serializers
+from chat.models import Message
+from users.models import LawyerProfile
+from .models import UploadSession
+
+DEFAULTS = {
+    'CHUNK_SIZE': 5 * 1024 * 1024,
+    'MAX_SIZE': 100 * 1024 * 1024,
+    'SESSION_TTL': 24 * 60 * 60,     # seconds an unfinished upload is kept
+    'TEMP_DIR': None,                # defaults to MEDIA_ROOT/uploads so finalize is a rename
+    # Anonymous (pre-registration) uploads, per client IP: how many may be
+    # open at once, and how fast new ones may be started.
+    'ANON_MAX_OPEN': 3,
+    'ANON_RATE': '20/hour',
+}
+READ_SIZE = 64 * 1024
+
+# Where each kind of upload ends up once finalized.
+TARGET_FIELDS = {
+    'chat': Message._meta.get_field('file'),
+    'qualifications': LawyerProfile._meta.get_field('qualifications'),
+}
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, expected):
+        super().__init__(f'Expected offset {expected}')
+        self.expected = expected
+
+
+def upload_settings():
+    return {**DEFAULTS, **getattr(settings, 'RESUMABLE_UPLOADS', {})}
+
+
+def part_path(session):
+    # Chunks land in one preallocated local file rather than going through
+    # the storage backend: Storage can't write at an offset or append, and
+    # on FileSystemStorage finalize is then a rename. Only the finished,
+    # verified file is saved through the target field's storage.
+    temp_dir = upload_settings()['TEMP_DIR'] or os.path.join(settings.MEDIA_ROOT, 'uploads')
+    os.makedirs(temp_dir, exist_ok=True)
+    return os.path.join(temp_dir, f'{session.id.hex}.part')
+
+
+def start_upload(user, purpose, filename, size, consultation=None, client_ip=None):
+    config = upload_settings()
+    if size <= 0 or size > config['MAX_SIZE']:
+        raise serializers.ValidationError({'size': f"Must be between 1 and {config['MAX_SIZE']} bytes."})
+    if user is None:
+        # Every session reserves its full size on disk, so anonymous
+        # callers only get a few at a time.
+        cutoff = timezone.now() - timedelta(seconds=config['SESSION_TTL'])
+        open_sessions = UploadSession.objects.filter(
+            user__isnull=True, client_ip=client_ip, status='open', updated_at__gte=cutoff,
+        ).count()
+        if open_sessions >= config['ANON_MAX_OPEN']:
+            raise exceptions.Throttled(detail='Too many unfinished uploads; finish or wait for one to expire.')
+    session = UploadSession.objects.create(
+        user=user,
+        client_ip=client_ip if user is None else None,
+        purpose=purpose,
+        consultation=consultation,
+        filename=os.path.basename(filename)[:255] or 'upload',
+        size=size,
+        chunk_size=config['CHUNK_SIZE'],
+    )
+    # Reserve the whole file up front so chunks can land at their offsets.
+    with open(part_path(session), 'wb') as handle:
+        handle.truncate(size)
+    return session
+
+
+def write_chunk(session, offset, stream, length, sha256=None):
+    """
+    Write one chunk from ``stream`` at ``offset``. Chunks arrive in order;
+    every chunk but the last must be exactly ``chunk_size`` bytes. Returns
+    the new offset.
+    """
+    if session.status != 'open':
+        raise serializers.ValidationError({'error': 'Upload is already finalized.'})
+    if offset != session.received:
+        raise OffsetMismatch(session.received)
+    expected = min(session.chunk_size, session.size - offset)
+    if length != expected:
+        raise serializers.ValidationError({'error': f'Chunk must be {expected} bytes.'})
+
+    digest = hashlib.sha256()
+    written = 0
+    with open(part_path(session), 'r+b') as handle:
+        handle.seek(offset)
+        while written < length:
+            data = stream.read(min(READ_SIZE, length - written))
+            if not data:
+                break
+            handle.write(data)
+            digest.update(data)
+            written += len(data)
+
+    if written != length:
+        raise serializers.ValidationError({'error': 'Chunk body ended early.'})
+    if sha256 and digest.hexdigest() != sha256.lower():
+        raise serializers.ValidationError({'error': 'Chunk checksum mismatch.'})
+
+    # Only advance if nobody else did in the meantime; a retried chunk that
+    # raced its original just rewrote the same bytes.
+    new_offset = offset + length
+    advanced = UploadSession.objects.filter(id=session.id, status='open', received=offset).update(
+        received=new_offset, updated_at=timezone.now()
+    )
+    if not advanced:
+        session.refresh_from_db(fields=['received'])
+        raise OffsetMismatch(session.received)
+    session.received = new_offset
+    return new_offset
+
+
+class _PartFile(File):
+    # FileSystemStorage moves anything exposing temporary_file_path()
+    # instead of copying it.
+    def temporary_file_path(self):
+        return self.name
+
+
+def finalize(session, sha256):
+    if session.status != 'open':
+        raise serializers.ValidationError({'error': 'Upload is already finalized.'})
+    if session.received != session.size:
+        raise serializers.ValidationError({'error': f'Upload incomplete: {session.received}/{session.size} bytes.'})
+
+    path = part_path(session)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(READ_SIZE), b''):
+            digest.update(block)
+    if digest.hexdigest() != (sha256 or '').lower():
+        raise serializers.ValidationError({'sha256': 'Checksum does not match the uploaded file.'})
+
+    field = TARGET_FIELDS[session.purpose]
+    name = field.generate_filename(None, session.filename)
+    with _PartFile(open(path, 'rb'), name=path) as part:
+        stored_name = field.storage.save(name, part)
+    if os.path.exists(path):
+        os.remove(path)
+
+    session.stored_name = stored_name
+    session.status = 'complete'
+    session.save(update_fields=['stored_name', 'status', 'updated_at'])
+    return session
+
+
+def claim(upload_id, user, purpose, consultation=None):
+    """
+    Hand a finalized upload to the object it belongs to and return the
+    stored file name. Each upload can be claimed once.
+    """
+    lookup = {'id': upload_id, 'purpose': purpose, 'status': 'complete'}
+    if user is not None:
+        lookup['user'] = user
+    else:
+        lookup['user__isnull'] = True
+    if consultation is not None:
+        lookup['consultation'] = consultation
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().filter(**lookup).first()
+        if session is None:
+            raise serializers.ValidationError({'upload_id': 'No finished upload with this id.'})
+        session.status = 'attached'
+        session.save(update_fields=['status', 'updated_at'])
+    return session.stored_name
+
+
+def purge_stale(now=None):
+    """
+    Drop unfinished or never-claimed uploads older than SESSION_TTL, along
+    with their files, and the bookkeeping rows of attached ones, whose
+    files now belong to the object they were attached to.
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=upload_settings()['SESSION_TTL'])
+    removed, _ = UploadSession.objects.filter(status='attached', updated_at__lt=cutoff).delete()
+    stale = UploadSession.objects.filter(status__in=['open', 'complete'], updated_at__lt=cutoff)
+    for session in stale.iterator():
+        if session.status == 'open':
+            path = part_path(session)
+            if os.path.exists(path):
+                os.remove(path)
+        elif session.stored_name:
+            TARGET_FIELDS[session.purpose].storage.delete(session.stored_name)
+        session.delete()
+        removed += 1
+    return removed
@@ -0,0 +1,20 @@
+from django.urls import path
+from .views import (
+    ChatFileView,
+    QualificationsView,
+    UploadStartView,
+    UploadChunkView,
+    UploadCompleteView,
+    DatabasePoolStatsView,
+    MetricsView,
+)
+
+urlpatterns = [
+    path('media/chat/<int:pk>/', ChatFileView.as_view(), name='media-chat-file'),
+    path('media/qualifications/<int:pk>/', QualificationsView.as_view(), name='media-qualifications'),
+    path('uploads/', UploadStartView.as_view(), name='upload-start'),
+    path('uploads/<uuid:upload_id>/', UploadChunkView.as_view(), name='upload-chunk'),
+    path('uploads/<uuid:upload_id>/complete/', UploadCompleteView.as_view(), name='upload-complete'),
+    path('ops/db-pool/', DatabasePoolStatsView.as_view(), name='db-pool-stats'),
+    path('ops/metrics/', MetricsView.as_view(), name='metrics'),
+]
@@ -1,3 +1,199 @@
-from django.shortcuts import render
+import hmac
+from django.db.models import Q
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework.views import APIView
+from chat.models import Message
+from consultations.models import ConsultationRequest
+from users.models import User, LawyerProfile
+from .db.pool import pool_stats
+from .media import serve_file, unsign_media
+from . import metrics
+from .models import UploadSession
+from . import uploads
 
-# Create your views here.
+
+class ProtectedMediaView(APIView):
+    # Accepts either the usual token header or a ?sig= issued by
+    # sign_media, so links can be opened straight from the app.
+    permission_classes = [AllowAny]
+    kind = None
+
+    def get_fieldfile(self, pk):
+        raise NotImplementedError
+
+    def can_access(self, user_id, obj):
+        raise NotImplementedError
+
+    def get(self, request, pk):
+        if request.user.is_authenticated:
+            user_id = request.user.id
+        else:
+            user_id = unsign_media(request.query_params.get('sig', ''), self.kind, pk)
+            if user_id is None:
+                return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        obj, fieldfile = self.get_fieldfile(pk)
+        if not self.can_access(user_id, obj):
+            return Response({'error': 'Not authorized for this file'}, status=status.HTTP_403_FORBIDDEN)
+        return serve_file(request, fieldfile)
+
+
+class ChatFileView(ProtectedMediaView):
+    kind = 'chat'
+
+    def get_fieldfile(self, pk):
+        message = Message.objects.filter(pk=pk).only('id', 'file', 'consultation_id').first()
+        if message is None or not message.file:
+            raise Http404
+        return message, message.file
+
+    def can_access(self, user_id, message):
+        return ConsultationRequest.objects.filter(
+            Q(client_id=user_id) | Q(lawyer_id=user_id), id=message.consultation_id
+        ).exists()
+
+
+class QualificationsView(ProtectedMediaView):
+    kind = 'qualifications'
+
+    def get_fieldfile(self, pk):
+        profile = LawyerProfile.objects.filter(pk=pk).only('id', 'user_id', 'qualifications').first()
+        if profile is None or not profile.qualifications:
+            raise Http404
+        return profile, profile.qualifications
+
+    def can_access(self, user_id, profile):
+        if user_id == profile.user_id:
+            return True
+        user = self.request.user if self.request.user.is_authenticated else User.objects.filter(id=user_id).first()
+        return user is not None and user.role == 'admin'
+
+
+def _consultation_for(user, consultation_id):
+    return ConsultationRequest.objects.filter(
+        Q(client=user) | Q(lawyer=user), id=consultation_id
+    ).first()
+
+
+class AnonymousUploadThrottle(SimpleRateThrottle):
+    # Starts of anonymous upload sessions per client IP; logged-in users
+    # aren't limited here.
+    scope = 'anonymous_upload'
+
+    def get_rate(self):
+        return uploads.upload_settings()['ANON_RATE']
+
+    def get_cache_key(self, request, view):
+        if request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': request.META.get('REMOTE_ADDR')}
+
+
+class UploadStartView(APIView):
+    # Chat uploads need a logged-in participant; qualifications can be
+    # uploaded anonymously because they're sent before the lawyer registers.
+    permission_classes = [AllowAny]
+    throttle_classes = [AnonymousUploadThrottle]
+
+    def post(self, request):
+        purpose = request.data.get('purpose')
+        if purpose not in uploads.TARGET_FIELDS:
+            return Response({'error': 'Unknown upload purpose'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            return Response({'error': 'size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user if request.user.is_authenticated else None
+        consultation = None
+        if purpose == 'chat':
+            if user is None:
+                return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+            consultation = _consultation_for(user, request.data.get('consultation'))
+            if consultation is None:
+                return Response({'error': 'Not authorized for this consultation'}, status=status.HTTP_403_FORBIDDEN)
+
+        session = uploads.start_upload(
+            user, purpose, request.data.get('filename', ''), size, consultation,
+            client_ip=request.META.get('REMOTE_ADDR'),
+        )
+        return Response({
+            'id': session.id,
+            'chunk_size': session.chunk_size,
+            'offset': session.received,
+            'size': session.size,
+        }, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionMixin:
+    permission_classes = [AllowAny]
+
+    def get_session(self, request, upload_id):
+        user_id = request.user.id if request.user.is_authenticated else None
+        return get_object_or_404(UploadSession, id=upload_id, user_id=user_id)
+
+
+class UploadChunkView(UploadSessionMixin, APIView):
+    # The body is the raw chunk; it is read straight off the socket into the
+    # part file instead of going through a parser.
+
+    def get(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        return Response({'offset': session.received, 'size': session.size, 'status': session.status})
+
+    def put(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return Response({'error': 'Upload-Offset and Content-Length headers are required'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            new_offset = uploads.write_chunk(
+                session, offset, request._request, length, request.headers.get('Upload-Checksum')
+            )
+        except uploads.OffsetMismatch as exc:
+            return Response({'error': 'Offset mismatch', 'offset': exc.expected}, status=status.HTTP_409_CONFLICT)
+        return Response({'offset': new_offset, 'size': session.size})
+
+
+class UploadCompleteView(UploadSessionMixin, APIView):
+    def post(self, request, upload_id):
+        session = uploads.finalize(self.get_session(request, upload_id), request.data.get('sha256'))
+        return Response({'id': session.id, 'status': session.status, 'size': session.size})
+
+
+class DatabasePoolStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(pool_stats())
+
+
+class MetricsView(APIView):
+    # Prometheus text format. Admins can read it with their usual token; a
+    # scraper sends "Authorization: Bearer <REQUEST_METRICS['TOKEN']>".
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        if not self.authorized(request):
+            return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+        body = metrics.render(metrics.pool_lines(pool_stats()))
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    def authorized(self, request):
+        if request.user.is_authenticated and request.user.role == 'admin':
+            return True
+        expected = metrics.metrics_settings()['TOKEN']
+        header = request.headers.get('Authorization', '')
+        if not expected or not header.startswith('Bearer '):
+            return False
+        return hmac.compare_digest(header[len('Bearer '):].encode(), expected.encode())
@@ -0,0 +1,60 @@
+import copy
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from .caching import TTLCache, MISSING
+from .models import User
+
+# Two small maps instead of one: token key -> user id, user id -> User.
+# A user change then drops a single entry no matter how many tokens point
+# at it. Process-local like the display-name cache, so another worker can
+# keep honouring a revoked token for up to TOKEN_AUTH_CACHE_TTL seconds.
+_ttl = getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60)
+_size = getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 4096)
+token_cache = TTLCache(maxsize=_size, ttl=_ttl)
+user_cache = TTLCache(maxsize=_size, ttl=_ttl)
+
+
+def _load_user(user_id):
+    user = user_cache.get(user_id)
+    if user is MISSING:
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            return None
+        user_cache.set(user_id, user)
+    # Views are free to set attributes on request.user; keep the cached
+    # instance out of their reach.
+    return copy.copy(user)
+
+
+def user_for_token(key):
+    """Return the active user a token key belongs to, or None."""
+    user_id = token_cache.get(key)
+    if user_id is MISSING:
+        token = Token.objects.select_related('user').filter(key=key).first()
+        if token is None or not token.user.is_active:
+            return None
+        token_cache.set(key, token.user_id)
+        user_cache.set(token.user_id, token.user)
+        return copy.copy(token.user)
+    return _load_user(user_id)
+
+
+def invalidate_token(key):
+    token_cache.invalidate(key)
+
+
+def invalidate_user(user_id):
+    user_cache.invalidate(user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that answers repeat lookups from memory."""
+
+    def authenticate_credentials(self, key):
+        user = user_for_token(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        return (user, key)
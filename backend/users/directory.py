@@ -0,0 +1,75 @@
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+VERSION_KEY = 'lawyer_directory:version'
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def directory_version():
+    # The version is the time of the last directory change, so it doubles as
+    # Last-Modified. A cold cache starts a fresh version.
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time()), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_directory_version():
+    # Keep versions strictly increasing even for two edits in the same second.
+    version = max(int(time.time()), (cache.get(VERSION_KEY) or 0) + 1)
+    cache.set(VERSION_KEY, version, None)
+
+
+def page_params(request):
+    """Return (page, page_size) from the query string, or (None, None) if unpaged."""
+    page = request.query_params.get('page')
+    page_size = request.query_params.get('page_size')
+    if page is None and page_size is None:
+        return None, None
+    page = max(int(page or 1), 1)
+    page_size = min(max(int(page_size or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    return page, page_size
+
+
+def paginate(queryset, page, page_size):
+    if page is None:
+        return queryset
+    start = (page - 1) * page_size
+    return queryset[start:start + page_size]
+
+
+def directory_response(request, key_parts, build):
+    """
+    Serve a lawyer directory listing from cache, honouring If-None-Match and
+    If-Modified-Since. ``build`` is only called on a miss and must return
+    JSON-serialisable data.
+    """
+    version = directory_version()
+    key = 'lawyer_directory:{}:{}'.format(
+        version, hashlib.md5(json.dumps(key_parts).encode()).hexdigest()
+    )
+
+    entry = cache.get(key)
+    if entry is None:
+        data = build()
+        body = json.dumps(data, cls=JSONEncoder, sort_keys=True).encode()
+        entry = {'data': data, 'etag': f'"{hashlib.md5(body).hexdigest()}"'}
+        cache.set(key, entry, getattr(settings, 'LAWYER_DIRECTORY_CACHE_TIMEOUT', 300))
+
+    not_modified = get_conditional_response(request, etag=entry['etag'], last_modified=version)
+    if not_modified is not None:
+        return not_modified
+
+    response = Response(entry['data'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(version)
+    return response
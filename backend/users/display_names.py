@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from .caching import TTLCache, MISSING as _MISSING
+
+# Per-request memo, installed by DisplayNameMemoMiddleware. None outside a request.
+_request_memo = ContextVar('display_name_memo', default=None)
+
+
+# Process-local: other workers only see a profile rename once their entry expires.
+name_cache = TTLCache(
+    maxsize=getattr(settings, 'DISPLAY_NAME_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'DISPLAY_NAME_CACHE_TTL', 300),
+)
+
+
+def _profile_attrs(user):
+    return ('lawyerprofile', 'clientprofile') if user.role == 'lawyer' else ('clientprofile', 'lawyerprofile')
+
+
+def _load_display_name(user):
+    # Profiles already joined with select_related cost nothing to read.
+    cached = user._state.fields_cache
+    for attr in _profile_attrs(user):
+        if cached.get(attr) is not None:
+            return cached[attr].full_name
+    if all(attr in cached for attr in _profile_attrs(user)):
+        return None
+
+    from .models import ClientProfile, LawyerProfile
+    models = {'clientprofile': ClientProfile, 'lawyerprofile': LawyerProfile}
+    for attr in _profile_attrs(user):
+        name = models[attr].objects.filter(user_id=user.pk).values_list('full_name', flat=True).first()
+        if name is not None:
+            return name
+    return None
+
+
+def display_name(user):
+    """
+    Return the full_name from the user's client or lawyer profile, or None if
+    they have neither. Callers pick their own fallback (usually the email).
+    """
+    if user is None:
+        return None
+
+    memo = _request_memo.get()
+    if memo is not None and user.pk in memo:
+        return memo[user.pk]
+
+    name = name_cache.get(user.pk)
+    if name is _MISSING:
+        name = _load_display_name(user)
+        name_cache.set(user.pk, name)
+
+    if memo is not None:
+        memo[user.pk] = name
+    return name
+
+
+def invalidate_display_name(user_id):
+    name_cache.invalidate(user_id)
+    memo = _request_memo.get()
+    if memo is not None:
+        memo.pop(user_id, None)
+
+
+@contextmanager
+def display_name_memo():
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+class DisplayNameMemoMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with display_name_memo():
+            return self.get_response(request)
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+# Work factors come from settings.PASSWORD_HASHER_PARAMS so each deployment
+# can size them to its hardware. Changing a value makes must_update() true
+# for existing hashes, and they are rehashed on the user's next login.
+
+
+def _params(name):
+    return getattr(settings, 'PASSWORD_HASHER_PARAMS', {}).get(name, {})
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return _params('pbkdf2').get('iterations', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return _params('scrypt').get('work_factor', hashers.ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return _params('scrypt').get('block_size', hashers.ScryptPasswordHasher.block_size)
+
+    @property
+    def parallelism(self):
+        return _params('scrypt').get('parallelism', hashers.ScryptPasswordHasher.parallelism)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    # Needs argon2-cffi; only imported once an argon2 hash is made or checked.
+
+    @property
+    def time_cost(self):
+        return _params('argon2').get('time_cost', hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return _params('argon2').get('memory_cost', hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return _params('argon2').get('parallelism', hashers.Argon2PasswordHasher.parallelism)
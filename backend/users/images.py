@@ -0,0 +1,162 @@
+import atexit
+import hashlib
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+from .directory import bump_directory_version
+from .models import LawyerProfile
+
+logger = logging.getLogger(__name__)
+
+# name -> (max edge in px, crop to square). 144px covers a 48pt avatar at 3x.
+VARIANTS = {
+    'thumb': (144, True),
+    'medium': (640, False),
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+DEFAULTS = {
+    'MODE': 'async',     # 'sync' renders inline, for tests and scripts
+    'WORKERS': 2,
+}
+
+
+def variant_settings():
+    return {**DEFAULTS, **getattr(settings, 'IMAGE_VARIANTS', {})}
+
+
+def _render(source, edge, square):
+    image = source.copy()
+    if square:
+        image = ImageOps.fit(image, (edge, edge), Image.LANCZOS)
+    else:
+        image.thumbnail((edge, edge), Image.LANCZOS)
+    return image
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def build_variants(fieldfile):
+    """
+    Render every variant of an uploaded picture and store it next to the
+    original. Names carry a hash of the source bytes, so a URL never
+    changes meaning and can be cached forever. Returns the mapping that is
+    stored in ``profile_picture_variants``.
+    """
+    storage = fieldfile.storage
+    with storage.open(fieldfile.name, 'rb') as handle:
+        data = handle.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+
+    source = Image.open(io.BytesIO(data))
+    # Let the JPEG decoder downscale while decoding; far cheaper than
+    # decoding a full-size camera photo and resizing afterwards.
+    source.draft('RGB', (max(edge for edge, _ in VARIANTS.values()),) * 2)
+    source = ImageOps.exif_transpose(source)
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGBA' if 'transparency' in source.info else 'RGB')
+
+    directory = posixpath.join(posixpath.dirname(fieldfile.name), 'variants')
+    variants = {'source': fieldfile.name}
+    for name, (edge, square) in VARIANTS.items():
+        image = _render(source, edge, square)
+        variants[name] = {}
+        for fmt in FORMATS:
+            path = posixpath.join(directory, f'{digest}-{name}.{fmt}')
+            if not storage.exists(path):
+                path = storage.save(path, ContentFile(_encode(image, fmt)))
+            variants[name][fmt] = path
+    return variants
+
+
+def _stored_paths(variants):
+    return {
+        path for name in VARIANTS for path in (variants or {}).get(name, {}).values()
+    }
+
+
+def generate(model, pk, source_name):
+    """Build and record variants for one profile, unless its picture has since changed."""
+    profile = model.objects.filter(pk=pk, profile_picture=source_name).first()
+    if profile is None:
+        return None
+    old = profile.profile_picture_variants
+    try:
+        variants = build_variants(profile.profile_picture)
+    except Exception:
+        logger.exception("Could not build variants for %s %s", model.__name__, pk)
+        return None
+    updated = model.objects.filter(pk=pk, profile_picture=source_name).update(
+        profile_picture_variants=variants
+    )
+    if updated:
+        for path in _stored_paths(old) - _stored_paths(variants):
+            profile.profile_picture.storage.delete(path)
+        if model is LawyerProfile:
+            bump_directory_version()
+    return variants
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=variant_settings()['WORKERS'], thread_name_prefix='image-variants'
+            )
+            atexit.register(_executor.shutdown)
+        return _executor
+
+
+def _run(model, pk, source_name):
+    try:
+        generate(model, pk, source_name)
+    finally:
+        close_old_connections()
+
+
+def schedule(profile):
+    """Queue variant generation for a profile once the current transaction commits."""
+    model, pk, source_name = type(profile), profile.pk, profile.profile_picture.name
+
+    def submit():
+        if variant_settings()['MODE'] == 'sync':
+            generate(model, pk, source_name)
+        else:
+            get_executor().submit(_run, model, pk, source_name)
+
+    transaction.on_commit(submit)
+
+
+def variant_urls(profile, request=None):
+    variants = profile.profile_picture_variants or {}
+    if not profile.profile_picture or variants.get('source') != profile.profile_picture.name:
+        return None
+    storage = profile.profile_picture.storage
+    urls = {}
+    for name in VARIANTS:
+        urls[name] = {}
+        for fmt, path in variants.get(name, {}).items():
+            url = storage.url(path)
+            urls[name][fmt] = request.build_absolute_uri(url) if request else url
+    return urls
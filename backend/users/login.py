@@ -0,0 +1,165 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+
+DEFAULTS = {
+    'MODE': 'pool',              # 'inline' verifies in the request thread, for tests and scripts
+    'WORKERS': (os.cpu_count() or 1) // 2,  # 0 or 1 means verify inline: one worker only serializes logins
+    'MAX_PENDING': 64,           # verifications queued or running before logins get a 503
+    'TIMEOUT': 10.0,             # seconds to wait for a worker
+    'RATE_LIMITS': {
+        'email': (10, 300),      # attempts per window (seconds)
+        'ip': (50, 300),
+    },
+}
+
+
+class LoginBusy(Exception):
+    pass
+
+
+def login_settings():
+    return {**DEFAULTS, **getattr(settings, 'LOGIN_PIPELINE', {})}
+
+
+def check_password(password, encoded):
+    """
+    Verify ``password`` against ``encoded``. Returns (valid, new_encoded);
+    new_encoded is set when the hash should be upgraded to the current
+    preferred hasher or its parameters. Runs in a pool worker.
+    """
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, None
+    if not hasher.verify(password, encoded):
+        return False, None
+    preferred = get_hasher('default')
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        return True, make_password(password, hasher=preferred)
+    return True, None
+
+
+def burn_password(password):
+    # Spend the same time for unknown emails so response times don't reveal
+    # which accounts exist.
+    make_password(password)
+    return False, None
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+class HashPool:
+    """
+    Process pool for password hashing. Hashing is CPU-bound and holds the
+    GIL, so doing it in web worker threads stalls every other request in
+    the same process. The number of outstanding jobs is capped; past that
+    submit() raises LoginBusy instead of queueing without limit.
+    """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            # spawn, not fork: forking a threaded web server is unsafe.
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings'),),
+        )
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                raise LoginBusy()
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = login_settings()
+            _pool = HashPool(config['WORKERS'], config['MAX_PENDING'], config['TIMEOUT'])
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def verify(password, encoded):
+    """check_password, run wherever LOGIN_PIPELINE says. ``encoded=None`` means no such user."""
+    fn, args = (check_password, (password, encoded)) if encoded else (burn_password, (password,))
+    config = login_settings()
+    if config['MODE'] == 'inline' or config['WORKERS'] <= 1:
+        # A single pool process would queue every login in the process
+        # behind the one before it; hashing inline is faster than that.
+        return fn(*args)
+    return get_pool().run(fn, *args)
+
+
+class SlidingWindowLimiter:
+    """
+    In-memory sliding-window counter per key. Process-local, so with N
+    workers the effective limit is up to N times higher; it exists to blunt
+    credential stuffing, not as an exact quota.
+    """
+
+    def __init__(self, limit, window, max_keys=100000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """Record an attempt. Returns 0 if allowed, else seconds until the next one is."""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+            self._hits.move_to_end(key)
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return hits[0] + self.window - now
+            hits.append(now)
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+            return 0
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._hits.clear()
+
+
+_limits = login_settings()['RATE_LIMITS']
+email_limiter = SlidingWindowLimiter(*_limits['email'])
+ip_limiter = SlidingWindowLimiter(*_limits['ip'])
@@ -0,0 +1,46 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from users.login import HashPool, check_password
+
+
+class Command(BaseCommand):
+    help = 'Measure password verifications per second, inline and through the login process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Verifications per run (default: 200)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Process pool size (default: all cores)')
+
+    def handle(self, *args, **options):
+        count, workers = options['count'], max(options['workers'], 1)
+        hasher = get_hasher('default')
+        encoded = make_password('benchmark-password')
+        params = {k: v for k, v in hasher.safe_summary(encoded).items() if k not in ('algorithm', 'salt', 'hash')}
+        self.stdout.write(f"🔐 Hasher: {hasher.algorithm} {params}")
+
+        started = time.perf_counter()
+        for _ in range(count):
+            check_password('benchmark-password', encoded)
+        inline_rate = count / (time.perf_counter() - started)
+        self.stdout.write(f"🧵 Inline, 1 core: {inline_rate:.1f} logins/s")
+
+        pool = HashPool(workers, max_pending=count, timeout=60)
+        try:
+            pool.run(check_password, 'benchmark-password', encoded)  # start the workers
+            # Submit from as many threads as there are processes, the way
+            # concurrent web workers would.
+            with ThreadPoolExecutor(max_workers=workers) as clients:
+                started = time.perf_counter()
+                list(clients.map(lambda _: pool.run(check_password, 'benchmark-password', encoded), range(count)))
+                elapsed = time.perf_counter() - started
+        finally:
+            pool.shutdown()
+
+        pool_rate = count / elapsed
+        self.stdout.write(
+            f"⚙️ Pool, {workers} process(es): {pool_rate:.1f} logins/s ({pool_rate / workers:.1f} per core)"
+        )
+        self.stdout.write(self.style.SUCCESS('✅ Login benchmark done'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from users.images import generate
+from users.models import ClientProfile, LawyerProfile
+
+class Command(BaseCommand):
+    help = 'Render thumbnail/medium variants for profile pictures that lack them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render pictures that already have variants')
+
+    def handle(self, *args, **options):
+        built = 0
+        for model in (ClientProfile, LawyerProfile):
+            profiles = model.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            for pk, name, variants in profiles.values_list('pk', 'profile_picture', 'profile_picture_variants').iterator():
+                if not options['all'] and (variants or {}).get('source') == name:
+                    continue
+                if generate(model, pk, name):
+                    built += 1
+        self.stdout.write(self.style.SUCCESS(f"🖼️ Built variants for {built} profile picture(s)"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from users.models import LawyerSearchTerm
+from users.search import rebuild_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the lawyer search index from approved LawyerProfiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Indexed {LawyerSearchTerm.objects.values('profile').distinct().count()} lawyer(s)"
+        ))
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='read',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'timestamp'], name='users_notif_user_ts_idx'),
+        ),
+    ]
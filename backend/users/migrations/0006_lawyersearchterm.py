@@ -0,0 +1,72 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:51
+
+import re
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A frozen copy of users.search as of this migration, so later tokenizer
+# changes don't alter what it writes. Existing rows pick those up from
+# `manage.py rebuild_lawyer_index`.
+MIN_PREFIX = 2
+MAX_TERM = 32
+FIELD_WEIGHTS = {'full_name': 3, 'expertise': 2, 'location': 2}
+TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def tokenize(text):
+    return [token[:MAX_TERM] for token in TOKEN_RE.findall((text or '').lower())]
+
+
+def build_terms(profile, expertise_labels):
+    fields = {
+        'full_name': profile.full_name,
+        'expertise': f"{profile.expertise} {expertise_labels.get(profile.expertise, '')}",
+        'location': profile.location,
+    }
+    terms = defaultdict(int)
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for token in set(tokenize(text)):
+            for end in range(MIN_PREFIX, len(token)):
+                terms[token[:end]] = max(terms[token[:end]], weight)
+            if len(token) >= MIN_PREFIX:
+                terms[token] = max(terms[token], weight * 2)
+    return dict(terms)
+
+
+def build_search_index(apps, schema_editor):
+    LawyerProfile = apps.get_model('users', 'LawyerProfile')
+    LawyerSearchTerm = apps.get_model('users', 'LawyerSearchTerm')
+    expertise_labels = dict(LawyerProfile._meta.get_field('expertise').choices)
+    rows = [
+        LawyerSearchTerm(profile=profile, term=term, weight=weight)
+        for profile in LawyerProfile.objects.filter(approved=True)
+        for term, weight in build_terms(profile, expertise_labels).items()
+    ]
+    LawyerSearchTerm.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_notification_read_user_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LawyerSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=32)),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='users.lawyerprofile')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='lawyersearchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'profile'), name='users_lawyer_term_uniq'),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientprofile',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lawyerprofile',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
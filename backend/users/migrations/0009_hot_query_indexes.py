@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lawyerprofile',
+            index=models.Index(fields=['expertise', 'approved'], name='users_lawyer_exp_appr_idx'),
+        ),
+    ]
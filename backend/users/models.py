@@ -56,6 +56,8 @@ class ClientProfile(models.Model):
     phone_number = models.CharField(max_length=20)
     nic_number = models.CharField(max_length=20)
     profile_picture = models.ImageField(upload_to=profile_picture_path, blank=True, null=True)
+    # Written by users.images once the resized copies exist.
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return self.full_name
@@ -78,15 +80,55 @@ class LawyerProfile(models.Model):
     location = models.CharField(max_length=100)
     approved = models.BooleanField(default=False)
     profile_picture = models.ImageField(upload_to=profile_picture_path, blank=True, null=True)
+    # Written by users.images once the resized copies exist.
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # expertise leads: a bare boolean column can't seek on every backend.
+            models.Index(fields=['expertise', 'approved'], name='users_lawyer_exp_appr_idx'),
+        ]
 
     def __str__(self):
         return self.full_name
+
+class LawyerSearchTerm(models.Model):
+    # Inverted index over approved lawyers, maintained by users.search.
+    profile = models.ForeignKey(LawyerProfile, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=32)
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'profile'], name='users_lawyer_term_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.profile_id}"
     
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
     status = models.CharField(max_length=20, choices=[('info', 'Info'), ('success', 'Success'), ('danger', 'Danger')])
     timestamp = models.DateTimeField(auto_now_add=True)
+    read = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'timestamp'], name='users_notif_user_ts_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.status}] {self.message}"
+
+class NotificationOutbox(models.Model):
+    # Notifications the async dispatcher couldn't write straight away (queue
+    # full, repeated DB errors, shutdown). Drained back into Notification.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    message = models.TextField()
+    status = models.CharField(max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self):
+        return f"outbox [{self.status}] {self.message}"
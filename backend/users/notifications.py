@@ -0,0 +1,252 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from functools import partial
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from .models import Notification, NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+# Queued by wake() in place of a notification.
+_DRAIN = object()
+
+DEFAULTS = {
+    'MODE': 'async',             # 'sync' writes inline, for tests and scripts
+    'DURABLE': True,             # write the outbox in the caller's transaction so a crash can't lose them
+    'WORKERS': 2,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'LINGER': 0.05,              # seconds a worker waits to fill a batch
+    'MAX_RETRIES': 3,
+    'RETRY_BACKOFF': 0.2,        # seconds, doubled per attempt
+    'OUTBOX_POLL_INTERVAL': 5.0,
+}
+
+
+def pipeline_settings():
+    return {**DEFAULTS, **getattr(settings, 'NOTIFICATION_PIPELINE', {})}
+
+
+def _write(notifications):
+    Notification.objects.bulk_create(notifications)
+
+
+def _to_outbox(notifications):
+    NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(user_id=n.user_id, message=n.message, status=n.status)
+        for n in notifications
+    ])
+
+
+class NotificationDispatcher:
+    """
+    Bounded in-process queue drained by a small pool of worker threads.
+
+    Workers coalesce whatever is queued into bulk_create batches and retry
+    transient failures. Anything that can't go straight to Notification -
+    the queue is full, retries ran out, or the process is shutting down -
+    is written to NotificationOutbox, which the workers drain in turn. Items
+    still in memory when the process is killed are lost, which is why
+    dispatch_on_commit() writes to the outbox inside the caller's
+    transaction when DURABLE is on (the default) and only wakes a worker
+    to replay it.
+    """
+
+    def __init__(self, workers=2, queue_size=10000, batch_size=200, linger=0.05,
+                 max_retries=3, retry_backoff=0.2, outbox_poll_interval=5.0):
+        self.batch_size = batch_size
+        self.linger = linger
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.outbox_poll_interval = outbox_poll_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f'notification-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, notifications):
+        for i, notification in enumerate(notifications):
+            try:
+                self._queue.put_nowait(notification)
+            except queue.Full:
+                # Backpressure: rather than block the request or drop the
+                # rest, park the overflow in the outbox with one insert.
+                _to_outbox(notifications[i:])
+                return
+
+    def wake(self):
+        """Have a worker replay the outbox now rather than at its next idle poll."""
+        try:
+            self._queue.put_nowait(_DRAIN)
+        except queue.Full:
+            # Busy workers drain the outbox as soon as the queue empties.
+            pass
+
+    def _take_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.outbox_poll_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_with_retry(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                _write(batch)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    break
+                time.sleep(self.retry_backoff * (2 ** attempt))
+                close_old_connections()
+        logger.error("Giving up on %d notification(s); moving them to the outbox", len(batch))
+        try:
+            _to_outbox(batch)
+        except Exception:
+            logger.exception("Outbox write failed; %d notification(s) lost", len(batch))
+
+    def drain_outbox(self):
+        rows = list(NotificationOutbox.objects.order_by('id')[:self.batch_size])
+        if not rows:
+            return 0
+        ids = [r.id for r in rows]
+        try:
+            with transaction.atomic():
+                # Deleting first claims the rows and takes the write lock at
+                # the start of the transaction. On SQLite, upgrading a read
+                # lock mid-transaction fails at once under contention
+                # instead of waiting out the busy timeout.
+                claimed, _ = NotificationOutbox.objects.filter(id__in=ids).delete()
+                if claimed != len(rows):
+                    # Another worker got to some of these first; whatever
+                    # is left is picked up on the next pass.
+                    transaction.set_rollback(True)
+                    return 0
+                _write([Notification(user_id=r.user_id, message=r.message, status=r.status) for r in rows])
+        except Exception:
+            logger.exception("Outbox replay failed")
+            NotificationOutbox.objects.filter(id__in=ids).update(attempts=F('attempts') + 1)
+            return 0
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self._take_batch()
+                notifications = [n for n in batch if n is not _DRAIN]
+                if notifications:
+                    self._write_with_retry(notifications)
+                if len(notifications) < len(batch):
+                    while self.drain_outbox() and not self._stop.is_set():
+                        pass
+                elif not batch:
+                    self.drain_outbox()
+            except Exception:
+                logger.exception("Notification worker error")
+            finally:
+                close_old_connections()
+
+    def shutdown(self, timeout=5.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _DRAIN:
+                leftover.append(item)
+        if leftover:
+            _to_outbox(leftover)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            config = pipeline_settings()
+            _dispatcher = NotificationDispatcher(
+                workers=config['WORKERS'],
+                queue_size=config['QUEUE_SIZE'],
+                batch_size=config['BATCH_SIZE'],
+                linger=config['LINGER'],
+                max_retries=config['MAX_RETRIES'],
+                retry_backoff=config['RETRY_BACKOFF'],
+                outbox_poll_interval=config['OUTBOX_POLL_INTERVAL'],
+            )
+            atexit.register(_dispatcher.shutdown)
+        return _dispatcher
+
+
+def shutdown_dispatcher():
+    """Stop the workers, if any were started, and flush what they hold."""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.shutdown()
+
+
+def dispatch(notifications):
+    """Hand unsaved Notification instances off for writing."""
+    notifications = list(notifications)
+    if not notifications:
+        return
+    config = pipeline_settings()
+    if config['MODE'] == 'sync':
+        _write(notifications)
+    elif config['DURABLE']:
+        # One narrow insert now; the workers turn outbox rows into
+        # notifications in bulk.
+        _to_outbox(notifications)
+        _wake()
+    else:
+        get_dispatcher().submit(notifications)
+
+
+def dispatch_on_commit(notifications):
+    """
+    Deliver notifications raised inside a transaction once it commits.
+
+    With DURABLE on, the outbox rows are inserted now, as part of the
+    caller's transaction: they commit or roll back with the change that
+    raised them, and nothing but a worker wake-up is left for on_commit.
+    Otherwise the notifications are handed to dispatch() on commit.
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return
+    config = pipeline_settings()
+    if config['MODE'] != 'sync' and config['DURABLE']:
+        _to_outbox(notifications)
+        transaction.on_commit(_wake)
+    else:
+        transaction.on_commit(partial(dispatch, notifications))
+
+
+def _wake():
+    get_dispatcher().wake()
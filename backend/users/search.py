@@ -0,0 +1,96 @@
+import re
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, Sum
+from .models import EXPERTISE_CHOICES, LawyerProfile, LawyerSearchTerm
+
+MIN_PREFIX = 2
+MAX_TERM = 32
+
+# Relative weight of a hit in each field. A whole-word hit counts double a
+# prefix hit so "ali" ranks "Ali Perera" above "Alice Silva".
+FIELD_WEIGHTS = {
+    'full_name': 3,
+    'expertise': 2,
+    'location': 2,
+}
+
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+_EXPERTISE_LABELS = dict(EXPERTISE_CHOICES)
+
+
+def tokenize(text):
+    return [token[:MAX_TERM] for token in _TOKEN_RE.findall((text or '').lower())]
+
+
+def build_terms(profile):
+    """Return {term: weight} for a profile, including edge n-grams of each word."""
+    fields = {
+        'full_name': profile.full_name,
+        'expertise': f"{profile.expertise} {_EXPERTISE_LABELS.get(profile.expertise, '')}",
+        'location': profile.location,
+    }
+    terms = defaultdict(int)
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for token in set(tokenize(text)):
+            for end in range(MIN_PREFIX, len(token)):
+                terms[token[:end]] = max(terms[token[:end]], weight)
+            if len(token) >= MIN_PREFIX:
+                terms[token] = max(terms[token], weight * 2)
+    return dict(terms)
+
+
+def index_lawyer(profile):
+    """Replace a profile's terms. Unapproved lawyers are kept out of the index."""
+    with transaction.atomic():
+        LawyerSearchTerm.objects.filter(profile=profile).delete()
+        if not profile.approved:
+            return
+        LawyerSearchTerm.objects.bulk_create([
+            LawyerSearchTerm(profile=profile, term=term, weight=weight)
+            for term, weight in build_terms(profile).items()
+        ])
+
+
+def rebuild_index(batch_size=500):
+    # One transaction, so concurrent searches keep seeing the old index
+    # until the new one is complete.
+    with transaction.atomic():
+        LawyerSearchTerm.objects.all().delete()
+        rows = []
+        for profile in LawyerProfile.objects.filter(approved=True).iterator(chunk_size=batch_size):
+            rows.extend(
+                LawyerSearchTerm(profile=profile, term=term, weight=weight)
+                for term, weight in build_terms(profile).items()
+            )
+            if len(rows) >= batch_size:
+                LawyerSearchTerm.objects.bulk_create(rows)
+                rows = []
+        LawyerSearchTerm.objects.bulk_create(rows)
+
+
+def search_lawyers(query, expertise=None, offset=0, limit=None):
+    """
+    Return approved LawyerProfiles matching every word of ``query``, best
+    match first. Each word is looked up by exact term, so prefixes work
+    and every lookup is an index seek. Words shorter than MIN_PREFIX
+    aren't indexed, so a query made only of those matches nothing.
+    """
+    tokens = sorted({token for token in tokenize(query) if len(token) >= MIN_PREFIX})
+    if not tokens:
+        return []
+
+    hits = LawyerSearchTerm.objects.filter(term__in=tokens)
+    if expertise:
+        hits = hits.filter(profile__expertise=expertise.lower())
+
+    ranked = list(
+        hits.values('profile_id')
+        .annotate(matched=Count('term'), score=Sum('weight'))
+        .filter(matched=len(tokens))
+        .order_by('-score', 'profile_id')
+        .values_list('profile_id', flat=True)[offset:None if limit is None else offset + limit]
+    )
+    profiles = LawyerProfile.objects.select_related('user').in_bulk(ranked)
+    return [profiles[pk] for pk in ranked if pk in profiles]
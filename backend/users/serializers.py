@@ -1,12 +1,46 @@
+from urllib.parse import urlencode
 from rest_framework import serializers
+from django.db import transaction
+from django.urls import reverse
 from .models import User, ClientProfile, LawyerProfile
+from core import uploads
+from core.media import sign_media
+from core.serialization import FastSerializer
+from .images import variant_urls
 
-class ClientProfileSerializer(serializers.ModelSerializer):
+def qualifications_url(profile, request):
+    # Qualifications aren't under MEDIA_URL; they go through
+    # core.views.QualificationsView, signed for the requesting user.
+    if not profile.qualifications:
+        return None
+    url = reverse('media-qualifications', args=[profile.id])
+    if request is not None and request.user.is_authenticated:
+        url += '?' + urlencode({'sig': sign_media('qualifications', profile.id, request.user.id)})
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+class QualificationsField(serializers.FileField):
+    # Accepts an upload like any FileField; reads back as a protected link.
+
+    def to_representation(self, value):
+        return qualifications_url(value.instance, self.context.get('request'))
+
+
+class ProfilePictureVariantsMixin(serializers.Serializer):
+    # {'thumb': {'webp': url, 'jpeg': url}, 'medium': {...}}, or null until
+    # the background worker has produced them.
+    profile_picture_variants = serializers.SerializerMethodField()
+
+    def get_profile_picture_variants(self, obj):
+        return variant_urls(obj, self.context.get('request'))
+
+
+class ClientProfileSerializer(ProfilePictureVariantsMixin, serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
 
     class Meta:
         model = ClientProfile
-        fields = ['full_name', 'phone_number', 'nic_number', 'email', 'profile_picture']
+        fields = ['full_name', 'phone_number', 'nic_number', 'email', 'profile_picture', 'profile_picture_variants']
 
         extra_kwargs = {
             'full_name': {'required': False},
@@ -16,16 +50,18 @@ class ClientProfileSerializer(serializers.ModelSerializer):
             'profile_picture': {'required': False}
         }        
 
-class LawyerProfileSerializer(serializers.ModelSerializer):
+class LawyerProfileSerializer(ProfilePictureVariantsMixin, serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
     user_id = serializers.IntegerField(source='user.id', read_only=True)
+    qualifications = QualificationsField(required=False, allow_null=True)
     profile_picture = serializers.ImageField(required=False)
 
     class Meta:
         model = LawyerProfile
         fields = [
             'id', 'full_name', 'phone_number', 'nic_number', 'qualifications',
-            'expertise', 'location', 'approved', 'user_id', 'email', 'profile_picture'
+            'expertise', 'location', 'approved', 'user_id', 'email', 'profile_picture',
+            'profile_picture_variants'
         ]
         extra_kwargs = {
             'expertise': {'required': True},
@@ -37,18 +73,40 @@ class LawyerProfileSerializer(serializers.ModelSerializer):
             'profile_picture': {'required': False}
         }
 
+class LawyerProfileFastSerializer(FastSerializer):
+    # LawyerProfileSerializer's output for the directory listings. Needs
+    # the user joined with select_related, as the ModelSerializer does.
+
+    def to_representation(self, obj):
+        return {
+            'id': obj.id,
+            'full_name': obj.full_name,
+            'phone_number': obj.phone_number,
+            'nic_number': obj.nic_number,
+            'qualifications': qualifications_url(obj, self.request),
+            'expertise': obj.expertise,
+            'location': obj.location,
+            'approved': obj.approved,
+            'user_id': obj.user_id,
+            'email': obj.user.email,
+            'profile_picture': self.file(obj.profile_picture),
+            'profile_picture_variants': variant_urls(obj, self.request),
+        }
+
 class RegisterSerializer(serializers.ModelSerializer):
     client_profile = ClientProfileSerializer(required=False)
+    qualifications_upload = serializers.UUIDField(write_only=True, required=False)
 
     class Meta:
         model = User
         fields = [
-            'email', 'password', 'role', 'client_profile'
+            'email', 'password', 'role', 'client_profile', 'qualifications_upload'
         ]
         extra_kwargs = {
             'password': {'write_only': True}
         }
 
+    @transaction.atomic
     def create(self, validated_data):
         request = self.context.get('request')
         role = validated_data.get('role')
@@ -68,6 +126,10 @@ class RegisterSerializer(serializers.ModelSerializer):
             ClientProfile.objects.create(user=user, **client_data)
 
         elif role == 'lawyer':
+            qualifications = request.FILES.get('qualifications')
+            upload_id = validated_data.get('qualifications_upload')
+            if upload_id and not qualifications:
+                qualifications = uploads.claim(upload_id, None, 'qualifications')
             LawyerProfile.objects.create(
                 user=user,
                 full_name=request.data.get('full_name'),
@@ -75,7 +137,7 @@ class RegisterSerializer(serializers.ModelSerializer):
                 nic_number=request.data.get('nic_number'),
                 expertise=request.data.get('expertise'),
                 location=request.data.get('location'),
-                qualifications=request.FILES.get('qualifications'),
+                qualifications=qualifications,
             )
 
         return user
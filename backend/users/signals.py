@@ -0,0 +1,58 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .models import User, ClientProfile, LawyerProfile
+from .display_names import invalidate_display_name
+from .search import index_lawyer
+from .directory import bump_directory_version
+from .images import schedule as schedule_image_variants
+from .authentication import invalidate_token, invalidate_user
+
+
+@receiver(post_save, sender=ClientProfile)
+@receiver(post_save, sender=LawyerProfile)
+@receiver(post_delete, sender=ClientProfile)
+@receiver(post_delete, sender=LawyerProfile)
+def invalidate_profile_display_name(sender, instance, **kwargs):
+    invalidate_display_name(instance.user_id)
+
+
+@receiver(post_save, sender=LawyerProfile)
+def index_lawyer_profile(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_lawyer(instance)
+
+
+@receiver(post_save, sender=ClientProfile)
+@receiver(post_save, sender=LawyerProfile)
+def build_profile_picture_variants(sender, instance, raw=False, **kwargs):
+    picture = instance.profile_picture
+    if raw or not picture:
+        return
+    if (instance.profile_picture_variants or {}).get('source') != picture.name:
+        schedule_image_variants(instance)
+
+
+@receiver(post_save, sender=LawyerProfile)
+@receiver(post_delete, sender=LawyerProfile)
+def invalidate_lawyer_directory(sender, instance, **kwargs):
+    bump_directory_version()
+
+
+@receiver(post_save, sender=User)
+def invalidate_lawyer_directory_for_user(sender, instance, **kwargs):
+    # Directory rows include the lawyer's email.
+    if instance.role == 'lawyer':
+        bump_directory_version()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    # Covers password changes, deactivation and role changes alike.
+    invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
@@ -1,3 +1,375 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from unittest import mock
+from django.contrib.auth import user_login_failed
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache, user_cache
+from .caching import TTLCache
+from .directory import DEFAULT_PAGE_SIZE
+from .login import email_limiter, ip_limiter
+from .display_names import display_name, display_name_memo, name_cache
+from .models import User, ClientProfile, LawyerProfile, Notification, NotificationOutbox
+from .notifications import _DRAIN, NotificationDispatcher, dispatch
+from .search import search_lawyers
 
-# Create your tests here.
+
+class DisplayNameTests(TestCase):
+    def setUp(self):
+        name_cache.clear()
+        self.client_user = User.objects.create_user('client@example.com', 'pw', role='client')
+        self.profile = ClientProfile.objects.create(
+            user=self.client_user, full_name='Client One', phone_number='1', nic_number='1',
+        )
+        self.lawyer_user = User.objects.create_user('lawyer@example.com', 'pw', role='lawyer')
+        LawyerProfile.objects.create(
+            user=self.lawyer_user, full_name='Lawyer One', phone_number='1', nic_number='1',
+            expertise='civil', location='Colombo',
+        )
+
+    def test_lookup_is_cached_after_first_query(self):
+        lawyer = User.objects.get(pk=self.lawyer_user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(display_name(lawyer), 'Lawyer One')
+        with self.assertNumQueries(0):
+            self.assertEqual(display_name(lawyer), 'Lawyer One')
+
+    def test_profile_save_invalidates(self):
+        display_name(self.client_user)
+        self.profile.full_name = 'Renamed'
+        self.profile.save()
+        self.assertEqual(display_name(self.client_user), 'Renamed')
+
+    def test_user_without_profile_is_negatively_cached(self):
+        admin = User.objects.create_user('admin@example.com', 'pw', role='admin')
+        self.assertIsNone(display_name(admin))
+        with self.assertNumQueries(0):
+            self.assertIsNone(display_name(admin))
+
+    def test_request_memo_skips_process_cache(self):
+        with display_name_memo():
+            display_name(self.client_user)
+            name_cache.clear()
+            with self.assertNumQueries(0):
+                self.assertEqual(display_name(self.client_user), 'Client One')
+
+    def test_select_related_profile_costs_nothing(self):
+        user = User.objects.select_related('clientprofile', 'lawyerprofile').get(pk=self.client_user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(display_name(user), 'Client One')
+
+
+class TTLCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        cache.get(1)
+        cache.set(3, 'c')
+        self.assertEqual(cache.get(1), 'a')
+        self.assertIsNot(cache.get(2), 'b')
+
+    def test_expired_entries_are_dropped(self):
+        cache = TTLCache(maxsize=2, ttl=-1)
+        cache.set(1, 'a')
+        self.assertIsNot(cache.get(1), 'a')
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class LawyerSearchTests(TestCase):
+    def make_lawyer(self, email, full_name, expertise='civil', location='Colombo', approved=True):
+        user = User.objects.create_user(email, 'pw', role='lawyer')
+        return LawyerProfile.objects.create(
+            user=user, full_name=full_name, phone_number='1', nic_number='1',
+            expertise=expertise, location=location, approved=approved,
+        )
+
+    def test_prefix_and_multi_field_match(self):
+        ali = self.make_lawyer('ali@example.com', 'Ali Perera', expertise='family', location='Kandy')
+        self.make_lawyer('alice@example.com', 'Alice Silva', location='Kandy')
+
+        self.assertEqual(search_lawyers('ali kandy family'), [ali])
+        self.assertEqual(search_lawyers('ali')[0], ali)
+        self.assertEqual(len(search_lawyers('al kan')), 2)
+
+    def test_unapproved_lawyers_are_not_indexed_until_approved(self):
+        pending = self.make_lawyer('p@example.com', 'Pending Person', approved=False)
+        self.assertEqual(search_lawyers('pending'), [])
+
+        pending.approved = True
+        pending.save()
+        self.assertEqual(search_lawyers('pending'), [pending])
+
+    def test_rename_reindexes(self):
+        lawyer = self.make_lawyer('r@example.com', 'Old Name')
+        lawyer.full_name = 'New Name'
+        lawyer.save()
+        self.assertEqual(search_lawyers('old'), [])
+        self.assertEqual(search_lawyers('new'), [lawyer])
+
+    def test_expertise_filter_and_pagination(self):
+        for i in range(5):
+            self.make_lawyer(f'l{i}@example.com', f'Lawyer {i}', expertise='criminal' if i % 2 else 'civil')
+        self.assertEqual(len(search_lawyers('lawyer', expertise='criminal')), 2)
+        self.assertEqual(len(search_lawyers('lawyer', offset=3, limit=10)), 2)
+
+    def test_query_without_indexable_words_matches_nothing(self):
+        self.make_lawyer('a@example.com', 'Ali Perera')
+        self.assertEqual(search_lawyers('a'), [])
+
+        client = User.objects.create_user('client@example.com', 'pw', role='client')
+        api = APIClient()
+        api.force_authenticate(client)
+        self.assertEqual(api.get('/api/users/lawyers/', {'search': 'a'}).json(), [])
+
+    def test_unpaged_search_returns_every_match(self):
+        for i in range(DEFAULT_PAGE_SIZE + 5):
+            self.make_lawyer(f'l{i}@example.com', f'Lawyer {i}')
+        client = User.objects.create_user('client@example.com', 'pw', role='client')
+        api = APIClient()
+        api.force_authenticate(client)
+        self.assertEqual(len(api.get('/api/users/lawyers/', {'search': 'lawyer'}).json()), DEFAULT_PAGE_SIZE + 5)
+        self.assertEqual(len(api.get('/api/users/lawyers/', {'search': 'lawyer', 'page': 2}).json()), 5)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class LawyerDirectoryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client_user = User.objects.create_user('client@example.com', 'pw', role='client')
+        self.admin = User.objects.create_user('admin@example.com', 'pw', role='admin')
+        for i in range(3):
+            user = User.objects.create_user(f'lawyer{i}@example.com', 'pw', role='lawyer')
+            LawyerProfile.objects.create(
+                user=user, full_name=f'Lawyer {i}', phone_number='1', nic_number='1',
+                expertise='civil', location='Colombo', approved=i != 2,
+            )
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def test_cache_hit_makes_no_queries(self):
+        self.assertEqual(len(self.api.get('/api/users/lawyers/').json()), 2)
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/users/lawyers/')
+        self.assertEqual(len(response.json()), 2)
+
+    def test_etag_round_trip_returns_304(self):
+        etag = self.api.get('/api/users/lawyers/')['ETag']
+        response = self.api.get('/api/users/lawyers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_approval_invalidates_listing(self):
+        etag = self.api.get('/api/users/lawyers/')['ETag']
+
+        admin_api = APIClient()
+        admin_api.force_authenticate(self.admin)
+        pending = LawyerProfile.objects.get(approved=False)
+        admin_api.post(f'/api/users/approve-lawyer/{pending.user_id}/')
+
+        response = self.api.get('/api/users/lawyers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+
+    def test_pagination(self):
+        response = self.api.get('/api/users/lawyers/', {'page': 2, 'page_size': 1})
+        self.assertEqual([l['full_name'] for l in response.json()], ['Lawyer 1'])
+
+
+class NotificationDispatcherTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('someone@example.com', 'pw', role='client')
+        # No worker threads: batches are driven by hand.
+        self.dispatcher = NotificationDispatcher(workers=0, queue_size=2, batch_size=10, linger=0)
+
+    def make(self, count):
+        return [Notification(user=self.user, message=f'n{i}', status='info') for i in range(count)]
+
+    def test_overflow_goes_to_outbox(self):
+        self.dispatcher.submit(self.make(5))
+        self.assertEqual(self.dispatcher._queue.qsize(), 2)
+        self.assertEqual(NotificationOutbox.objects.count(), 3)
+
+    def test_queued_items_are_written_in_one_batch(self):
+        self.dispatcher.submit(self.make(2))
+        batch = self.dispatcher._take_batch()
+        with self.assertNumQueries(1):
+            self.dispatcher._write_with_retry(batch)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_outbox_is_drained_into_notifications(self):
+        self.dispatcher.submit(self.make(4))
+        self.assertEqual(self.dispatcher.drain_outbox(), 2)
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_shutdown_parks_queued_items_in_outbox(self):
+        self.dispatcher.submit(self.make(2))
+        self.dispatcher.shutdown()
+        self.assertEqual(NotificationOutbox.objects.count(), 2)
+
+    @override_settings(NOTIFICATION_PIPELINE={'MODE': 'sync'})
+    def test_sync_mode_writes_inline(self):
+        dispatch(self.make(3))
+        self.assertEqual(Notification.objects.count(), 3)
+
+    @override_settings(NOTIFICATION_PIPELINE={'MODE': 'async'})
+    def test_async_mode_writes_the_outbox_first_by_default(self):
+        with mock.patch('users.notifications.get_dispatcher', return_value=self.dispatcher):
+            dispatch(self.make(3))
+        self.assertEqual(NotificationOutbox.objects.count(), 3)
+        self.assertFalse(Notification.objects.exists())
+
+        batch = self.dispatcher._take_batch()
+        self.assertEqual(batch, [_DRAIN])
+        self.assertEqual(self.dispatcher.drain_outbox(), 3)
+        self.assertEqual(Notification.objects.count(), 3)
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_VARIANTS={'MODE': 'sync'})
+class ProfilePictureVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('pic@example.com', 'pw', role='lawyer')
+        self.profile = LawyerProfile.objects.create(
+            user=self.user, full_name='Pic', phone_number='1', nic_number='1',
+            expertise='civil', location='Colombo', approved=True,
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def upload(self, color):
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 800), color).save(buffer, 'JPEG')
+        picture = SimpleUploadedFile('me.jpg', buffer.getvalue(), content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.patch('/api/users/lawyer-profile/', {'profile_picture': picture}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.profile.refresh_from_db()
+        return self.profile.profile_picture_variants
+
+    def test_upload_builds_hashed_variants(self):
+        variants = self.upload('red')
+
+        self.assertEqual(variants['source'], self.profile.profile_picture.name)
+        thumb = self.profile.profile_picture.storage.open(variants['thumb']['webp'])
+        self.assertEqual(Image.open(thumb).size, (144, 144))
+        medium = self.profile.profile_picture.storage.open(variants['medium']['jpeg'])
+        self.assertEqual(Image.open(medium).size, (640, 427))
+        self.assertRegex(variants['thumb']['jpeg'], r'variants/[0-9a-f]{16}-thumb\.jpeg$')
+
+        self.api.force_authenticate(User.objects.create_user('viewer@example.com', 'pw', role='client'))
+        urls = self.api.get('/api/users/lawyers/').json()[0]['profile_picture_variants']
+        self.assertTrue(urls['thumb']['webp'].endswith(variants['thumb']['webp']))
+
+    def test_replacing_picture_drops_old_variants(self):
+        old = self.upload('red')
+        new = self.upload('blue')
+
+        storage = self.profile.profile_picture.storage
+        self.assertNotEqual(old['thumb']['webp'], new['thumb']['webp'])
+        self.assertFalse(storage.exists(old['thumb']['webp']))
+        self.assertTrue(storage.exists(new['thumb']['webp']))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user('auth@example.com', 'pw', role='client')
+        self.token = Token.objects.create(user=self.user)
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_requests_skip_the_token_lookup(self):
+        self.assertEqual(self.api.get('/api/users/me/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/users/me/')
+        self.assertEqual(response.json()['email'], 'auth@example.com')
+
+    def test_logout_revokes_token(self):
+        self.api.get('/api/users/me/')
+        self.assertEqual(self.api.post('/api/users/logout/').status_code, 200)
+        self.assertEqual(self.api.get('/api/users/me/').status_code, 401)
+
+    def test_user_changes_invalidate(self):
+        self.api.get('/api/users/me/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.api.get('/api/users/me/').status_code, 401)
+
+        self.user.is_active = True
+        self.user.role = 'lawyer'
+        self.user.save()
+        self.assertEqual(self.api.get('/api/users/me/').json()['role'], 'lawyer')
+
+
+@override_settings(
+    PASSWORD_HASHER_PARAMS={'pbkdf2': {'iterations': 1000}},
+    LOGIN_PIPELINE={'MODE': 'inline'},
+)
+class LoginTests(TestCase):
+    def setUp(self):
+        email_limiter.clear()
+        ip_limiter.clear()
+        self.user = User.objects.create_user('login@example.com', 'secret-pw', role='client')
+        self.api = APIClient()
+
+    def login(self, password='secret-pw', email='login@example.com'):
+        return self.api.post('/api/users/login/', {'email': email, 'password': password})
+
+    def test_malformed_credentials_are_rejected(self):
+        for body in ({}, {'email': 123, 'password': 'secret-pw'}, {'email': ['login@example.com'], 'password': 'x'},
+                     {'email': 'login@example.com', 'password': None}, {'email': 'login@example.com', 'password': 5}):
+            response = self.api.post('/api/users/login/', body, format='json')
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_login_and_failures(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login('wrong').status_code, 401)
+        self.assertEqual(self.login(email='nobody@example.com').status_code, 401)
+
+    def test_failed_logins_send_user_login_failed(self):
+        received = []
+
+        def receiver(sender, credentials, request, **kwargs):
+            received.append(credentials)
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        self.login()
+        self.login('wrong')
+        self.login(email='nobody@example.com')
+        self.assertEqual([c['email'] for c in received], ['login@example.com', 'nobody@example.com'])
+        self.assertNotIn('wrong', [c['password'] for c in received])
+
+    def test_single_worker_pool_verifies_inline(self):
+        with self.settings(LOGIN_PIPELINE={'MODE': 'pool', 'WORKERS': 1}):
+            with mock.patch('users.login.get_pool') as get_pool:
+                self.assertEqual(self.login().status_code, 200)
+        get_pool.assert_not_called()
+
+    def test_changed_work_factor_rehashes_on_login(self):
+        with self.settings(PASSWORD_HASHER_PARAMS={'pbkdf2': {'iterations': 2000}}):
+            self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+        self.assertTrue(self.user.check_password('secret-pw'))
+
+    def test_repeated_attempts_are_rate_limited(self):
+        for _ in range(10):
+            self.login('wrong')
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
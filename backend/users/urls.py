@@ -1,8 +1,7 @@
 from django.urls import path
-from django.conf import settings
-from django.conf.urls.static import static
 from .views import (
     LoginView,
+    LogoutView,
     RegisterView,
     get_user_profile,
     get_unapproved_lawyers,
@@ -16,6 +15,7 @@ from .views import (
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
     path('me/', get_user_profile, name='me'),
     path('unapproved-lawyers/', get_unapproved_lawyers, name='unapproved-lawyers'),
     path('approved-lawyers/', get_approved_lawyers, name='approved-lawyers'),
@@ -23,4 +23,4 @@ urlpatterns = [
     path('lawyers/', list_lawyers, name='list-lawyers'),
     path('lawyer-profile/', LawyerProfileView.as_view(), name='lawyer-profile'),
     path('client-profile/', ClientProfileView.as_view(), name='client-profile'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file
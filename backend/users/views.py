@@ -1,12 +1,15 @@
+import logging
+import math
+from django.contrib.auth import user_login_failed
 from rest_framework import generics, permissions, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.authentication import TokenAuthentication
+from .authentication import CachedTokenAuthentication, invalidate_user
+from .login import LoginBusy, email_limiter, ip_limiter, verify
 from rest_framework.authtoken.models import Token
-from django.contrib.auth import authenticate
-from .models import LawyerProfile
+from .models import User, LawyerProfile
 from .serializers import LawyerProfileSerializer
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -17,18 +20,23 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from .serializers import (
     ClientProfileSerializer,
     LawyerProfileSerializer,
+    LawyerProfileFastSerializer,
     RegisterSerializer
 )
 from users.serializers import LawyerProfileSerializer
 
 from .serializers import RegisterSerializer
+from .search import search_lawyers
+from core.db.routers import read_replica
+from .directory import directory_response, page_params, paginate
+
+logger = logging.getLogger(__name__)
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
 
     def post(self, request, *args, **kwargs):
-        print("Incoming registration data:", request.data)
         serializer = self.get_serializer(data=request.data)
 
         if serializer.is_valid():
@@ -38,7 +46,7 @@ class RegisterView(generics.CreateAPIView):
                 "user": RegisterSerializer(user, context={"request": request}).data
             }, status=status.HTTP_201_CREATED)
 
-        print("Registration error:", serializer.errors)
+        logger.info("Registration rejected: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class LoginView(APIView):
@@ -46,16 +54,52 @@ class LoginView(APIView):
         email = request.data.get('email')
         password = request.data.get('password')
 
-        if not email or not password:
+        # JSON bodies can carry any type; only strings go on to the limiter and hasher.
+        if not isinstance(email, str) or not isinstance(password, str) or not email or not password:
             return Response({'error': 'Email and password required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = authenticate(request, username=email, password=password)
-
-        if user is None:
+        retry_after = max(ip_limiter.hit(request.META.get('REMOTE_ADDR')), email_limiter.hit(email.lower()))
+        if retry_after:
+            response = Response({'error': 'Too many login attempts. Try again later.'},
+                                status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(math.ceil(retry_after))
+            return response
+
+        # Same checks as ModelBackend, but the hash is verified in the login
+        # process pool rather than on this worker's CPU.
+        user = User.objects.filter(email=email).first()
+        try:
+            valid, new_encoded = verify(password, user.password if user and user.is_active else None)
+        except LoginBusy:
+            response = Response({'error': 'Login is busy, please retry.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = '1'
+            return response
+
+        if not valid:
+            # authenticate() would have sent this; receivers (auditing,
+            # lockout) still expect it. The password is masked the same way.
+            user_login_failed.send(
+                sender=__name__, credentials={'email': email, 'password': '********************'},
+                request=request,
+            )
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
+        if new_encoded:
+            # Hasher or work factor changed since this password was set.
+            User.objects.filter(pk=user.pk, password=user.password).update(password=new_encoded)
+            invalidate_user(user.pk)
+        email_limiter.reset(email.lower())
+
         token, created = Token.objects.get_or_create(user=user)
         return Response({'token': token.key}, status=status.HTTP_200_OK)
+
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # Deleting the token also drops it from the auth cache (users.signals).
+        Token.objects.filter(key=request.auth).delete()
+        return Response({'message': 'Logged out'}, status=status.HTTP_200_OK)
     
 
 class ClientProfileView(generics.RetrieveUpdateAPIView):
@@ -76,7 +120,7 @@ class LawyerProfileView(generics.RetrieveUpdateAPIView):
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_user_profile(request):
     return Response({
@@ -84,28 +128,34 @@ def get_user_profile(request):
         'role': request.user.role,
     })
 
+def _admin_directory(request, approved):
+    if request.user.role != 'admin':
+        return Response({'error': 'Unauthorized'}, status=403)
+    try:
+        page, page_size = page_params(request)
+    except ValueError:
+        return Response({'error': 'page and page_size must be integers'}, status=400)
+
+    def build():
+        lawyers = LawyerProfile.objects.filter(approved=approved).select_related('user').order_by('id')
+        return LawyerProfileFastSerializer(paginate(lawyers, page, page_size), many=True).data
+
+    return directory_response(request, ['admin', approved, page, page_size], build)
+
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_unapproved_lawyers(request):
-    if request.user.role != 'admin':
-        return Response({'error': 'Unauthorized'}, status=403)
-    lawyers = LawyerProfile.objects.filter(approved=False)
-    serializer = LawyerProfileSerializer(lawyers, many=True)
-    return Response(serializer.data)
+    return _admin_directory(request, approved=False)
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_approved_lawyers(request):
-    if request.user.role != 'admin':
-        return Response({'error': 'Unauthorized'}, status=403)
-    lawyers = LawyerProfile.objects.filter(approved=True)
-    serializer = LawyerProfileSerializer(lawyers, many=True)
-    return Response(serializer.data)
+    return _admin_directory(request, approved=True)
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def approve_lawyer(request, user_id):
     if request.user.role != 'admin':
@@ -120,21 +170,32 @@ def approve_lawyer(request, user_id):
     
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
+@read_replica
 def list_lawyers(request):
     if request.user.role != 'client':
         return Response({'error': 'Unauthorized'}, status=403)
 
-    queryset = LawyerProfile.objects.filter(approved=True)
-
     search = request.query_params.get('search')
     expertise = request.query_params.get('expertise')
-
-    if search:
-        queryset = queryset.filter(full_name__icontains=search)
-    if expertise:
-        queryset = queryset.filter(expertise__iexact=expertise)
-
-    serializer = LawyerProfileSerializer(queryset, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    try:
+        page, page_size = page_params(request)
+    except ValueError:
+        return Response({'error': 'page and page_size must be integers'}, status=400)
+
+    def build():
+        if search:
+            # Unpaged, like the plain listing, when no page was asked for.
+            offset = (page - 1) * page_size if page else 0
+            results = search_lawyers(search, expertise, offset=offset, limit=page_size)
+            return LawyerProfileFastSerializer(results, many=True).data
+
+        queryset = LawyerProfile.objects.filter(approved=True).select_related('user').order_by('id')
+        if expertise:
+            # Choice keys are lower case; an exact match can use the index
+            # where iexact can't.
+            queryset = queryset.filter(expertise=expertise.lower())
+        return LawyerProfileFastSerializer(paginate(queryset, page, page_size), many=True).data
+
+    return directory_response(request, ['clients', search, expertise, page, page_size], build)
@@ -38,6 +38,13 @@ export default function TabsLayout() {
   }, []);
 
   const handleLogout = async (e?: GestureResponderEvent) => {
+    const token = await SecureStore.getItemAsync('authToken');
+    if (token) {
+      // Revoke server-side too; ignore failures so logout always works offline.
+      await api
+        .post('users/logout/', null, { headers: { Authorization: `Token ${token}` } })
+        .catch(() => {});
+    }
     await SecureStore.deleteItemAsync('authToken');
     router.replace('/login');
   };
@@ -20,6 +20,7 @@ export default function ClientDashboard() {
   const [cpBalance, setCpBalance] = useState<number>(0);
   const [clientName, setClientName] = useState<string>('Loading...');
   const [loading, setLoading] = useState(true);
+  const [nextPage, setNextPage] = useState<string | null>(null);
 
   const fetchDashboardData = async () => {
     try {
@@ -27,13 +28,17 @@ export default function ClientDashboard() {
       if (!token) return Alert.alert('Error', 'No token found');
 
       const [consultRes, cpRes, meRes, profileRes] = await Promise.all([
-        api.get('consultations/client/', { headers: { Authorization: `Token ${token}` } }),
+        api.get('consultations/client/', {
+          headers: { Authorization: `Token ${token}` },
+          params: { status: 'pending,accepted,completed' },
+        }),
         api.get('consultations/points/', { headers: { Authorization: `Token ${token}` } }),
         api.get('users/me/', { headers: { Authorization: `Token ${token}` } }),
         api.get('users/client-profile/', { headers: { Authorization: `Token ${token}` } }),
       ]);
 
-      setConsultations(consultRes.data);
+      setConsultations(consultRes.data.results);
+      setNextPage(consultRes.data.next);
       setCpBalance(cpRes.data.balance);
       setClientName(profileRes.data.full_name || meRes.data.email);
 
@@ -62,6 +67,18 @@ export default function ClientDashboard() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    try {
+      const token = await SecureStore.getItemAsync('authToken');
+      const res = await api.get(nextPage, { headers: { Authorization: `Token ${token}` } });
+      setConsultations((prev) => [...prev, ...res.data.results]);
+      setNextPage(res.data.next);
+    } catch (err) {
+      console.error('Error loading more consultations:', err);
+    }
+  };
+
   useEffect(() => {
     fetchDashboardData();
   }, []);
@@ -123,6 +140,12 @@ export default function ClientDashboard() {
           </View>
         ))
       )}
+
+      {nextPage && (
+        <TouchableOpacity style={styles.chatBtn} onPress={loadMore}>
+          <Text style={styles.chatText}>Load more</Text>
+        </TouchableOpacity>
+      )}
     </ScrollView>
   );
 }
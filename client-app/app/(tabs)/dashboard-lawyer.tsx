@@ -23,6 +23,7 @@ export default function LawyerDashboard() {
   const [consultations, setConsultations] = useState<Consultation[]>([]);
   const [lawyerName, setLawyerName] = useState<string>('Loading...');
   const [loading, setLoading] = useState(true);
+  const [nextPage, setNextPage] = useState<string | null>(null);
 
   const fetchData = async () => {
     try {
@@ -31,6 +32,7 @@ export default function LawyerDashboard() {
 
       const consultationRes = await api.get('consultations/lawyer/', {
         headers: { Authorization: `Token ${token}` },
+        params: { status: 'pending,accepted,completed' },
       });
 
       const meRes = await api.get('users/me/', {
@@ -48,7 +50,8 @@ export default function LawyerDashboard() {
         }
       }
 
-      setConsultations(consultationRes.data);
+      setConsultations(consultationRes.data.results);
+      setNextPage(consultationRes.data.next);
     } catch (err: any) {
       console.error('Error loading dashboard:', err);
       Alert.alert('Error', 'Failed to load consultations');
@@ -61,6 +64,20 @@ export default function LawyerDashboard() {
     fetchData();
   }, []);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    try {
+      const token = await SecureStore.getItemAsync('authToken');
+      const res = await api.get(nextPage, {
+        headers: { Authorization: `Token ${token}` },
+      });
+      setConsultations((prev) => [...prev, ...res.data.results]);
+      setNextPage(res.data.next);
+    } catch (err) {
+      console.error('Error loading more consultations:', err);
+    }
+  };
+
   const updateStatus = async (id: number, status: string) => {
     try {
       const token = await SecureStore.getItemAsync('authToken');
@@ -149,6 +166,12 @@ export default function LawyerDashboard() {
           </View>
         ))
       )}
+
+      {nextPage && (
+        <TouchableOpacity style={styles.chatBtn} onPress={loadMore}>
+          <Text style={styles.chatBtnText}>Load more</Text>
+        </TouchableOpacity>
+      )}
     </ScrollView>
   );
 }
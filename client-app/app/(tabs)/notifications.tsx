@@ -1,10 +1,11 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import {
   View,
   Text,
   StyleSheet,
   ScrollView,
   ActivityIndicator,
+  TouchableOpacity,
 } from 'react-native';
 import { api } from '@/lib/api';
 import * as SecureStore from 'expo-secure-store';
@@ -14,11 +15,24 @@ interface Notification {
   message: string;
   timestamp: string;
   status: 'info' | 'success' | 'danger';
+  read: boolean;
 }
 
 export default function NotificationsScreen() {
   const [notifications, setNotifications] = useState<Notification[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  // Timestamp of the newest notification on screen; the poll asks for anything after it.
+  const newest = useRef<string | null>(null);
+
+  const markRead = async (page: Notification[], token: string) => {
+    // Everything on screen has now been seen.
+    if (page.some((n) => !n.read)) {
+      await api.post('consultations/notifications/mark-read/', { up_to: page[0].id }, {
+        headers: { Authorization: `Token ${token}` },
+      });
+    }
+  };
 
   useEffect(() => {
     const fetchNotifications = async () => {
@@ -29,7 +43,11 @@ export default function NotificationsScreen() {
         const res = await api.get('consultations/notifications/', {
           headers: { Authorization: `Token ${token}` },
         });
-        setNotifications(res.data);
+        const page: Notification[] = res.data.results;
+        setNotifications(page);
+        setNextPage(res.data.next);
+        if (page.length) newest.current = page[0].timestamp;
+        await markRead(page, token);
       } catch (err) {
         console.error('Failed to fetch notifications:', err);
       } finally {
@@ -37,11 +55,52 @@ export default function NotificationsScreen() {
       }
     };
 
+    const pollNotifications = async () => {
+      if (!newest.current) return fetchNotifications();
+      const token = await SecureStore.getItemAsync('authToken');
+      if (!token) return;
+
+      try {
+        const fresh: Notification[] = [];
+        let url: string | null = `consultations/notifications/?since=${encodeURIComponent(newest.current)}`;
+        while (url) {
+          const res = await api.get(url, { headers: { Authorization: `Token ${token}` } });
+          fresh.push(...res.data.results);
+          url = res.data.next;
+        }
+        if (!fresh.length) return;
+
+        newest.current = fresh[0].timestamp;
+        setNotifications((prev) => {
+          const seen = new Set(fresh.map((n) => n.id));
+          return [...fresh, ...prev.filter((n) => !seen.has(n.id))];
+        });
+        await markRead(fresh, token);
+      } catch (err) {
+        console.error('Failed to poll notifications:', err);
+      }
+    };
+
     fetchNotifications();
-    const interval = setInterval(fetchNotifications, 30000);
+    const interval = setInterval(pollNotifications, 30000);
     return () => clearInterval(interval);
   }, []);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    try {
+      const token = await SecureStore.getItemAsync('authToken');
+      const res = await api.get(nextPage, { headers: { Authorization: `Token ${token}` } });
+      setNotifications((prev) => {
+        const seen = new Set(prev.map((n) => n.id));
+        return [...prev, ...res.data.results.filter((n: Notification) => !seen.has(n.id))];
+      });
+      setNextPage(res.data.next);
+    } catch (err) {
+      console.error('Error loading more notifications:', err);
+    }
+  };
+
   if (loading) {
     return (
       <View style={styles.centered}>
@@ -63,6 +122,11 @@ export default function NotificationsScreen() {
           </View>
         ))
       )}
+      {nextPage && (
+        <TouchableOpacity style={styles.moreBtn} onPress={loadMore}>
+          <Text style={styles.moreText}>Load more</Text>
+        </TouchableOpacity>
+      )}
     </ScrollView>
   );
 }
@@ -112,4 +176,15 @@ const styles = StyleSheet.create({
   danger: {
     backgroundColor: '#e74c3c',
   },
+  moreBtn: {
+    backgroundColor: '#AFA2A2',
+    paddingVertical: 8,
+    paddingHorizontal: 14,
+    borderRadius: 8,
+    alignSelf: 'center',
+  },
+  moreText: {
+    color: '#fff',
+    fontWeight: '600',
+  },
 });
@@ -21,6 +21,7 @@ interface UserProfileClient {
   phone_number: string;
   nic_number: string;
   profile_picture?: string | null;
+  profile_picture_variants?: Record<'thumb' | 'medium', { webp: string; jpeg: string }> | null;
 }
 
 interface UserProfileLawyer extends UserProfileClient {
@@ -164,7 +165,12 @@ export default function ProfileScreen() {
 
       <TouchableOpacity style={styles.avatarContainer} onPress={pickImage}>
         {newImage || profile.profile_picture ? (
-          <Image source={{ uri: newImage?.uri || profile.profile_picture! }} style={styles.avatar} />
+          <Image
+            source={{
+              uri: newImage?.uri || profile.profile_picture_variants?.medium.jpeg || profile.profile_picture!,
+            }}
+            style={styles.avatar}
+          />
         ) : (
           <View style={[styles.avatar, styles.avatarFallback]}>
             <Text style={styles.avatarText}>{initials}</Text>
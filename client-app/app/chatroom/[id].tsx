@@ -27,6 +27,17 @@ export default function Chatroom() {
   const [otherName, setOtherName] = useState('');
   const scrollViewRef = useRef<ScrollView>(null);
   const [isPickerVisible, setPickerVisible] = useState(false);
+  const lastMessageId = useRef<number | null>(null);
+  const socketRef = useRef<WebSocket | null>(null);
+
+  const appendMessages = (incoming: Message[]) => {
+    if (incoming.length === 0) return;
+    lastMessageId.current = incoming[incoming.length - 1].id;
+    setMessages((prev) => {
+      const seen = new Set(prev.map((m) => m.id));
+      return [...prev, ...incoming.filter((m) => !seen.has(m.id))];
+    });
+  };
 
   const fetchUserAndMessages = async () => {
     const token = await SecureStore.getItemAsync('authToken');
@@ -39,10 +50,27 @@ export default function Chatroom() {
     ]);
 
     setUserEmail(meRes.data.email);
-    setMessages(msgRes.data);
+    lastMessageId.current = null;
+    setMessages([]);
+    appendMessages(msgRes.data);
     setOtherName(nameRes.data.name);
   };
 
+  // Steady-state polling only asks for messages newer than the last one seen,
+  // and is skipped entirely while the push socket is connected.
+  const fetchNewMessages = async () => {
+    if (lastMessageId.current === null) return fetchUserAndMessages();
+    if (socketRef.current?.readyState === WebSocket.OPEN) return;
+    const token = await SecureStore.getItemAsync('authToken');
+    if (!token) return;
+
+    const res = await api.get(`chat/messages/${id}/`, {
+      headers: { Authorization: `Token ${token}` },
+      params: { after_id: lastMessageId.current },
+    });
+    appendMessages(res.data);
+  };
+
   const sendMessage = async () => {
     if (!newMessage.trim()) return;
     const token = await SecureStore.getItemAsync('authToken');
@@ -50,7 +78,7 @@ export default function Chatroom() {
       headers: { Authorization: `Token ${token}` }
     });
     setNewMessage('');
-    fetchUserAndMessages();
+    fetchNewMessages();
   };
 
   const sendFile = async () => {
@@ -72,7 +100,7 @@ export default function Chatroom() {
         'Content-Type': 'multipart/form-data',
       },
     });
-    fetchUserAndMessages();
+    fetchNewMessages();
   };
 
   const handleSchedule = async (date: Date) => {
@@ -91,10 +119,31 @@ export default function Chatroom() {
     }
   };
 
+  const connectSocket = async () => {
+    const token = await SecureStore.getItemAsync('authToken');
+    if (!token) return;
+
+    const wsBase = (api.defaults.baseURL || '').replace(/^http/, 'ws').replace(/api\/?$/, '');
+    const socket = new WebSocket(`${wsBase}ws/chat/${id}/?token=${token}`);
+    socket.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'message') appendMessages([data.message]);
+    };
+    // Once closed, the after_id poll takes over again and catches up.
+    socket.onclose = () => {
+      socketRef.current = null;
+    };
+    socketRef.current = socket;
+  };
+
   useEffect(() => {
     fetchUserAndMessages();
-    const interval = setInterval(fetchUserAndMessages, 3000);
-    return () => clearInterval(interval);
+    connectSocket();
+    const interval = setInterval(fetchNewMessages, 3000);
+    return () => {
+      clearInterval(interval);
+      socketRef.current?.close();
+    };
   }, []);
 
   const renderMessageContent = (msg: Message) => {